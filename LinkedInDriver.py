@@ -1,9 +1,33 @@
 from selenium.webdriver import Keys
 
+from Linkedin.JobCapture import stream_captured_jobs
+from Linkedin.JobSearch import stream_jobs, JsonlSink
+from Linkedin.JobStore import JobStore
 from Linkedin.LinkedIn import LinkedIn
 
 
-def run():
-    linkedin = LinkedIn()
-    linkedin.search.value = "Hiring React Js"
-    linkedin.search.send_keys(Keys.ENTER)
+def run(query="Hiring React Js", output="jobs.jsonl", store_path="jobs.sqlite3", limit=None, location=None,
+        via_feed=False, ranker=None, governor=None, capture=None):
+    if capture is None:
+        if via_feed:
+            linkedin = LinkedIn()
+            linkedin.search.value = query
+            linkedin.search.send_keys(Keys.ENTER)
+            linkedin.show_jobs()
+        else:
+            linkedin = LinkedIn.job_search(query, location=location)
+        state = linkedin.wait_for_search_outcome()
+        if state is not None and state.name == "no_results":
+            return 0
+    with JobStore(store_path) as store, JsonlSink(output) as sink:
+        # With a NetworkCapture the postings are read from the search API responses instead of the result cards
+        jobs = stream_captured_jobs(capture, query, location=location, limit=limit) if capture is not None else \
+            stream_jobs(limit=limit, store=store, governor=governor)
+        records = store.track(jobs)
+        # New postings are indexed for ranking as they stream in
+        return sink.consume(ranker.track(records) if ranker is not None else records)
+
+
+def run_parallel(pool, queries):
+    # Every query runs in its own pooled browser session
+    return pool.map(run, queries)
@@ -0,0 +1,110 @@
+import logging
+import re
+from datetime import datetime, timezone
+from typing import Iterable, Iterator
+
+from Linkedin.JobSearch import JobRecord, JobSearchResults
+from Linkedin.LinkedIn import LinkedIn
+from selenium_helper import globals as voltron_globals
+from selenium_helper.globals import wait_for_result
+from selenium_helper.network_capture import NetworkCapture, CapturedResponse, iter_json_items
+
+_logger = logging.getLogger('voltron_logger')
+
+# Job card and posting API calls of the jobs search page (normalized voyager JSON)
+JOB_RESPONSE_PATTERNS = (r'/voyager/api/voyagerJobsDash(JobCards|JobPostings)', r'/voyager/api/jobs/')
+_JOB_ID_RE = re.compile(r'(?:jobPosting(?:Card)?:\(?|/jobs/view/)(\d+)')
+
+
+def _text(value):
+    if isinstance(value, dict):
+        return value.get('text')
+    return value
+
+
+def _job_id(entity):
+    for key in ('*jobPosting', 'jobPostingUrn', 'entityUrn', 'trackingUrn'):
+        match = _JOB_ID_RE.search(str(entity.get(key) or ''))
+        if match:
+            return match.group(1)
+    return None
+
+
+def _listed_at(card):
+    for item in card.get('footerItems') or ():
+        if item.get('type') == 'LISTED_DATE' and item.get('timeAt'):
+            return datetime.fromtimestamp(item['timeAt'] / 1000, tz=timezone.utc).date().isoformat()
+    return None
+
+
+def jobs_from_entities(entities: Iterable[dict]) -> Iterator[JobRecord]:
+    # Job cards carry title, company, location and listing date; bare postings only fill in what no card covered
+    cards, postings = {}, {}
+    for entity in entities:
+        entity_type = entity.get('$type', '')
+        job_id = _job_id(entity)
+        if not job_id:
+            continue
+        if entity_type.endswith('JobPostingCard'):
+            cards[job_id] = JobRecord(job_id, _text(entity.get('jobPostingTitle') or entity.get('title')),
+                                      _text(entity.get('primaryDescription')),
+                                      _text(entity.get('secondaryDescription')), _listed_at(entity),
+                                      f'https://www.linkedin.com/jobs/view/{job_id}/')
+        elif entity_type.endswith('.JobPosting') and entity.get('title'):
+            postings[job_id] = JobRecord(job_id, _text(entity['title']), None, None, None,
+                                         f'https://www.linkedin.com/jobs/view/{job_id}/')
+    yield from cards.values()
+    yield from (record for job_id, record in postings.items() if job_id not in cards)
+
+
+def jobs_from_responses(responses: Iterable[CapturedResponse]) -> Iterator[JobRecord]:
+    for response in responses:
+        try:
+            yield from jobs_from_entities(entity for entity in iter_json_items(response.body, 'included.item')
+                                          if isinstance(entity, dict))
+        except ValueError as err:
+            _logger.warning('*** Unable to decode captured response %s: %s', response.url, err)
+
+
+def drain_until_quiet(capture: NetworkCapture, quiet=1.0, timeout=10, poll_interval=0.2) -> list:
+    # Cards of one page can arrive in several responses: drains until no matching request is in flight and nothing
+    # new came for `quiet` seconds, so late responses are not dropped by the next reset
+    responses = []
+    started = last_seen = voltron_globals.monotonic()
+    while True:
+        batch = list(capture.drain())
+        now = voltron_globals.monotonic()
+        if batch:
+            responses += batch
+            last_seen = now
+        elif not capture.pending and now - last_seen >= quiet:
+            break
+        if now - started >= timeout:
+            _logger.debug('*** Stopped draining with %d responses still pending', capture.pending)
+            break
+        voltron_globals.pause(poll_interval)
+    return responses
+
+
+def stream_captured_jobs(capture: NetworkCapture, query, location=None, limit=None, max_pages=40,
+                         timeout=15, quiet=1.0) -> Iterator[JobRecord]:
+    # Opens every results page by url and harvests it from the API responses it triggers: no DOM reads at all
+    seen = set()
+    count = 0
+    for page in range(max_pages):
+        capture.reset()
+        LinkedIn.job_search(query, location=location, start=page * JobSearchResults.page_size)
+        records = wait_for_result(lambda: list(jobs_from_responses(capture.drain())),
+                                  name=f'Job search API responses for page {page + 1}', timeout=timeout)
+        if records:
+            records += jobs_from_responses(drain_until_quiet(capture, quiet=quiet))
+        new_records = [record for record in dict((record.job_id, record) for record in records or ()).values()
+                       if record.job_id not in seen]
+        if not new_records:
+            return
+        for record in new_records:
+            seen.add(record.job_id)
+            yield record
+            count += 1
+            if limit is not None and count >= limit:
+                return
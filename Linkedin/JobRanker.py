@@ -0,0 +1,193 @@
+import json
+import logging
+import re
+from typing import NamedTuple, Optional, Iterable, Iterator, Tuple
+
+import numpy as np
+
+from Linkedin.JobSearch import JobRecord
+
+_logger = logging.getLogger('voltron_logger')
+
+# Words keep inner dots and trailing +/# (react.js, c++, c#) but need an alphanumeric start; .net is the one
+# token that starts with a dot
+_TOKEN_RE = re.compile(r'(?<![a-z0-9])\.net(?![a-z0-9])|[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9+#]+)*')
+SENIORITY_LEVELS = {
+    'intern': 0, 'internship': 0, 'trainee': 0, 'fresher': 0, 'graduate': 0,
+    'junior': 1, 'jr': 1, 'associate': 1, 'entry': 1,
+    'mid': 2, 'intermediate': 2,
+    'senior': 3, 'sr': 3,
+    'lead': 4, 'staff': 4, 'manager': 4,
+    'principal': 5, 'architect': 5, 'head': 5,
+    'director': 6, 'vp': 6,
+}
+_MAX_LEVEL = max(SENIORITY_LEVELS.values())
+
+
+def tokenize(text) -> list:
+    return _TOKEN_RE.findall((text or '').lower())
+
+
+def seniority_level(tokens) -> int:
+    # Highest seniority word of the posting, -1 when it names none
+    return max((SENIORITY_LEVELS[token] for token in tokens if token in SENIORITY_LEVELS), default=-1)
+
+
+class Profile(NamedTuple):
+    skills: Tuple[str, ...]
+    seniority: Optional[str] = None
+    locations: Tuple[str, ...] = ()
+    skill_weight: float = 1.0
+    seniority_weight: float = 0.25
+    location_weight: float = 0.25
+
+
+def load_profile(path) -> Profile:
+    with open(path, encoding='utf-8') as profile_file:
+        data = json.load(profile_file)
+    return Profile(**{**data, 'skills': tuple(data.get('skills', ())), 'locations': tuple(data.get('locations', ()))})
+
+
+def _grow(array, needed):
+    if needed <= len(array):
+        return array
+    grown = np.zeros(max(needed, len(array) * 2), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class JobRanker(object):
+    # TF-IDF index of postings kept as CSR-style arrays (per-document slices of term ids and counts). Adding a
+    # posting appends to the arrays and extends the vocabulary; idf, norms and scores are computed for all
+    # postings at once when ranking, so nothing is rebuilt as postings stream in.
+
+    def __init__(self, capacity=1024):
+        self._vocabulary = {}
+        self._df = np.zeros(capacity, dtype=np.int64)
+        self._terms = np.zeros(capacity * 16, dtype=np.int64)
+        self._counts = np.zeros(capacity * 16, dtype=np.float64)
+        self._offsets = np.zeros(capacity + 1, dtype=np.int64)
+        self._levels = np.zeros(capacity, dtype=np.int64)
+        self._location_ids = np.zeros(capacity, dtype=np.int64)
+        self._locations = {}
+        self.records = []
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self._vocabulary)
+
+    def add(self, record: JobRecord, description=None) -> int:
+        # description: full posting text when the caller has it; search results (DOM cards and captured job cards)
+        # carry none, so postings are ranked on title, company and location
+        tokens = tokenize(' '.join(filter(None, (record.title, record.company, record.location, description))))
+        counts = {}
+        for token in tokens:
+            column = self._vocabulary.get(token)
+            if column is None:
+                column = self._vocabulary[token] = len(self._vocabulary)
+            counts[column] = counts.get(column, 0) + 1
+        document = len(self.records)
+        start = self._offsets[document]
+        end = start + len(counts)
+        self._terms = _grow(self._terms, end)
+        self._counts = _grow(self._counts, end)
+        self._offsets = _grow(self._offsets, document + 2)
+        self._df = _grow(self._df, len(self._vocabulary))
+        self._levels = _grow(self._levels, document + 1)
+        self._location_ids = _grow(self._location_ids, document + 1)
+        self._terms[start:end] = list(counts.keys())
+        self._counts[start:end] = list(counts.values())
+        self._offsets[document + 1] = end
+        self._df[self._terms[start:end]] += 1
+        self._levels[document] = seniority_level(tokens)
+        location = ' '.join(tokenize(record.location))
+        self._location_ids[document] = self._locations.setdefault(location, len(self._locations))
+        self.records.append(record)
+        return document
+
+    def extend(self, records: Iterable[JobRecord]) -> int:
+        count = 0
+        for record in records:
+            self.add(record)
+            count += 1
+        return count
+
+    def track(self, records: Iterable[JobRecord]) -> Iterator[JobRecord]:
+        # Pipeline stage: indexes every record and passes it on
+        for record in records:
+            self.add(record)
+            yield record
+
+    @classmethod
+    def from_jsonl(cls, path):
+        ranker = cls()
+        with open(path, encoding='utf-8') as records_file:
+            ranker.extend(JobRecord(**json.loads(line)) for line in records_file if line.strip())
+        return ranker
+
+    def _idf(self):
+        documents = len(self.records)
+        return np.log((1 + documents) / (1 + self._df[:len(self._vocabulary)])) + 1
+
+    def _segment_sums(self, values):
+        # Sum of `values` over each document's slice; empty documents sum to 0
+        offsets = self._offsets[:len(self.records) + 1]
+        sums = np.add.reduceat(np.append(values, 0), offsets[:-1])
+        sums[offsets[1:] == offsets[:-1]] = 0
+        return sums
+
+    def _skill_scores(self, skills, idf):
+        nnz = self._offsets[len(self.records)]
+        terms = self._terms[:nnz]
+        # Sublinear tf, cosine similarity against the idf-weighted skill vector
+        weights = (1 + np.log(self._counts[:nnz])) * idf[terms]
+        norms = np.sqrt(self._segment_sums(weights * weights))
+        query = np.zeros(len(idf))
+        for skill in skills:
+            for token in tokenize(skill):
+                column = self._vocabulary.get(token)
+                if column is not None:
+                    query[column] = idf[column]
+        query_norm = np.linalg.norm(query)
+        if not query_norm:
+            return np.zeros(len(self.records))
+        dots = self._segment_sums(weights * query[terms])
+        return np.divide(dots, norms * query_norm, out=np.zeros_like(dots), where=norms > 0)
+
+    def _location_scores(self, locations):
+        documents = len(self.records)
+        if not locations:
+            return np.zeros(documents)
+        wanted = [' '.join(tokenize(location)) for location in locations]
+        matches = np.array([any(location and location in name for location in wanted)
+                            for name in self._locations], dtype=np.float64)
+        return matches[self._location_ids[:documents]]
+
+    def _seniority_scores(self, seniority):
+        documents = len(self.records)
+        level = SENIORITY_LEVELS.get((seniority or '').lower())
+        if level is None:
+            return np.zeros(documents)
+        levels = self._levels[:documents]
+        # Postings that do not name a level get half credit
+        return np.where(levels < 0, 0.5, 1 - np.abs(levels - level) / _MAX_LEVEL)
+
+    def score(self, profile: Profile) -> np.ndarray:
+        if not self.records:
+            return np.zeros(0)
+        return (profile.skill_weight * self._skill_scores(profile.skills, self._idf())
+                + profile.seniority_weight * self._seniority_scores(profile.seniority)
+                + profile.location_weight * self._location_scores(profile.locations))
+
+    def top(self, profile: Profile, k=20) -> list:
+        # [(score, record)] of the k best postings, best first
+        scores = self.score(profile)
+        if not len(scores):
+            return []
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(float(scores[index]), self.records[index]) for index in best]
@@ -0,0 +1,223 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Iterable, Iterator
+
+from selenium.common import NoSuchElementException, StaleElementReferenceException, WebDriverException
+
+from selenium_helper.ComponentBase import ComponentBase
+from selenium_helper.globals import get_driver, wait_for_result, compile_selector
+from selenium_helper.memory_governor import RECYCLE
+
+# Harvests the rendered cards that were not returned before (marked with data-voltron-seen), then loads ahead of the
+# consumer in the same call: renders the next occluded card, scrolls the list to its end or opens the next page.
+# Cards whose id is in the page's known-id set are marked and skipped without being parsed; the set is sent once per
+# document, the script answers 'known-ids' when it has to be (re)sent.
+# arguments: results list element, max records, known ids or null, whether known ids are expected, whether to paginate
+# returns: [records, state, skipped ids] where state is 'more', 'loading' (next page requested), 'end' or 'known-ids'
+JOB_CARDS_BATCH = """
+var list = arguments[0], limit = arguments[1];
+if (arguments[2]) {
+    window.__voltronKnownIds = new Set(arguments[2]);
+}
+var known = window.__voltronKnownIds;
+if (arguments[3] && !known) {
+    return [[], 'known-ids', []];
+}
+var cards = list.querySelectorAll('li[data-occludable-job-id]:not([data-voltron-seen])');
+var records = [], skipped = [], pending = null;
+function text(card, selector) {
+    var element = card.querySelector(selector);
+    return element ? (element.innerText || element.textContent || '').trim().split('\\n')[0].trim() : null;
+}
+for (var i = 0; i < cards.length && records.length < limit; i++) {
+    var card = cards[i];
+    var jobId = card.getAttribute('data-occludable-job-id');
+    if (known && known.has(jobId)) {
+        card.setAttribute('data-voltron-seen', '1');
+        skipped.push(jobId);
+        continue;
+    }
+    var title = text(card, '.job-card-list__title, .job-card-list__title--link, .job-card-container__link');
+    if (!title) {
+        pending = pending || card;
+        continue;
+    }
+    var link = card.querySelector('a[href*="/jobs/view/"]');
+    var time = card.querySelector('time');
+    records.push([
+        jobId,
+        title,
+        text(card, '.artdeco-entity-lockup__subtitle, .job-card-container__primary-description, ' +
+            '.job-card-container__company-name'),
+        text(card, '.job-card-container__metadata-item, .artdeco-entity-lockup__caption'),
+        time ? (time.getAttribute('datetime') || (time.innerText || '').trim()) : null,
+        link ? link.href.split('?')[0] : null
+    ]);
+    card.setAttribute('data-voltron-seen', '1');
+}
+var state = 'more';
+if (pending) {
+    pending.scrollIntoView({block: 'center'});
+} else if (records.length < limit) {
+    var scroller = list;
+    while (scroller && scroller.scrollHeight <= scroller.clientHeight) {
+        scroller = scroller.parentElement;
+    }
+    scroller = scroller || document.scrollingElement;
+    if (scroller.scrollTop + scroller.clientHeight < scroller.scrollHeight - 2) {
+        scroller.scrollTop = scroller.scrollHeight;
+    } else if (!arguments[4]) {
+        state = 'end';
+    } else if (window.__voltronPagedAt && Date.now() - window.__voltronPagedAt < 5000) {
+        state = 'loading';
+    } else {
+        var next = document.querySelector('button.jobs-search-pagination__button--next, ' +
+            'li.artdeco-pagination__indicator--number.selected + li button');
+        if (next && !next.disabled) {
+            window.__voltronPagedAt = Date.now();
+            next.click();
+            state = 'loading';
+        } else {
+            state = 'end';
+        }
+    }
+}
+return [records, state, skipped];
+"""
+
+
+class JobRecord(NamedTuple):
+    job_id: str
+    title: str
+    company: Optional[str]
+    location: Optional[str]
+    posted: Optional[str]
+    url: Optional[str]
+
+
+class JobSearchResults(ComponentBase):
+    _results_list = compile_selector('css=.jobs-search-results-list, .scaffold-layout__list')
+    _batch_size = 25
+    _recent_ids_limit = 2000
+    # LinkedIn lists 25 postings per results page; the `start` url parameter counts postings
+    page_size = 25
+
+    def __init__(self, *args, known_ids=None, on_skipped=None, paginate=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Promoted postings come back on later pages; only a bounded window of ids is remembered
+        self._recent_ids = OrderedDict()
+        # Postings known from previous runs are skipped in the browser, before their cards are parsed
+        self._known_ids = known_ids
+        self._on_skipped = on_skipped
+        # Without pagination the stream ends with the page that is open
+        self._paginate = paginate
+
+    def _harvest_batch(self):
+        try:
+            records, state, skipped = get_driver().execute_script(JOB_CARDS_BATCH, self._we, self._batch_size, None,
+                                                                  self._known_ids is not None, self._paginate)
+            if state == 'known-ids':
+                records, state, skipped = get_driver().execute_script(JOB_CARDS_BATCH, self._we, self._batch_size,
+                                                                      list(self._known_ids), True, self._paginate)
+        except StaleElementReferenceException:
+            # The results list is re-rendered when a new page opens
+            self._we = self._find_myself(timeout=self._timeout)
+            raise
+        if skipped and self._on_skipped is not None:
+            self._on_skipped(skipped)
+        return (records, state) if records or state == 'end' else None
+
+    def next_batch(self, timeout=None):
+        # Returns (new records, state); state is None when nothing arrived within the timeout
+        batch = wait_for_result(self._harvest_batch,
+                                name=f'New job cards to appear in {self.__class__.__name__}',
+                                bypass_exceptions=(
+                                    NoSuchElementException, StaleElementReferenceException, WebDriverException),
+                                timeout=self._timeout if timeout is None else timeout)
+        if not batch:
+            return [], None
+        records, state = batch
+        new_records = []
+        for record in records:
+            if record[0] in self._recent_ids:
+                continue
+            self._recent_ids[record[0]] = None
+            if len(self._recent_ids) > self._recent_ids_limit:
+                self._recent_ids.popitem(last=False)
+            new_records.append(JobRecord(*record))
+        return new_records, state
+
+    def stream(self, limit=None, timeout=None, governor=None) -> Iterator[JobRecord]:
+        count = 0
+        while limit is None or count < limit:
+            batch, state = self.next_batch(timeout=timeout)
+            if state is None or (state == 'end' and not batch):
+                return
+            if governor is not None and governor.check() == RECYCLE:
+                # The page was reopened in a new tab at the current results page; cards that were already
+                # returned come back and are dropped by the recent-ids window
+                self._we = self._find_myself(timeout=self._timeout)
+            for record in batch:
+                yield record
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+
+def stream_jobs(limit=None, timeout=15, store=None, paginate=True, on_skipped=None,
+                governor=None) -> Iterator[JobRecord]:
+    # Generator over the job results page currently open in the bound driver. With a JobStore, postings it already
+    # holds are skipped in the browser and only refresh their last-seen time.
+    def skipped(job_ids):
+        if store is not None:
+            store.touch(job_ids)
+        if on_skipped is not None:
+            on_skipped(job_ids)
+
+    results = JobSearchResults(selector=JobSearchResults._results_list, timeout=timeout,
+                               known_ids=store.recent_ids() if store is not None else None,
+                               on_skipped=skipped, paginate=paginate)
+    return results.stream(limit=limit, timeout=timeout, governor=governor)
+
+
+# One lock per output file, shared by every JsonlSink appending to it
+_sink_locks = {}
+_sink_locks_guard = threading.Lock()
+
+
+def _sink_lock(path) -> threading.Lock:
+    with _sink_locks_guard:
+        return _sink_locks.setdefault(os.path.realpath(path), threading.Lock())
+
+
+class JsonlSink(object):
+
+    def __init__(self, path):
+        self._path = path
+        self._file = None
+        self._lock = _sink_lock(path)
+
+    def __enter__(self):
+        self._file = open(self._path, 'a', encoding='utf-8')
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._file.close()
+        self._file = None
+
+    def write(self, record: JobRecord):
+        # One flushed line per record under the file's lock, so sinks and sessions appending to the same file do not
+        # interleave
+        line = json.dumps(record._asdict(), ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def consume(self, records: Iterable[JobRecord]) -> int:
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        return count
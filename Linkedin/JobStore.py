@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+from time import time
+from typing import Iterable, Iterator
+
+from Linkedin.JobSearch import JobRecord
+
+_logger = logging.getLogger('voltron_logger')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_last_seen ON jobs (last_seen);
+CREATE INDEX IF NOT EXISTS jobs_content_hash ON jobs (content_hash);
+"""
+
+_UPSERT = """
+INSERT INTO jobs (job_id, content_hash, first_seen, last_seen, record) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (job_id) DO UPDATE SET
+    content_hash = excluded.content_hash, last_seen = excluded.last_seen, record = excluded.record
+"""
+
+
+def content_hash(record: JobRecord) -> str:
+    # Reposts get a new job id but keep title/company/location, so they hash the same
+    content = '\x1f'.join(' '.join((value or '').lower().split())
+                          for value in (record.title, record.company, record.location))
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class JobStore(object):
+    # SQLite store of every posting seen by previous runs. Ids and content hashes are mirrored in memory so
+    # membership checks never touch the disk; writes are buffered and flushed in batched transactions.
+
+    # Postings skipped in the browser by default: the ones seen (or skipped, which refreshes them) in this window.
+    # Older ids are not sent to the page; their cards are parsed and then dropped by add()/track().
+    recent_window = 14 * 24 * 3600
+
+    def __init__(self, path='jobs.sqlite3', batch_size=500):
+        self._path = path
+        self._batch_size = batch_size
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.executescript(_SCHEMA)
+        self._pending = {}
+        self._load_index()
+
+    def _load_index(self):
+        with self._lock:
+            rows = self._connection.execute('SELECT job_id, content_hash FROM jobs').fetchall()
+            self._ids = {job_id for job_id, _ in rows}
+            self._hashes = {digest for _, digest in rows}
+        _logger.debug('*** Job store "%s" holds %d postings', self._path, len(self._ids))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, job_id):
+        return job_id in self._ids
+
+    def is_known(self, record: JobRecord) -> bool:
+        return record.job_id in self._ids or content_hash(record) in self._hashes
+
+    def add(self, record: JobRecord, seen=None) -> bool:
+        # Returns True when the posting was not known before
+        digest = content_hash(record)
+        with self._lock:
+            is_new = record.job_id not in self._ids and digest not in self._hashes
+            self._ids.add(record.job_id)
+            self._hashes.add(digest)
+            self._pending[record.job_id] = (record, digest, seen if seen is not None else time())
+            if len(self._pending) >= self._batch_size:
+                self.flush()
+        return is_new
+
+    def upsert_many(self, records: Iterable[JobRecord], seen=None) -> int:
+        count = 0
+        for record in records:
+            self.add(record, seen=seen)
+            count += 1
+        self.flush()
+        return count
+
+    def flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            rows = [(job_id, digest, seen, seen, json.dumps(record._asdict(), ensure_ascii=False))
+                    for job_id, (record, digest, seen) in self._pending.items()]
+            with self._connection:
+                self._connection.executemany(_UPSERT, rows)
+            self._pending.clear()
+
+    def touch(self, job_ids: Iterable[str], seen=None):
+        # Refreshes last_seen of postings skipped without being parsed
+        self.flush()
+        seen = seen if seen is not None else time()
+        with self._lock, self._connection:
+            self._connection.executemany('UPDATE jobs SET last_seen = ? WHERE job_id = ?',
+                                         [(seen, job_id) for job_id in job_ids])
+
+    def track(self, records: Iterable[JobRecord]) -> Iterator[JobRecord]:
+        # Pipeline stage: stores every record and passes on only the postings that were not known before
+        for record in records:
+            if self.add(record):
+                yield record
+
+    def recent_ids(self, since=None) -> list:
+        since = since if since is not None else time() - self.recent_window
+        self.flush()
+        with self._lock:
+            return [job_id for (job_id,) in
+                    self._connection.execute('SELECT job_id FROM jobs WHERE last_seen >= ?', (since,))]
+
+    def seen_since(self, since) -> Iterator[JobRecord]:
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT record FROM jobs WHERE last_seen >= ? ORDER BY last_seen', (since,)).fetchall()
+        for (record,) in rows:
+            yield JobRecord(**json.loads(record))
+
+    def compact(self, older_than=None):
+        # Drops postings not seen since `older_than` (epoch seconds) and reclaims the file space
+        self.flush()
+        with self._lock:
+            if older_than is not None:
+                with self._connection:
+                    deleted = self._connection.execute('DELETE FROM jobs WHERE last_seen < ?', (older_than,)).rowcount
+                _logger.debug('*** Job store compaction removed %d postings', deleted)
+            self._connection.execute('VACUUM')
+        self._load_index()
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
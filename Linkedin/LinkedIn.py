@@ -1,18 +1,61 @@
-from selenium.webdriver.common.by import By
+from urllib.parse import urlencode
 
 from selenium_helper.ComponentBase import ComponentBase
 from selenium_helper.InputBase import InputBase
-from selenium_helper.globals import find_element, get_driver
+from selenium_helper.component_cache import cached_component
+from selenium_helper.globals import get_driver, compile_selector, navigate, VoltronException
+from selenium_helper.page_states import PageStates, js
 
 
 class LinkedIn:
     _url = "https://www.linkedin.com/feed/"
-    _search_bar = 'xpath=//*[@id="global-nav-typeahead"]'
+    _jobs_search_url = "https://www.linkedin.com/jobs/search/"
+    _search_bar = compile_selector('xpath=//*[@id="global-nav-typeahead"]')
+    _jobs_filter = compile_selector('xpath=//button[contains(@class, "search-reusables__filter-pill-button")]'
+                                    '[normalize-space()="Jobs"]')
+    # Possible outcomes of a search, blocking ones first
+    BLOCKED_STATES = ("login_wall", "captcha", "rate_limited")
+    search_states = PageStates({
+        "login_wall": js("return /^\\/(authwall|login|uas\\/login)/.test(location.pathname) || "
+                         "document.querySelector('form.login__form, .authwall-join-form');"),
+        "captcha": js("return /^\\/checkpoint\\/challenge/.test(location.pathname) || "
+                      "document.querySelector('#captcha-internal, iframe[src*=\"captcha\"], "
+                      "iframe[src*=\"arkoselabs\"]');"),
+        "rate_limited": js("var body = document.body;"
+                           "return /429|too many requests/i.test(document.title) || (body && "
+                           "body.childElementCount < 20 && /too many requests|rate limit/i.test(body.textContent));"),
+        "no_results": compile_selector('css=.jobs-search-no-results-banner, .jobs-search-two-pane__no-results-banner'),
+        "results": compile_selector('css=li[data-occludable-job-id]'),
+    })
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, url=None, *args, **kwargs):
         self.driver = get_driver()
-        self.driver.get(self._url)
+        navigate(url or self._url, self.driver)
 
-    @property
+    @classmethod
+    def jobs_search_url(cls, query, location=None, start=0):
+        params = {"keywords": query}
+        if location:
+            params["location"] = location
+        if start:
+            params["start"] = start
+        return f"{cls._jobs_search_url}?{urlencode(params)}"
+
+    @classmethod
+    def job_search(cls, query, location=None, start=0):
+        # Opens the job results straight away, without loading the feed and typing into the search bar
+        return cls(url=cls.jobs_search_url(query, location=location, start=start))
+
+    @cached_component
     def search(self):
-        return InputBase(selector=self._search_bar, context=self._we, timeout=5)
+        return InputBase(selector=self._search_bar, timeout=5)
+
+    def wait_for_search_outcome(self, timeout=20):
+        # One wait for whichever outcome shows up first; None when the page settled on none of them
+        state = self.search_states.wait(timeout=timeout)
+        if state is not None and state.name in self.BLOCKED_STATES:
+            raise VoltronException(f'LinkedIn search is blocked by a {state.name.replace("_", " ")}')
+        return state
+
+    def show_jobs(self):
+        ComponentBase(selector=self._jobs_filter, timeout=10).click()
@@ -0,0 +1,250 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+from weakref import WeakKeyDictionary
+
+from Linkedin.JobSearch import JobSearchResults, JsonlSink, stream_jobs
+from Linkedin.JobStore import JobStore
+from Linkedin.LinkedIn import LinkedIn
+from selenium_helper.globals import VoltronException, get_driver
+from selenium_helper.rate_limit import TokenBucket, acquire_all
+
+_logger = logging.getLogger('voltron_logger')
+
+# Example config:
+# {
+#     "sessions": 2,
+#     "rate": {"global_per_minute": 30, "session_per_minute": 12, "burst": 2},
+#     "defaults": {"max_pages": 5, "priority": 0},
+#     "queries": [
+#         {"query": "Hiring React Js", "locations": ["Pune", "Remote"], "priority": 10},
+#         {"query": "Frontend Engineer", "max_pages": 2}
+#     ]
+# }
+
+
+class SearchTask(NamedTuple):
+    query: str
+    location: Optional[str] = None
+    priority: int = 0
+    max_pages: int = 5
+
+    @property
+    def key(self) -> str:
+        return f'{self.query}\x1f{self.location or ""}'
+
+
+class WorkItem(NamedTuple):
+    task: SearchTask
+    page: int
+    attempt: int = 0
+
+
+class RateLimits(NamedTuple):
+    global_per_minute: float = 30
+    session_per_minute: float = 12
+    burst: int = 2
+
+
+def load_config(path):
+    with open(path, encoding='utf-8') as config_file:
+        config = json.load(config_file)
+    defaults = config.get('defaults', {})
+    tasks = []
+    for entry in config.get('queries', []):
+        if isinstance(entry, str):
+            entry = {'query': entry}
+        if not entry.get('query'):
+            raise VoltronException(f'Scheduler config entry {entry} has no query')
+        for location in entry.get('locations') or [entry.get('location')]:
+            tasks.append(SearchTask(query=entry['query'], location=location,
+                                    priority=entry.get('priority', defaults.get('priority', 0)),
+                                    max_pages=entry.get('max_pages', defaults.get('max_pages', 5))))
+    return tasks, RateLimits(**config.get('rate', {})), config.get('sessions')
+
+
+class Checkpoint(object):
+    # Progress of every search task: the next page to open, postings seen so far and whether it is finished.
+    # The file is replaced atomically after every page, so a killed run leaves either the old or the new state.
+
+    def __init__(self, path):
+        self._path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding='utf-8') as checkpoint_file:
+                self._state = json.load(checkpoint_file)
+        except FileNotFoundError:
+            self._state = {}
+        except ValueError as err:
+            _logger.warning('*** Ignoring unreadable scheduler checkpoint "%s": %s', path, err)
+            self._state = {}
+
+    def get(self, task: SearchTask) -> dict:
+        with self._lock:
+            return dict(self._state.get(task.key, {}))
+
+    def update(self, task: SearchTask, **progress):
+        with self._lock:
+            entry = self._state.setdefault(task.key, {'query': task.query, 'location': task.location,
+                                                      'page': 0, 'count': 0, 'done': False})
+            entry.update(progress)
+            self._save()
+
+    def _save(self):
+        temporary = f'{self._path}.tmp'
+        with open(temporary, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(self._state, checkpoint_file, ensure_ascii=False, indent=1)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temporary, self._path)
+
+    def reset(self):
+        with self._lock:
+            self._state = {}
+            self._save()
+
+
+class Scheduler(object):
+    # Runs one results page per work item. Items wait in a priority queue (highest priority first, then FIFO), one
+    # worker per pooled browser session takes them, and every page load first takes a token from the global and
+    # from the session's bucket. Finishing a page queues the next one of the same search.
+
+    def __init__(self, pool, tasks, store: JobStore, sink: JsonlSink, checkpoint: Checkpoint,
+                 limits: RateLimits = None, max_attempts=3, timeout=15):
+        limits = limits if limits is not None else RateLimits()
+        self._pool = pool
+        self._store = store
+        self._sink = sink
+        self._checkpoint = checkpoint
+        self._limits = limits
+        self._max_attempts = max_attempts
+        self._timeout = timeout
+        self._global_bucket = TokenBucket.per_minute(limits.global_per_minute, burst=limits.burst)
+        self._session_buckets = WeakKeyDictionary()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._stopped = False
+        self._written_lock = threading.Lock()
+        self.written = 0
+        for task in tasks:
+            self._enqueue_task(task)
+
+    def _enqueue_task(self, task: SearchTask):
+        progress = self._checkpoint.get(task)
+        if progress.get('done'):
+            _logger.debug('*** Skipping finished search "%s" (%s)', task.query, task.location)
+            return
+        page = progress.get('page', 0)
+        if page:
+            _logger.info('*** Resuming search "%s" (%s) at page %d', task.query, task.location, page + 1)
+        self.push(WorkItem(task, page))
+
+    def push(self, item: WorkItem):
+        with self._condition:
+            heapq.heappush(self._queue, (-item.task.priority, next(self._sequence), item))
+            self._condition.notify()
+
+    def _next_item(self) -> Optional[WorkItem]:
+        # Blocks while the queue is empty but pages in progress may still queue their follow-ups
+        with self._condition:
+            while not self._stopped and not self._queue and self._in_flight:
+                self._condition.wait()
+            if self._stopped or not self._queue:
+                self._condition.notify_all()
+                return None
+            self._in_flight += 1
+            return heapq.heappop(self._queue)[2]
+
+    def _finish_item(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+
+    def _session_bucket(self, driver) -> TokenBucket:
+        with self._condition:
+            bucket = self._session_buckets.get(driver)
+            if bucket is None:
+                bucket = self._session_buckets[driver] = TokenBucket.per_minute(self._limits.session_per_minute,
+                                                                                burst=self._limits.burst)
+            return bucket
+
+    def _run_page(self, item: WorkItem):
+        task = item.task
+        acquire_all((self._global_bucket, self._session_bucket(get_driver())))
+        page = LinkedIn.job_search(task.query, location=task.location, start=item.page * JobSearchResults.page_size)
+        # Only a page that says it has no results ends a search; one that never settles or lists nothing is retried
+        state = page.wait_for_search_outcome(timeout=self._timeout)
+        if state is None:
+            raise VoltronException(f'Results page {item.page + 1} did not load')
+        # Pages are redone whole on resume; postings written before are skipped by the store
+        cards = 0
+
+        def count_skipped(job_ids):
+            nonlocal cards
+            cards += len(job_ids)
+
+        if state.name != 'no_results':
+            for record in stream_jobs(timeout=self._timeout, store=self._store, paginate=False,
+                                      on_skipped=count_skipped):
+                cards += 1
+                if self._store.add(record):
+                    self._sink.write(record)
+                    with self._written_lock:
+                        self.written += 1
+            self._store.flush()
+            if not cards:
+                raise VoltronException(f'Results page {item.page + 1} listed no postings')
+        done = cards == 0 or item.page + 1 >= task.max_pages
+        self._checkpoint.update(task, page=item.page + 1, done=done,
+                                count=self._checkpoint.get(task).get('count', 0) + cards)
+        _logger.info('*** Search "%s" (%s) page %d: %d postings', task.query, task.location, item.page + 1, cards)
+        if not done:
+            self.push(WorkItem(task, item.page + 1))
+
+    def _worker(self):
+        while True:
+            item = self._next_item()
+            if item is None:
+                return
+            try:
+                with self._pool.session():
+                    self._run_page(item)
+            except Exception as err:
+                if item.attempt + 1 < self._max_attempts:
+                    _logger.warning('*** Search "%s" page %d failed, retrying: %s', item.task.query, item.page + 1, err)
+                    self.push(item._replace(attempt=item.attempt + 1))
+                else:
+                    _logger.error('*** Search "%s" page %d failed %d times, giving up: %s', item.task.query,
+                                  item.page + 1, self._max_attempts, err)
+            finally:
+                self._finish_item()
+
+    def run(self) -> int:
+        with ThreadPoolExecutor(max_workers=self._pool.size, thread_name_prefix='voltron-scheduler') as executor:
+            workers = [executor.submit(self._worker) for _ in range(self._pool.size)]
+            try:
+                for worker in workers:
+                    worker.result()
+            except BaseException:
+                self.stop()
+                raise
+        return self.written
+
+
+def run_schedule(pool, config_path, output='jobs.jsonl', store_path='jobs.sqlite3', checkpoint_path=None):
+    tasks, limits, _ = load_config(config_path)
+    checkpoint = Checkpoint(checkpoint_path or f'{os.path.splitext(config_path)[0]}.checkpoint.json')
+    with JobStore(store_path) as store, JsonlSink(output) as sink:
+        return Scheduler(pool, tasks, store, sink, checkpoint, limits=limits).run()
@@ -0,0 +1,423 @@
+import re
+import xml.etree.ElementTree as ElementTree
+from collections import Counter
+from time import monotonic, sleep
+
+from selenium.common import NoSuchElementException, StaleElementReferenceException, InvalidSelectorException
+from selenium.webdriver.common.by import By
+
+from selenium_helper import scripts
+
+_SPECIAL_KEYS = re.compile('[\ue000-\ue0ff]')
+_CSS_TOKEN = re.compile(r'([#.]?[\w-]+|\[[^\]]+\]|\*)')
+
+
+class FakeWebElement(object):
+    # WebElement stand-in backed by an ElementTree node; every call goes through the driver's latency model
+
+    def __init__(self, driver, node):
+        self._driver = driver
+        self.node = node
+        self.id = f'fake-{id(node)}'
+
+    def __eq__(self, other):
+        return isinstance(other, FakeWebElement) and other.node is self.node
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f'<FakeWebElement {self.node.tag} {self.node.attrib}>'
+
+    @property
+    def parent(self):
+        return self._driver
+
+    def _command(self, command, **params):
+        self._driver.execute(command, params)
+        if not self._driver.is_attached(self.node):
+            raise StaleElementReferenceException(f'Element {self.id} is no longer attached to the DOM')
+
+    def find_element(self, by=By.ID, value=None):
+        self._command('findChildElement', using=by, value=value)
+        return self._driver.locate(self.node, by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        self._command('findChildElements', using=by, value=value)
+        return self._driver.locate_all(self.node, by, value)
+
+    @property
+    def tag_name(self):
+        self._command('getElementTagName')
+        return self.node.tag
+
+    @property
+    def text(self):
+        self._command('getElementText')
+        return self._driver.text_of(self.node)
+
+    def get_attribute(self, name):
+        self._command('getElementAttribute', name=name)
+        if name in ('innerText', 'textContent'):
+            return self._driver.text_of(self.node)
+        if name == 'checked':
+            return 'true' if 'checked' in self.node.attrib else None
+        return self.node.get(name)
+
+    def get_property(self, name):
+        self._command('getElementProperty', name=name)
+        return self.node.get(name)
+
+    def is_displayed(self):
+        self._command('isElementDisplayed')
+        return self._driver.is_visible(self.node)
+
+    def is_enabled(self):
+        self._command('isElementEnabled')
+        return 'disabled' not in self.node.attrib
+
+    def is_selected(self):
+        self._command('isElementSelected')
+        return 'checked' in self.node.attrib
+
+    def click(self):
+        self._command('clickElement')
+        self._driver.click(self.node)
+
+    def clear(self):
+        self._command('clearElement')
+        self.node.set('value', '')
+
+    def send_keys(self, *value):
+        self._command('sendKeysToElement', text=''.join(value))
+        typed = _SPECIAL_KEYS.sub('', ''.join(str(item) for item in value))
+        self.node.set('value', self.node.get('value', '') + typed)
+
+
+class FakeWebDriver(object):
+    # In-memory WebDriver serving an XHTML fixture. Each command costs `latency` seconds and is counted, and the
+    # framework's own scripts (selenium_helper.scripts) are emulated in Python.
+
+    def __init__(self, fixture, latency=0.0):
+        self._root = ElementTree.fromstring(fixture) if isinstance(fixture, str) else fixture
+        self.latency = latency
+        self.session_id = 'fake-session'
+        self.capabilities = {'browserName': 'fake'}
+        self.current_url = 'about:blank'
+        self.commands = Counter()
+        self.unknown_scripts = Counter()
+        self._elements = {}
+        self._parents = None
+        self._scheduled = []
+        self._scripts = {
+            scripts.SCROLL_TO_CENTER: lambda element: None,
+            scripts.SCROLL_TO_BOTTOM: lambda: None,
+            scripts.SCROLL_TO_TOP: lambda: None,
+            scripts.FOCUS: lambda element: None,
+            scripts.RUN_PIPELINE: self._run_pipeline,
+            scripts.CLICK: lambda element: self.click(element.node),
+            scripts.OUTER_HTML: lambda element: ElementTree.tostring(element.node, encoding='unicode'),
+            scripts.SNAPSHOT_NODE: self._snapshot_node,
+            scripts.GET_VALUE: lambda element: element.node.get('value', ''),
+            scripts.SET_VALUE: lambda element, value: element.node.set('value', value),
+            scripts.HARVEST_ITEMS: self._harvest_items,
+            scripts.FIND_ITEM_BY_NAME: self._find_item_by_name,
+            scripts.COUNT_ITEMS: lambda context, by, value: len(self.locate_all(self._node(context), by, value)),
+            scripts.DISCOVER_FORM_FIELDS: self._discover_form_fields,
+            scripts.APPLY_FORM_VALUES: self._apply_form_values,
+            scripts.READ_FORM_VALUES: lambda entries: [self._field_value(elements, kind) for elements, kind in entries],
+            scripts.wait_condition_script(scripts.FIND_ELEMENT_CONDITION): self._wait_find_element,
+            scripts.wait_condition_script(scripts.FIND_ELEMENTS_CONDITION): self._wait_find_elements,
+            scripts.condition_script(scripts.FIRST_MATCHING_STATE_CONDITION): self._first_matching_state,
+            scripts.wait_condition_script(scripts.FIRST_MATCHING_STATE_CONDITION): self._first_matching_state,
+        }
+
+    @property
+    def command_count(self) -> int:
+        return sum(self.commands.values())
+
+    def register_script(self, script, handler):
+        self._scripts[script] = handler
+
+    def schedule(self, delay, callback):
+        # Runs callback (e.g. a DOM mutation) on the first command issued `delay` seconds from now
+        self._scheduled.append((monotonic() + delay, callback))
+
+    def execute(self, driver_command, params=None):
+        self.commands[driver_command] += 1
+        if self.latency:
+            sleep(self.latency)
+        if self._scheduled:
+            now = monotonic()
+            due = [callback for when, callback in self._scheduled if when <= now]
+            self._scheduled = [(when, callback) for when, callback in self._scheduled if when > now]
+            for callback in due:
+                callback(self)
+                self.dom_changed()
+        return {'value': None}
+
+    def dom_changed(self):
+        self._parents = None
+
+    def _parent_map(self):
+        if self._parents is None:
+            self._parents = {child: parent for parent in self._root.iter() for child in parent}
+        return self._parents
+
+    def is_attached(self, node) -> bool:
+        return node is self._root or node in self._parent_map()
+
+    def is_visible(self, node) -> bool:
+        parents = self._parent_map()
+        while node is not None:
+            style = node.get('style', '').replace(' ', '')
+            if 'hidden' in node.attrib or 'display:none' in style:
+                return False
+            node = parents.get(node)
+        return True
+
+    def text_of(self, node, rendered=True) -> str:
+        # rendered=False is voltronText: hidden elements fall back to their textContent
+        if rendered and not self.is_visible(node):
+            return ''
+        return ' '.join(''.join(node.itertext()).split())
+
+    def element(self, node) -> FakeWebElement:
+        element = self._elements.get(id(node))
+        if element is None or element.node is not node:
+            element = self._elements[id(node)] = FakeWebElement(self, node)
+        return element
+
+    def _node(self, context):
+        return self._root if context is None or context is self else context.node
+
+    def remove(self, node):
+        parent = self._parent_map().get(node)
+        if parent is not None:
+            parent.remove(node)
+            self.dom_changed()
+
+    def click(self, node):
+        checkbox = node if node.get('type') == 'checkbox' else node.find(".//input[@type='checkbox']")
+        if checkbox is not None:
+            if 'checked' in checkbox.attrib:
+                del checkbox.attrib['checked']
+            else:
+                checkbox.set('checked', 'checked')
+        node.set('data-clicks', str(int(node.get('data-clicks', '0')) + 1))
+
+    # Locators
+
+    def locate_all(self, node, by, value) -> list:
+        if by == By.XPATH:
+            path = '.' + value if value.startswith('//') else value
+            try:
+                found = node.findall(path)
+            except SyntaxError as err:
+                raise InvalidSelectorException(f'Unsupported xpath "{value}" in fake driver: {err}')
+        elif by == By.CSS_SELECTOR:
+            found = self._css_select(node, value)
+        elif by == By.ID:
+            found = node.findall(f".//*[@id='{value}']")
+        elif by == By.NAME:
+            found = node.findall(f".//*[@name='{value}']")
+        elif by == By.TAG_NAME:
+            found = node.findall(f'.//{value}')
+        else:
+            raise InvalidSelectorException(f'Unsupported locator "{by}" in fake driver')
+        return [self.element(found_node) for found_node in found]
+
+    def locate(self, node, by, value) -> FakeWebElement:
+        found = self.locate_all(node, by, value)
+        if not found:
+            raise NoSuchElementException(f'Unable to locate element: {{"method":"{by}","selector":"{value}"}}')
+        return found[0]
+
+    @staticmethod
+    def _matches_compound(node, compound) -> bool:
+        for token in _CSS_TOKEN.findall(compound):
+            if token == '*':
+                continue
+            if token.startswith('#'):
+                if node.get('id') != token[1:]:
+                    return False
+            elif token.startswith('.'):
+                if token[1:] not in node.get('class', '').split():
+                    return False
+            elif token.startswith('['):
+                name, _, expected = token[1:-1].partition('=')
+                if name not in node.attrib or (expected and node.get(name) != expected.strip('"\'')):
+                    return False
+            elif node.tag != token:
+                return False
+        return True
+
+    def _css_select(self, node, selector) -> list:
+        found = []
+        for alternative in selector.split(','):
+            compounds = alternative.split()
+            candidates = [node]
+            for compound in compounds:
+                candidates = [descendant for candidate in candidates for descendant in candidate.iter()
+                              if descendant is not candidate and self._matches_compound(descendant, compound)]
+            found.extend(candidate for candidate in candidates if candidate not in found)
+        return found
+
+    # WebDriver API
+
+    @property
+    def page_source(self):
+        self.execute('getPageSource')
+        return ElementTree.tostring(self._root, encoding='unicode')
+
+    def get(self, url):
+        self.execute('get', {'url': url})
+        self.current_url = url
+
+    def find_element(self, by=By.ID, value=None):
+        self.execute('findElement', {'using': by, 'value': value})
+        return self.locate(self._root, by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        self.execute('findElements', {'using': by, 'value': value})
+        return self.locate_all(self._root, by, value)
+
+    def execute_script(self, script, *args):
+        self.execute('executeScript', {'script': script, 'args': args})
+        handler = self._scripts.get(script)
+        if handler is None:
+            self.unknown_scripts[script] += 1
+            return None
+        for arg in args:
+            if isinstance(arg, FakeWebElement) and not self.is_attached(arg.node):
+                raise StaleElementReferenceException(f'Element {arg.id} is no longer attached to the DOM')
+        return handler(*args)
+
+    def execute_async_script(self, script, *args):
+        # Browser-side waits resolve with whatever is true right now; the fake has no event loop to wait on
+        return self.execute_script(script, *args[1:]) if script in self._scripts else None
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        self.execute('executeCdpCommand', {'cmd': cmd, 'params': cmd_args})
+        return {}
+
+    def set_script_timeout(self, time_to_wait):
+        self.execute('setTimeouts', {'script': time_to_wait})
+
+    def quit(self):
+        self.execute('quit')
+
+    # Emulated framework scripts
+
+    def _snapshot_node(self, root, index, tag):
+        root = self._node(root)
+        nodes = list(root.iter())
+        node = root if index < 0 else (nodes[index + 1] if index + 1 < len(nodes) else None)
+        return self.element(node) if node is not None and node.tag.lower() == tag else None
+
+    def _run_pipeline(self, element, steps):
+        results = []
+        for step in steps:
+            operation, node, value = step[0], element.node, None
+            if operation == 'click':
+                self.click(node)
+            elif operation == 'text':
+                value = self.text_of(node, rendered=False)
+            elif operation in ('attribute', 'property'):
+                value = node.get(step[1])
+            elif operation == 'value':
+                value = node.get('value', '')
+            elif operation == 'set_value':
+                node.set('value', step[1])
+                value = step[1]
+            elif operation == 'displayed':
+                value = self.is_visible(node)
+            elif operation not in ('scroll', 'focus', 'blur'):
+                results.append([False, f'unknown step "{operation}"'])
+                break
+            results.append([True, value])
+        return results
+
+    def _harvest_items(self, context, by, value, name_by, name_value, attributes, limit):
+        items = self.locate_all(self._node(context), by, value)
+        items = items if limit is None else items[:limit]
+        records = []
+        for item in items:
+            name_nodes = self.locate_all(item.node, name_by, name_value) if name_by else [item]
+            name = self.text_of(name_nodes[0].node, rendered=False) if name_nodes else ''
+            records.append([item, self.is_visible(item.node), name,
+                            {attribute: item.node.get(attribute) for attribute in attributes}])
+        return records
+
+    def _find_item_by_name(self, context, by, value, name_by, name_value, expected, prefix):
+        for item in self.locate_all(self._node(context), by, value):
+            name_nodes = self.locate_all(item.node, name_by, name_value) if name_by else [item]
+            name = self.text_of(name_nodes[0].node, rendered=False) if name_nodes else ''
+            normalized = ' '.join(name.split()).upper()
+            if normalized.startswith(expected) if prefix else normalized == expected:
+                return [item, name]
+        return None
+
+    def _label_of(self, node) -> str:
+        label = self._root.find(f".//label[@for='{node.get('id')}']") if node.get('id') else None
+        parent = self._parent_map().get(node)
+        while label is None and parent is not None:
+            label = parent if parent.tag == 'label' else None
+            parent = self._parent_map().get(parent)
+        if label is not None:
+            return ' '.join(''.join(label.itertext()).split())
+        return node.get('aria-label') or node.get('placeholder') or node.get('name') or ''
+
+    def _field_value(self, elements, kind):
+        node = elements[0].node
+        if kind == 'checkbox':
+            return 'checked' in node.attrib
+        if kind == 'select':
+            option = next((option for option in node.iter('option') if 'selected' in option.attrib),
+                          node.find('option'))
+            return ''.join(option.itertext()).strip() if option is not None else None
+        return node.get('value', '')
+
+    def _discover_form_fields(self, root):
+        fields = []
+        for node in self._node(root).iter():
+            kind = node.get('type', 'text') if node.tag == 'input' else node.tag
+            if node.tag not in ('input', 'textarea', 'select') or kind in ('hidden', 'submit', 'button'):
+                continue
+            options = [''.join(option.itertext()).strip() for option in node.iter('option')]
+            elements = [self.element(node)]
+            fields.append([elements, kind, self._label_of(node), node.get('name') or node.get('id'),
+                           self._field_value(elements, kind), options, 'required' in node.attrib])
+        return fields
+
+    def _apply_form_values(self, entries):
+        for elements, kind, value in entries:
+            node = elements[0].node
+            if kind == 'checkbox':
+                if ('checked' in node.attrib) != bool(value):
+                    self.click(node)
+            elif kind == 'select':
+                for option in node.iter('option'):
+                    option.attrib.pop('selected', None)
+                    if str(value).lower() in (''.join(option.itertext()).strip().lower(), option.get('value')):
+                        option.set('selected', 'selected')
+            else:
+                node.set('value', str(value))
+
+    def _wait_find_element(self, context, by, value):
+        found = self.locate_all(self._node(context), by, value)
+        return found[0] if found else None
+
+    def _wait_find_elements(self, context, by, value):
+        return self.locate_all(self._node(context), by, value) or None
+
+    def _first_matching_state(self, context, states):
+        # Only selector states: js predicates cannot run against the fixture
+        for state in states:
+            if state[1] != 'selector':
+                continue
+            _, _, by, value, visible_only = state
+            for element in self.locate_all(self._node(context), by, value):
+                if not visible_only or self.is_visible(element.node):
+                    return [state[0], element]
+        return None
@@ -0,0 +1,42 @@
+import argparse
+import logging
+from time import perf_counter, process_time
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.scenarios import SCENARIOS, build_search_fixture
+from selenium_helper.globals import use_driver
+
+
+def run_scenario(scenario, latency=0.005, n_items=100, repeat=3) -> dict:
+    wall, cpu, commands = [], [], []
+    for _ in range(repeat):
+        driver = FakeWebDriver(build_search_fixture(n_items), latency=latency)
+        with use_driver(driver):
+            wall_started, cpu_started = perf_counter(), process_time()
+            scenario(driver, n_items)
+            wall.append(perf_counter() - wall_started)
+            cpu.append(process_time() - cpu_started)
+        commands.append(driver.command_count)
+    return {'wall': min(wall), 'cpu': min(cpu), 'commands': max(commands)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline selenium_helper benchmarks against a fake WebDriver')
+    parser.add_argument('--latency-ms', type=float, default=5.0, help='Simulated latency of every WebDriver command')
+    parser.add_argument('--items', type=int, default=100, help='Number of result items in the DOM fixture')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per scenario, the fastest one is reported')
+    parser.add_argument('scenarios', nargs='*', help=f'Scenarios to run (default: all): {", ".join(SCENARIOS)}')
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f'Unknown scenarios: {", ".join(unknown)}')
+    logging.basicConfig(level=logging.WARNING)
+
+    print(f'{"scenario":<32} {"wall ms":>10} {"cpu ms":>10} {"commands":>9}')
+    for name in args.scenarios or SCENARIOS:
+        result = run_scenario(SCENARIOS[name], latency=args.latency_ms / 1000, n_items=args.items, repeat=args.repeat)
+        print(f'{name:<32} {result["wall"] * 1000:>10.1f} {result["cpu"] * 1000:>10.1f} {result["commands"]:>9}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+from xml.sax.saxutils import escape
+
+from selenium.webdriver import Keys
+
+from selenium_helper.CheckboxBase import CheckBoxBase
+from selenium_helper.ComponentBase import ComponentBase
+from selenium_helper.FormFillBase import FormFillBase
+from selenium_helper.InputBase import InputBase
+from selenium_helper.globals import compile_selector, find_elements
+from selenium_helper.page_states import PageStates
+
+
+def build_search_fixture(n_items=100) -> str:
+    items = ''.join(
+        f'<li class="result" data-job-id="{index}"><a href="/jobs/view/{index}/">'
+        f'<span class="title">{escape(f"React Developer {index}")}</span></a>'
+        f'<span class="company">Company {index}</span></li>'
+        for index in range(n_items))
+    return (
+        '<html><body>'
+        '<header><input id="global-nav-typeahead" value="" /></header>'
+        '<div id="spinner">Loading</div>'
+        '<label class="filter-remote"><input type="checkbox" /> Remote</label>'
+        f'<ul class="results">{items}</ul>'
+        '<form id="apply">'
+        '<label for="phone">Mobile phone number *</label><input id="phone" type="text" value="" />'
+        '<label for="years">Years of experience with React?</label><input id="years" type="text" value="" />'
+        '<label for="notice">Notice period</label>'
+        '<select id="notice"><option value="">Select</option><option value="1">Immediately</option>'
+        '<option value="2">One month</option></select>'
+        '<label><input type="checkbox" name="relocate" /> Willing to relocate</label>'
+        '</form>'
+        '</body></html>'
+    )
+
+
+class ResultItem(ComponentBase):
+    _name_selector = compile_selector('xpath=.//span[@class="title"]')
+    _harvest_attributes = ('data-job-id',)
+
+
+class ResultsList(ComponentBase):
+    _list_item_type = ResultItem
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._item = compile_selector('css=li.result')
+
+
+def type_search_query(driver, n_items):
+    search = InputBase(selector=compile_selector('xpath=//*[@id="global-nav-typeahead"]'), timeout=5)
+    search.value = 'Hiring React Js'
+    search.send_keys(Keys.ENTER)
+
+
+def harvest_result_items(driver, n_items):
+    results = ResultsList(selector=compile_selector('css=ul.results'))
+    names = results.items_names
+    assert len(names) == n_items, f'Harvested {len(names)} of {n_items} items'
+
+
+def click_last_item(driver, n_items):
+    results = ResultsList(selector=compile_selector('css=ul.results'))
+    results.click_item(f'React Developer {n_items - 1}')
+
+
+def snapshot_result_items(driver, n_items):
+    results = ResultsList(selector=compile_selector('css=ul.results')).snapshot()
+    names = [item.name for item in results.items]
+    job_ids = [item.get_attribute('data-job-id') for item in results.items]
+    assert len(names) == len(job_ids) == results.count_of_items == n_items
+    results.click_item(f'React Developer {n_items - 1}')
+
+
+def fill_application_form(driver, n_items):
+    form = FormFillBase(selector=compile_selector('css=form#apply'))
+    result = form.fill({'Mobile phone number': '+91 98765 43210', 'Years of experience with React': '4',
+                        'Notice period': 'One month', 'Willing to relocate': True})
+    assert result.complete and len(result.filled) == 4, result
+
+
+def resolve_page_state(driver, n_items):
+    states = PageStates({'login_wall': compile_selector('css=form.login__form'),
+                         'no_results': compile_selector('css=.no-results'),
+                         'results': compile_selector('css=ul.results li.result')})
+    state = states.expect('results', timeout=5)
+    assert state.element is not None
+
+
+def find_result_elements(driver, n_items):
+    elements = find_elements(compile_selector('css=ul.results li.result'))
+    assert len(elements) == n_items
+
+
+def toggle_checkbox(driver, n_items):
+    checkbox = CheckBoxBase(selector=compile_selector('css=label.filter-remote'))
+    checkbox.value = True
+    checkbox.value = False
+
+
+def wait_for_spinner_to_disappear(driver, n_items, delay=0.3):
+    spinner = ComponentBase(selector=compile_selector('xpath=//*[@id="spinner"]'))
+    driver.schedule(delay, lambda fake: fake.remove(spinner._we.node))
+    assert spinner.wait_for_element_disappear(we=spinner._we, timeout=5)
+
+
+SCENARIOS = {
+    'type_search_query': type_search_query,
+    'harvest_result_items': harvest_result_items,
+    'click_last_item': click_last_item,
+    'snapshot_result_items': snapshot_result_items,
+    'find_result_elements': find_result_elements,
+    'toggle_checkbox': toggle_checkbox,
+    'fill_application_form': fill_application_form,
+    'resolve_page_state': resolve_page_state,
+    'wait_for_spinner_to_disappear': wait_for_spinner_to_disappear,
+}
@@ -0,0 +1,208 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from time import perf_counter
+
+from undetected_chromedriver import Chrome, ChromeOptions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE = os.environ.get("VOLTRON_CHROME_PROFILE",
+                                 "/Users/abhishek.diwate/Library/Application Support/Google/Chrome")
+PROFILE_CACHE = os.environ.get("VOLTRON_PROFILE_CACHE", os.path.join(tempfile.gettempdir(), "voltron-chrome-profile"))
+# The daemon's browser runs for hours on its own copy: a launch-mode refresh of PROFILE_CACHE must not delete it
+DAEMON_PROFILE_CACHE = os.environ.get("VOLTRON_DAEMON_PROFILE_CACHE",
+                                      f"{PROFILE_CACHE}-daemon" if PROFILE_CACHE else "")
+STATE_FILE = os.environ.get("VOLTRON_LAUNCHER_STATE", os.path.join(tempfile.gettempdir(), "voltron-launcher.json"))
+DEFAULT_DEBUGGER_PORT = 9222
+
+# Regenerable caches and crash data; everything a logged-in session needs (cookies, local storage, preferences) stays
+_PROFILE_EXCLUDES = ("Cache", "Code Cache", "GPUCache", "GrShaderCache", "ShaderCache", "GraphiteDawnCache",
+                     "DawnCache", "CacheStorage", "ScriptCache", "Media Cache", "Crashpad", "Crash Reports",
+                     "optimization_guide_model_store", "OptimizationHints", "Safe Browsing", "component_crx_cache",
+                     "SingletonLock", "SingletonSocket", "SingletonCookie", "BrowserMetrics", "*.log", "*.tmp")
+# Files whose change means the cached profile copy is outdated
+_PROFILE_LOCK = threading.Lock()
+_PROFILE_FINGERPRINT = ("Local State", os.path.join("Default", "Cookies"), os.path.join("Default", "Preferences"),
+                        os.path.join("Default", "Network", "Cookies"))
+
+
+class StartupTimer(object):
+
+    def __init__(self):
+        self.phases = []
+
+    @contextmanager
+    def phase(self, name):
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, perf_counter() - started))
+
+    def report(self):
+        total = sum(elapsed for _, elapsed in self.phases)
+        lines = [f"  {name:<24} {elapsed * 1000:>9.1f} ms" for name, elapsed in self.phases]
+        logger.info("Browser startup took %.1f ms:\n%s", total * 1000, "\n".join(lines))
+
+
+def _profile_fingerprint(profile_dir):
+    fingerprint = []
+    for relative in _PROFILE_FINGERPRINT:
+        try:
+            fingerprint.append(os.stat(os.path.join(profile_dir, relative)).st_mtime)
+        except OSError:
+            fingerprint.append(None)
+    return fingerprint
+
+
+def prepare_profile_cache(source=DEFAULT_PROFILE, cache_dir=PROFILE_CACHE):
+    # Trimmed copy of the user profile, refreshed only when the session data of the original changed.
+    # An empty VOLTRON_PROFILE_CACHE launches against the original profile.
+    if not cache_dir:
+        return source
+    # Pooled sessions start concurrently; only one of them may refresh the copy
+    with _PROFILE_LOCK:
+        return _refresh_profile_cache(source, cache_dir)
+
+
+def _refresh_profile_cache(source, cache_dir):
+    marker = os.path.join(cache_dir, ".voltron-source")
+    fingerprint = _profile_fingerprint(source)
+    try:
+        with open(marker) as marker_file:
+            if json.load(marker_file) == {"source": source, "fingerprint": fingerprint}:
+                return cache_dir
+    except (OSError, ValueError):
+        pass
+    logger.debug("Refreshing trimmed profile copy %s from %s", cache_dir, source)
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    shutil.copytree(source, cache_dir, ignore=shutil.ignore_patterns(*_PROFILE_EXCLUDES), symlinks=True,
+                    ignore_dangling_symlinks=True)
+    with open(marker, "w") as marker_file:
+        json.dump({"source": source, "fingerprint": fingerprint}, marker_file)
+    return cache_dir
+
+
+def session_profile(index, source=DEFAULT_PROFILE, cache_dir=PROFILE_CACHE):
+    # Own copy of the trimmed profile for pooled session `index`: two browsers cannot share a user-data-dir
+    base = prepare_profile_cache(source, cache_dir)
+    target = f"{base.rstrip(os.sep)}-session-{index}"
+    with _PROFILE_LOCK:
+        try:
+            with open(os.path.join(base, ".voltron-source")) as base_marker, \
+                    open(os.path.join(target, ".voltron-source")) as target_marker:
+                if json.load(base_marker) == json.load(target_marker):
+                    return target
+        except (OSError, ValueError):
+            pass
+        logger.debug("Copying profile %s for pooled session %d", base, index)
+        shutil.rmtree(target, ignore_errors=True)
+        shutil.copytree(base, target, ignore=shutil.ignore_patterns(*_PROFILE_EXCLUDES), symlinks=True,
+                        ignore_dangling_symlinks=True)
+    return target
+
+
+def is_debugger_alive(debugger_address, timeout=0.5):
+    try:
+        with urllib.request.urlopen(f"http://{debugger_address}/json/version", timeout=timeout) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def find_running_browser():
+    # Explicit address first, then the session kept ready by the launcher daemon
+    candidates = [os.environ.get("VOLTRON_DEBUGGER_ADDRESS")]
+    try:
+        with open(STATE_FILE) as state_file:
+            candidates.append(json.load(state_file).get("debugger_address"))
+    except (OSError, ValueError):
+        pass
+    return next((address for address in candidates if address and is_debugger_alive(address)), None)
+
+
+def attach_driver(debugger_address):
+    options = ChromeOptions()
+    options.debugger_address = debugger_address
+    return Chrome(options=options)
+
+
+def launch_driver(user_data_dir=None, options=None):
+    return Chrome(user_data_dir=user_data_dir or prepare_profile_cache(), options=options)
+
+
+def start_driver(mode="auto", timer=None, options=None, user_data_dir=None):
+    # mode: "attach" (fail when no browser is running), "launch" (always cold start) or "auto"; user_data_dir
+    # replaces the shared profile copy for launched browsers
+    timer = timer if timer is not None else StartupTimer()
+    if mode in ("auto", "attach"):
+        with timer.phase("find running browser"):
+            debugger_address = find_running_browser()
+        if debugger_address:
+            if options is not None:
+                logger.warning("Attaching to the running browser at %s: launch options (lean profile flags, "
+                               "performance log) do not apply to it", debugger_address)
+            with timer.phase("attach"):
+                return attach_driver(debugger_address)
+        if mode == "attach":
+            raise RuntimeError("No running browser to attach to, start one with `python browser_launcher.py`")
+    with timer.phase("profile cache"):
+        user_data_dir = user_data_dir or prepare_profile_cache()
+    with timer.phase("launch"):
+        return launch_driver(user_data_dir, options=options)
+
+
+def _chrome_binary():
+    binary = os.environ.get("VOLTRON_CHROME_BINARY")
+    if binary:
+        return binary
+    if sys.platform == "darwin":
+        return "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+    return next(filter(None, (shutil.which(name) for name in ("google-chrome", "chromium", "chromium-browser"))),
+                "google-chrome")
+
+
+def spawn_browser(port=DEFAULT_DEBUGGER_PORT, user_data_dir=None):
+    user_data_dir = user_data_dir or prepare_profile_cache(cache_dir=DAEMON_PROFILE_CACHE)
+    return subprocess.Popen([_chrome_binary(), f"--remote-debugging-port={port}", f"--user-data-dir={user_data_dir}",
+                             "--no-first-run", "--no-default-browser-check", "about:blank"],
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def run_daemon(port=DEFAULT_DEBUGGER_PORT, check_interval=2.0):
+    # Keeps one browser ready to attach to and re-spawns it after a run closed it or it crashed
+    debugger_address = f"127.0.0.1:{port}"
+    process = None
+    try:
+        while True:
+            if process is None or process.poll() is not None:
+                process = spawn_browser(port)
+                with open(STATE_FILE, "w") as state_file:
+                    json.dump({"debugger_address": debugger_address, "pid": process.pid}, state_file)
+                logger.info("Pre-spawned browser %s on %s", process.pid, debugger_address)
+            time.sleep(check_interval)
+    finally:
+        if process is not None and process.poll() is None:
+            process.terminate()
+        try:
+            os.remove(STATE_FILE)
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Keep a Chrome session pre-spawned for main.py to attach to")
+    parser.add_argument("--port", type=int, default=DEFAULT_DEBUGGER_PORT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    run_daemon(port=args.port)
@@ -1,45 +1,168 @@
 import logging
+import os
 import ssl
+import threading
 import time
-from undetected_chromedriver import Chrome
+from undetected_chromedriver import ChromeOptions
 from LinkedInDriver import run
+from Linkedin.JobCapture import JOB_RESPONSE_PATTERNS
+from Linkedin.JobRanker import JobRanker, load_profile
+from Linkedin.Scheduler import load_config, run_schedule
+from browser_launcher import StartupTimer, start_driver, session_profile
 from selenium_helper.globals import set_driver
+from selenium_helper.lean import lean_chrome_options, apply_lean_profile
+from selenium_helper.driver_pool import DriverPool
+from selenium_helper.instrumentation import instrument
+from selenium_helper.memory_governor import MemoryGovernor
+from selenium_helper.network_capture import NetworkCapture, enable_performance_log
+from selenium_helper.replay import record, replay
+from selenium_helper.voltron_logging import LOGGER_NAME, configure_logging, lazy
 
-# Create a logger
-logging.basicConfig(level=logging.DEBUG)
+# Records go through a queue to a listener thread; VOLTRON_LOG_LEVEL=DEBUG turns on diagnostics
+configure_logging(loggers=(LOGGER_NAME, __name__, "browser_launcher"))
 logger = logging.getLogger(__name__)
 
 # Use standard library SSL context
 ssl._create_default_https_context = ssl._create_stdlib_context
 
 
-def initialize_driver(retries=3, delay=5):
-    for attempt in range(retries):
+def capture_enabled():
+    return os.environ.get("VOLTRON_CAPTURE", "0") != "0"
+
+
+def lean_enabled():
+    return os.environ.get("VOLTRON_LEAN", "1") != "0"
+
+
+def initialize_driver(retries=3, delay=1, mode=None, lean=None, capture=None, user_data_dir=None):
+    # mode: "auto" (attach to a running browser when there is one), "attach" or "launch"
+    mode = mode or os.environ.get("VOLTRON_START_MODE", "auto")
+    lean = lean if lean is not None else lean_enabled()
+    # Network capture needs the performance log, which only a launched browser can be started with
+    capture = capture if capture is not None else capture_enabled()
+    if capture and mode == "attach":
+        raise RuntimeError("Network capture needs a launched browser, it cannot attach to a running one")
+    if capture and mode == "auto":
+        mode = "launch"
+    timer = StartupTimer()
+    try:
+        for attempt in range(retries):
+            try:
+                logger.debug("Attempt %d to initialize Chrome driver (%s)", attempt + 1, mode)
+                options = ChromeOptions()
+                if lean:
+                    lean_chrome_options(options)
+                if capture:
+                    enable_performance_log(options)
+                driver = start_driver(mode=mode, timer=timer, options=options if lean or capture else None,
+                                      user_data_dir=user_data_dir)
+                if lean:
+                    with timer.phase("lean profile"):
+                        apply_lean_profile(driver)
+                set_driver(driver)
+                return driver
+            except Exception as e:
+                logger.error("Attempt %d failed: %s", attempt + 1, e, exc_info=True)
+                if attempt < retries - 1:
+                    with timer.phase(f"retry backoff {attempt + 1}"):
+                        time.sleep(delay * 2 ** attempt)
+                else:
+                    raise
+    finally:
+        timer.report()
+
+
+def main_scheduled(config_path):
+    # Every pooled session is a cold-started browser; attaching would share one window between workers
+    _, _, sessions = load_config(config_path)
+    size = sessions or 2
+    tracer = None
+    # Each live session owns one profile copy; a replaced session takes over the copy of the one it replaces
+    free_profiles = list(range(size))
+    profiles_lock = threading.Lock()
+
+    def factory():
+        nonlocal tracer
+        with profiles_lock:
+            index = free_profiles.pop(0)
         try:
-            logger.debug(f"Attempt {attempt + 1} to initialize Chrome driver")
-            driver = Chrome(user_data_dir="/Users/abhishek.diwate/Library/Application Support/Google/Chrome")
-            set_driver(driver)
-            return driver
-        except Exception as e:
-            logger.error(f"Attempt {attempt + 1} failed: {e}", exc_info=True)
-            if attempt < retries - 1:
-                time.sleep(delay)
-            else:
-                raise
+            driver = initialize_driver(mode="launch", user_data_dir=session_profile(index))
+        except Exception:
+            with profiles_lock:
+                free_profiles.append(index)
+            raise
+        quit_driver = driver.quit
+
+        def quit_and_free_profile():
+            try:
+                quit_driver()
+            finally:
+                with profiles_lock:
+                    free_profiles.append(index)
+
+        driver.quit = quit_and_free_profile
+        tracer = instrument(driver)
+        return driver
+
+    try:
+        with DriverPool(factory, size=size) as pool:
+            written = run_schedule(pool, config_path)
+            logger.info("Scheduled run wrote %d new postings", written)
+    finally:
+        if tracer is not None:
+            logger.info("WebDriver command summary:\n%s", lazy(tracer.summary))
+            tracer.export_chrome_trace(os.environ.get("VOLTRON_TRACE_FILE", "webdriver_trace.json"))
 
 
 def main():
+    config_path = os.environ.get("VOLTRON_SCHEDULE")
+    if config_path:
+        return main_scheduled(config_path)
+    tracer = None
+    recorder = None
     try:
-        driver = initialize_driver()
+        # VOLTRON_REPLAY runs against a VOLTRON_RECORD trace instead of a browser, VOLTRON_REPLAY_SPEED=0 as fast
+        # as possible
+        replay_path = os.environ.get("VOLTRON_REPLAY")
+        if replay_path:
+            driver = replay(replay_path, speed=float(os.environ.get("VOLTRON_REPLAY_SPEED", 0)) or None)
+        else:
+            driver = initialize_driver()
+            if os.environ.get("VOLTRON_RECORD"):
+                recorder = record(driver, os.environ["VOLTRON_RECORD"])
+        tracer = instrument(driver)
         logger.debug("Running LinkedIn automation")
-        run()
-    except Exception as e:
+        profile_path = os.environ.get("VOLTRON_PROFILE")
+        ranker = JobRanker() if profile_path else None
+        capture = NetworkCapture(JOB_RESPONSE_PATTERNS, driver, save_dir=os.environ.get("VOLTRON_CAPTURE_DIR")) \
+            if capture_enabled() else None
+
+        def prepare_tab(target):
+            if lean_enabled():
+                apply_lean_profile(target)
+            if capture is not None:
+                capture.attach(target)
+
+        # Long runs keep the renderer small by pruning harvested cards and recycling the tab
+        governor = MemoryGovernor(driver, interval=float(os.environ.get("VOLTRON_MEMORY_INTERVAL", 30)),
+                                  on_new_target=prepare_tab)
+        run(ranker=ranker, governor=governor, capture=capture)
+        if ranker is not None:
+            for score, posting in ranker.top(load_profile(profile_path), k=int(os.environ.get("VOLTRON_TOP_K", 20))):
+                logger.info("%.3f  %s - %s (%s) %s", score, posting.title, posting.company, posting.location,
+                            posting.url)
+    except Exception:
         logger.error("An error occurred during the Chrome driver initialization or LinkedIn automation run.",
                      exc_info=True)
     finally:
+        if tracer is not None:
+            logger.info("WebDriver command summary:\n%s", lazy(tracer.summary))
+            tracer.export_chrome_trace(os.environ.get("VOLTRON_TRACE_FILE", "webdriver_trace.json"))
         if 'driver' in locals():
             logger.debug("Closing the driver")
             driver.quit()
+        if recorder is not None:
+            recorder.close()
 
 
 if __name__ == "__main__":
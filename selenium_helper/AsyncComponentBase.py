@@ -0,0 +1,371 @@
+import logging
+from collections import OrderedDict
+from time import monotonic
+from typing import Optional
+
+from selenium.common import NoSuchElementException, StaleElementReferenceException, WebDriverException
+
+from selenium_helper.ComponentBase import HarvestedItem, normalize_item_name
+from selenium_helper.async_globals import get_async_driver, find_element, find_elements, wait_for_result
+from selenium_helper.globals import parse_pattern, VoltronException, parse_selector
+from selenium_helper.scripts import SCROLL_TO_CENTER, HARVEST_ITEMS, COUNT_ITEMS, SCROLL_TO_BOTTOM, SCROLL_TO_TOP, \
+    CLICK, FIND_ITEM_BY_NAME, RUN_PIPELINE
+
+
+async def scroll_to_center_of_element(web_element):
+    await get_async_driver().execute_script(SCROLL_TO_CENTER, web_element)
+
+
+class AsyncComponentBase(object):
+    # asyncio counterpart of ComponentBase: same selectors and semantics, but the component is located by
+    # awaiting it (`search = await AsyncInputBase(selector=...)`) and every WebDriver-backed property returns
+    # an awaitable (`await component.items`).
+    _context_timeout = 15
+    _pattern_values = {}
+    _list_item_type = None
+    _scroll_to_items = False
+    _name_selector = None
+    _harvest_attributes = ()
+    # Seconds a name -> element handle found by find_item or harvesting stays reusable. There are no navigation
+    # generations in the async layer, the TTL alone bounds how long a handle is trusted.
+    _item_index_ttl = 2.0
+
+    def __init__(self, selector='', context=None, web_element=None, timeout=_context_timeout, pattern_values=None,
+                 prefetched=None,
+                 *args,
+                 **kwargs):
+        self._item = None
+        self._item_index = {}
+        self._prefetched = prefetched
+        self._logger = logging.getLogger('voltron_logger')
+        self._args, self._kwargs = args, kwargs
+        self._context = context if context is not None else get_async_driver()
+        self._timeout = timeout
+        if isinstance(pattern_values, dict):
+            self._pattern_values = {**self._pattern_values, **pattern_values}
+        if web_element is None and self._pattern_values:
+            selector = parse_pattern(selector, pattern_values=self._pattern_values)
+        self._selector = selector
+        self._we = web_element
+
+    def __await__(self):
+        return self._resolve().__await__()
+
+    async def _resolve(self):
+        if self._we is None:
+            self._we = await self._find_myself(timeout=self._timeout)
+        return self
+
+    async def _find_element_by_selector(self, selector='', context=None, pattern_values=None,
+                                        bypass_exceptions=(
+                                                NoSuchElementException, StaleElementReferenceException,
+                                                WebDriverException),
+                                        timeout=10):
+        context = self._we if context is None else context
+        selector = parse_pattern(selector, pattern_values=pattern_values) if pattern_values else selector
+        return await find_element(selector=selector, context=context, bypass_exceptions=bypass_exceptions,
+                                  timeout=timeout)
+
+    async def _find_myself(self, timeout=_context_timeout):
+        element = await self._find_element_by_selector(selector=self._selector, context=self._context,
+                                                       timeout=timeout)
+        if not element:
+            raise VoltronException(f'"{self.__class__.__name__}" component not found')
+        return element
+
+    async def _find_elements_by_selector(self, selector='', context=None, pattern_values=None,
+                                         bypass_exceptions=(
+                                                 NoSuchElementException, StaleElementReferenceException,
+                                                 WebDriverException),
+                                         timeout=25):
+        context = self._we if context is None else context
+        selector = parse_pattern(selector, pattern_values=pattern_values) if pattern_values else selector
+        elements = await find_elements(selector=selector, context=context, bypass_exceptions=bypass_exceptions,
+                                       timeout=timeout)
+        return elements or []
+
+    async def wait_for_element_disappear(self, we=None, timeout=10):
+        if we is None:
+            self._logger.warning('*** Nothing passed to wait for element disappear function "%s"',
+                                 self.__class__.__name__)
+            we = self._we
+
+        async def check_disappear(webelement):
+            try:
+                return not await webelement.is_displayed()
+            except (StaleElementReferenceException, NoSuchElementException):
+                return True
+
+        return await wait_for_result(lambda: check_disappear(webelement=we), timeout=timeout,
+                                     name=f'WebElement "{self.__class__.__name__}" to disappear')
+
+    async def scroll_to_bottom(self):
+        await get_async_driver().execute_script(SCROLL_TO_BOTTOM)
+
+    async def scroll_to_top(self):
+        await get_async_driver().execute_script(SCROLL_TO_TOP)
+
+    async def _get_webelement_text(self, selector='', we=None, context=None, pattern_values=None, timeout=0) -> str:
+        try:
+            if we:
+                return await self._we_text(we)
+            elif selector is not None and selector != '':
+                we = await self._find_element_by_selector(selector=selector, context=context,
+                                                          pattern_values=pattern_values, timeout=timeout)
+                return await self._we_text(we) if we else ''
+            else:
+                raise VoltronException(
+                    'Internal error: No selector or webelement passed to get_webelement_text function')
+        except StaleElementReferenceException:
+            we = await self._find_element_by_selector(selector=selector, context=context, timeout=timeout)
+            self._we = we
+            return await self._we_text(we) if we else ''
+        except VoltronException:
+            raise
+        except Exception as err:
+            raise VoltronException(f'Error getting WebElement text. Exception string: "{err}"')
+
+    async def _we_text(self, we):
+        try:
+            return await we.get_text()
+        except WebDriverException:
+            return ((await we.get_attribute('innerText')) or '').strip('\n').strip()
+
+    async def _harvest_items(self, limit=None, timeout=None) -> list:
+        timeout = self._timeout if timeout is None else timeout
+        by, value = parse_selector(self._item)
+        item_type = self._list_item_type
+        name_selector = getattr(item_type, '_name_selector', None)
+        name_by, name_value = parse_selector(name_selector) if name_selector else (None, None)
+        attributes = list(getattr(item_type, '_harvest_attributes', ()))
+        records = await wait_for_result(
+            lambda: get_async_driver().execute_script(HARVEST_ITEMS, self._we, by, value, name_by, name_value,
+                                                      attributes, limit),
+            name=f'Waiting for {self.__class__.__name__} items to exist by selector {self._item}',
+            bypass_exceptions=(NoSuchElementException, StaleElementReferenceException, WebDriverException),
+            timeout=timeout)
+        records = [HarvestedItem(*record) for record in records or []]
+        self._index_items(records)
+        return records
+
+    async def _build_item(self, record: HarvestedItem, scroll=False):
+        list_item = self._list_item_type(web_element=record.element, prefetched=record)
+        if scroll:
+            await list_item.scroll_to()
+        return list_item
+
+    async def _build_items_as_ordered_dict(self, records, scroll=None) -> OrderedDict:
+        scroll = self._scroll_to_items if scroll is None else scroll
+        items_ordered_dict = OrderedDict()
+        for record in records:
+            list_item = await self._build_item(record, scroll=scroll)
+            items_ordered_dict.update({await list_item.name: list_item})
+        return items_ordered_dict
+
+    async def _items(self):
+        records = await self._harvest_items()
+        self._logger.debug('*** Found %d %s - %s items', len(records), self.__class__.__name__,
+                           self._list_item_type.__name__)
+        return [await self._build_item(record, scroll=self._scroll_to_items) for record in records if record.visible]
+
+    @property
+    def items(self):
+        return self._items()
+
+    async def _items_as_ordered_dict(self) -> OrderedDict:
+        return await self._build_items_as_ordered_dict(await self._harvest_items())
+
+    @property
+    def items_as_ordered_dict(self):
+        return self._items_as_ordered_dict()
+
+    async def _items_names(self):
+        return list((await self._build_items_as_ordered_dict(await self._harvest_items(), scroll=False)).keys())
+
+    @property
+    def items_names(self):
+        return self._items_names()
+
+    async def n_items_as_ordered_dict(self, no_of_items=5, scroll=None) -> OrderedDict:
+        return await self._build_items_as_ordered_dict(await self._harvest_items(limit=no_of_items), scroll=scroll)
+
+    async def _count_of_items(self):
+        by, value = parse_selector(self._item)
+        count = await wait_for_result(lambda: get_async_driver().execute_script(COUNT_ITEMS, self._we, by, value),
+                                      name=f'Waiting for {self.__class__.__name__} items to exist by selector '
+                                           f'{self._item}',
+                                      bypass_exceptions=(
+                                          NoSuchElementException, StaleElementReferenceException, WebDriverException),
+                                      timeout=self._timeout)
+        return count or 0
+
+    @property
+    def count_of_items(self):
+        return self._count_of_items()
+
+    async def _has_items(self):
+        return bool(await self._count_of_items())
+
+    @property
+    def has_items(self):
+        return self._has_items()
+
+    def _index_items(self, records):
+        if not self._item_index_ttl:
+            return
+        now = monotonic()
+        # A fresh harvest replaces whatever the index held, so it never outgrows the list
+        self._item_index = {key: entry for key, entry in self._item_index.items() if key[1] and entry[1] > now}
+        for record in records:
+            if record.name is not None:
+                self._item_index.setdefault((normalize_item_name(record.name), False),
+                                            (record, now + self._item_index_ttl))
+
+    def _indexed_item(self, key) -> Optional[HarvestedItem]:
+        entry = self._item_index.get(key)
+        if entry is None:
+            return None
+        record, expires = entry
+        if monotonic() >= expires:
+            del self._item_index[key]
+            return None
+        return record
+
+    def _indexed_names(self) -> list:
+        # Names already known from earlier lookups, for error messages that must not trigger another harvest
+        return [record.name for record, _ in self._item_index.values()]
+
+    async def _query_item(self, key) -> Optional[HarvestedItem]:
+        by, value = parse_selector(self._item)
+        name_selector = getattr(self._list_item_type, '_name_selector', None)
+        name_by, name_value = parse_selector(name_selector) if name_selector else (None, None)
+        found = await get_async_driver().execute_script(FIND_ITEM_BY_NAME, self._we, by, value, name_by, name_value,
+                                                        *key)
+        if not found:
+            return None
+        record = HarvestedItem(found[0], True, found[1], {})
+        if self._item_index_ttl:
+            self._item_index[key] = (record, monotonic() + self._item_index_ttl)
+        return record
+
+    async def find_item(self, item_name: str, prefix=False, timeout: int = 5):
+        # Same lookup as ComponentBase.find_item: one script call per poll, whatever the length of the list
+        if not item_name:
+            raise VoltronException('Item name was not specified')
+        key = (normalize_item_name(item_name), prefix)
+        record = self._indexed_item(key)
+        if record is None:
+            record = await wait_for_result(lambda: self._query_item(key),
+                                           name=f'Specified "{item_name}" to appear between items',
+                                           bypass_exceptions=(NoSuchElementException,
+                                                              StaleElementReferenceException, WebDriverException),
+                                           timeout=timeout)
+        return await self._build_item(record) if record else None
+
+    async def click_item(self, item_name: str, timeout: int = 5, prefix=False):
+        item_found = await self.find_item(item_name, prefix=prefix, timeout=timeout)
+        if not item_found:
+            raise VoltronException(f'"{self.__class__.__name__}" item: "{item_name}" not found in items list: '
+                                   f'{self._indexed_names()}')
+        try:
+            await item_found.click()
+        except StaleElementReferenceException:
+            # The indexed handle belongs to a re-rendered list; look the item up again once
+            self._item_index.pop((normalize_item_name(item_name), prefix), None)
+            item_found = await self.find_item(item_name, prefix=prefix, timeout=timeout)
+            if not item_found:
+                raise VoltronException(f'"{self.__class__.__name__}" item: "{item_name}" disappeared from items list')
+            await item_found.click()
+
+    async def _run_steps(self, *steps) -> list:
+        # ActionPipeline steps (['scroll'], ['set_value', 'text'], ...) in one script call; values of the steps
+        records = await get_async_driver().execute_script(RUN_PIPELINE, self._we, [list(step) for step in steps])
+        for (name, *_), (ok, value) in zip(steps, records or []):
+            if not ok:
+                raise VoltronException(f'"{self.__class__.__name__}" step "{name}" failed: {value}')
+        if len(records or []) < len(steps):
+            raise VoltronException(f'"{self.__class__.__name__}" step "{steps[len(records or [])][0]}" did not run')
+        return [value for _, value in records]
+
+    async def _name(self):
+        if self._prefetched is not None and self._prefetched.name is not None:
+            return self._prefetched.name
+        if self._name_selector:
+            return await self._get_webelement_text(selector=self._name_selector, timeout=self._timeout)
+        return await self._get_webelement_text(we=self._we)
+
+    @property
+    def name(self):
+        return self._name()
+
+    async def scroll_to(self):
+        await self.scroll_to_we()
+
+    async def click(self):
+        await self.scroll_to_we()
+        try:
+            await self.perform_click()
+        except WebDriverException as e:
+            raise VoltronException(f'Can not click on {self.__class__.__name__}. {e}')
+
+    async def perform_click(self, we=None):
+        self._logger.debug('*** User has clicked "%s". Call "%s.click" method', self.__class__.__name__,
+                           self.__class__.__name__)
+        we = we if we else self._we
+        try:
+            await we.click()
+        except WebDriverException:
+            await get_async_driver().execute_script(CLICK, we)
+
+    async def is_displayed(self, expected_result=True, timeout=1, poll_interval=0.5, name=None, scroll_to=True,
+                           bypass_exceptions=(NoSuchElementException, StaleElementReferenceException)) -> bool:
+        if not name:
+            name = f'"{self.__class__.__name__}" displayed status is: {expected_result}'
+        if scroll_to:
+            await self.scroll_to_we()
+        return await wait_for_result(lambda: self._we.is_displayed(),
+                                     expected_result=expected_result,
+                                     timeout=timeout,
+                                     poll_interval=poll_interval,
+                                     bypass_exceptions=bypass_exceptions,
+                                     name=name)
+
+    async def is_selected(self, expected_result=True, timeout=2, poll_interval=0.5, name=None) -> bool:
+        if not name:
+            name = f'"{self.__class__.__name__}" selected status is: {expected_result}'
+
+        async def _is_selected():
+            return 'active' in ((await self.get_attribute('class')) or '').strip(' ').split(' ')
+
+        return await wait_for_result(_is_selected,
+                                     expected_result=expected_result,
+                                     timeout=timeout,
+                                     poll_interval=poll_interval,
+                                     name=name)
+
+    async def is_enabled(self, expected_result=True, timeout=1, poll_interval=0.5, name=None,
+                         bypass_exceptions=(NoSuchElementException, StaleElementReferenceException, TypeError)) -> bool:
+        if not name:
+            name = f'"{self.__class__.__name__}" enabled status is: {expected_result}'
+
+        async def _is_enabled(we):
+            if await we.get_attribute('disabled') is not None:
+                return False
+            return 'disabled' not in ((await we.get_attribute('class')) or '').strip(' ').split(' ')
+
+        return await wait_for_result(lambda: _is_enabled(we=self._we),
+                                     expected_result=expected_result,
+                                     timeout=timeout,
+                                     poll_interval=poll_interval,
+                                     name=name,
+                                     bypass_exceptions=bypass_exceptions)
+
+    async def scroll_to_we(self, web_element=None):
+        await scroll_to_center_of_element(self._we if web_element is None else web_element)
+
+    async def get_attribute(self, attribute):
+        if self._prefetched is not None and attribute in self._prefetched.attributes:
+            return self._prefetched.attributes[attribute]
+        result = await self._we.get_attribute(attribute)
+        self._logger.debug('*** Found attribute "%s" for %s', result, self.__class__.__name__)
+        return result
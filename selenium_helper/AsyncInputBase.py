@@ -0,0 +1,95 @@
+import asyncio
+import random
+
+from selenium.common import InvalidElementStateException, ElementNotInteractableException
+
+from selenium_helper.AsyncComponentBase import AsyncComponentBase
+from selenium_helper.InputBase import TYPING_BULK, TYPING_CHUNKED, TYPING_PER_CHAR, TYPING_CDP, _has_special_keys
+from selenium_helper.async_globals import wait_for_result, get_async_driver
+from selenium_helper.globals import VoltronException
+from selenium_helper.scripts import GET_VALUE, SET_VALUE, FOCUS
+
+
+async def get_value(web_element):
+    return await get_async_driver().execute_script(GET_VALUE, web_element)
+
+
+async def set_value(_we, param):
+    await get_async_driver().execute_script(SET_VALUE, _we, param)
+
+
+class AsyncInputBase(AsyncComponentBase):
+    _send_keys_delay = 0.1
+    _typing_mode = TYPING_BULK
+    _chunk_size = 8
+    _chunk_jitter = (0.02, 0.08)
+
+    async def _value(self):
+        await self.scroll_to_we()
+        return await wait_for_result(lambda: get_value(self._we),
+                                     timeout=0.6,
+                                     name='Value to appear')
+
+    @property
+    def value(self):
+        return self._value()
+
+    async def set_value(self, value):
+        value = str(value)
+        # Scroll and clear, typing, then blur and read-back: three round-trips whatever the typing mode
+        await self._run_steps(['scroll'], ['set_value', ''])
+        try:
+            await self.send_keys(value)
+        except (InvalidElementStateException, ElementNotInteractableException):
+            self._logger.debug('*** Input "%s" is not typeable, value will be set by script', self.__class__.__name__)
+        self._logger.debug('*** User has set "%s" on Input. Call of "%s"', value, self.__class__.__name__)
+        # Leaving the field commits it like SHIFT+TAB did; the typed value is checked before any script write
+        typed = (await self._run_steps(['blur'], ['value']))[-1]
+        if str(typed) == value:
+            return
+        self._logger.warning('*** Typing into %s gave "%s" instead of "%s", setting it by script',
+                             self.__class__.__name__, typed, value)
+        actual = (await self._run_steps(['set_value', value]))[-1]
+        if str(actual) != value:
+            self._logger.warning('*** %s value is "%s" instead of "%s"', self.__class__.__name__, actual, value)
+
+    @property
+    def placeholder(self):
+        return self.get_attribute('placeholder')
+
+    async def clear(self):
+        await set_value(self._we, '')
+        if await get_value(self._we):
+            await self._we.clear()
+
+    async def send_keys(self, keys, delay=_send_keys_delay, mode=None):
+        keys = str(keys)
+        mode = self._typing_mode if mode is None else mode
+        if mode == TYPING_BULK:
+            await self._we.send_keys(keys)
+        elif mode == TYPING_CHUNKED:
+            for start in range(0, len(keys), self._chunk_size):
+                await self._we.send_keys(keys[start:start + self._chunk_size])
+                await asyncio.sleep(random.uniform(*self._chunk_jitter))
+        elif mode == TYPING_PER_CHAR:
+            for symbol in keys:
+                await self._we.send_keys(symbol)
+                await asyncio.sleep(delay)
+        elif mode == TYPING_CDP:
+            if _has_special_keys(keys):
+                await self._we.send_keys(keys)
+            else:
+                driver = get_async_driver()
+                await driver.execute_script(FOCUS, self._we)
+                await driver.execute_cdp_cmd('Input.insertText', {'text': keys})
+        else:
+            raise VoltronException(f'Unknown typing mode "{mode}"')
+
+    async def is_active(self, expected_result=True, timeout=1):
+        async def _is_active():
+            return await self._we.is_displayed() and await self._we.is_enabled()
+
+        return await wait_for_result(_is_active,
+                                     expected_result=expected_result,
+                                     timeout=timeout,
+                                     name=f'Amount input active status to be "{expected_result}"')
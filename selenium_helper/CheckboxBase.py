@@ -1,9 +1,9 @@
 from selenium_helper.ComponentBase import ComponentBase
-from selenium_helper.globals import VoltronException
+from selenium_helper.globals import VoltronException, compile_selector
 
 
 class CheckBoxBase(ComponentBase):
-    _input = 'xpath=.//input'
+    _input = compile_selector('xpath=.//input')
 
     @property
     def value(self):
@@ -24,9 +24,8 @@ class CheckBoxBase(ComponentBase):
 
         if self.value != value:
             if self.is_enabled():
-                self._logger.debug(
-                    f'*** User has set "{value}" on CheckBox. Call of "{self.__class__.__name__}"'
-                )
+                self._logger.debug('*** User has set "%s" on CheckBox. Call of "%s"', value,
+                                   self.__class__.__name__)
                 self.click()
             else:
                 raise VoltronException('CheckBox is disabled so can\'t be clicked')
\ No newline at end of file
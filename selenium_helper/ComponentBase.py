@@ -1,32 +1,64 @@
+import copy
 import logging
 from collections import OrderedDict
+from typing import NamedTuple, Optional
 
 from selenium.common import NoSuchElementException, StaleElementReferenceException, WebDriverException
+from selenium.webdriver.remote.webelement import WebElement
 
-from selenium_helper.globals import get_driver, parse_pattern, find_element, VoltronException, find_elements, wait_for_result
+from selenium_helper import globals as voltron_globals
+from selenium_helper.globals import get_driver, parse_pattern, find_element, VoltronException, find_elements, \
+    wait_for_result, parse_selector, navigation_generation
+from selenium_helper.scripts import SCROLL_TO_CENTER, HARVEST_ITEMS, COUNT_ITEMS, SCROLL_TO_BOTTOM, SCROLL_TO_TOP, \
+    FIND_ITEM_BY_NAME
+from selenium_helper.pipeline import ActionPipeline, PipelineError
 
 
 def scroll_to_center_of_element(web_element):
-    get_driver().execute_script("return arguments[0].scrollIntoView({ behavior: 'instant', block: 'center' });",
-                                web_element)
+    get_driver().execute_script(SCROLL_TO_CENTER, web_element)
+
+
+def normalize_item_name(name) -> str:
+    return ' '.join((name or '').split()).upper()
+
+
+class HarvestedItem(NamedTuple):
+    element: WebElement
+    visible: bool
+    name: Optional[str]
+    attributes: dict
 
 
 class ComponentBase(object):
     _context_timeout = 15
     _pattern_values = {}
     _list_item_type = None
+    # List items are collected with one script call; set False to fall back to per-element WebDriver calls
+    _harvest_in_batch = True
+    _scroll_to_items = False
+    # Declared on list item types: selector of the name text and attributes pre-fetched by batched harvesting
+    _name_selector = None
+    _harvest_attributes = ()
+    # Seconds a name -> element handle found by find_item or harvesting stays reusable
+    _item_index_ttl = 2.0
+    # click() is a native (trusted) click with a script click fallback; False clicks in the scroll script instead,
+    # one round-trip less, for elements whose handlers do not check event.isTrusted
+    _trusted_click = True
 
     def __init__(self, selector='', context=None, web_element=None, timeout=_context_timeout, pattern_values=None,
+                 prefetched=None,
                  *args,
                  **kwargs):
         self._item = None
+        self._item_index = {}
+        self._prefetched = prefetched
         self._logger = logging.getLogger('voltron_logger')
         self._args, self._kwargs = args, kwargs
         self._context = context if context is not None else get_driver()
         self._selector = selector
         self._timeout = timeout
         if isinstance(pattern_values, dict):
-            self._pattern_values.update(pattern_values)
+            self._pattern_values = {**self._pattern_values, **pattern_values}
         if web_element is not None:
             self._we = web_element
         else:
@@ -65,8 +97,8 @@ class ComponentBase(object):
 
     def wait_for_element_disappear(self, we=None, timeout=10):
         if we is None:
-            self._logger.warning(
-                f'*** Nothing passed to wait for element disappear function "{self.__class__.__name__}"')
+            self._logger.warning('*** Nothing passed to wait for element disappear function "%s"',
+                                 self.__class__.__name__)
             we = self._we
 
         def check_disappear(webelement):
@@ -82,11 +114,11 @@ class ComponentBase(object):
 
     def scroll_to_bottom(self):
         drv = get_driver()
-        drv.execute_script("window.scrollTo(0,document.body.scrollHeight);")
+        drv.execute_script(SCROLL_TO_BOTTOM)
 
     def scroll_to_top(self):
         drv = get_driver()
-        drv.execute_script("window.scrollTo(0,0);")
+        drv.execute_script(SCROLL_TO_TOP)
 
     def _get_webelement_text(self, selector='', we=None, context=None, pattern_values=None, timeout=0) -> str:
         try:
@@ -106,13 +138,41 @@ class ComponentBase(object):
         except Exception as err:
             raise VoltronException(f'Error getting WebElement text. Exception string: "{err}"')
 
+    @property
+    def is_safari(self) -> bool:
+        capabilities = getattr(get_driver(), 'capabilities', None) or {}
+        return capabilities.get('browserName', '').lower() == 'safari'
+
+    @property
+    def is_snapshot(self) -> bool:
+        return getattr(self._we, 'is_snapshot', False)
+
+    def snapshot(self):
+        # Read-only copy of the component backed by one capture of its outerHTML: text, attributes, items and
+        # counts are then answered locally, without WebDriver calls
+        # lxml is only needed by components that use snapshots
+        from selenium_helper.snapshot import DomSnapshot
+        if self.is_snapshot:
+            return self
+        return self._with_element(DomSnapshot.capture(self._we).root)
+
+    def live(self):
+        # Same component backed by the live element again, for interactions
+        return self._with_element(self._we.live()) if self.is_snapshot else self
+
+    def _with_element(self, element):
+        component = copy.copy(self)
+        component._we = element
+        component._item_index = {}
+        return component
+
     def _we_text(self, we):
         try:
             if self.is_safari:
                 return we.get_attribute('innerText').strip('\n').strip()
             else:
                 return we.text
-        except Exception as err:
+        except Exception:
             return we.get_attribute('innerText').strip('\n').strip()
 
     def _wait_for_not_empty_web_element_text(self, selector='', we=None, context=None, pattern_values=None, name=None,
@@ -121,96 +181,222 @@ class ComponentBase(object):
                                name=name if name else f'Waiting while text of {selector} is not empty',
                                timeout=timeout)
 
+    def _harvest_items(self, limit=None, timeout=None) -> list:
+        timeout = self._timeout if timeout is None else timeout
+        if not self._harvest_in_batch:
+            return self._harvest_items_one_by_one(limit=limit, timeout=timeout)
+        by, value = parse_selector(self._item)
+        item_type = self._list_item_type
+        name_selector = getattr(item_type, '_name_selector', None)
+        name_by, name_value = parse_selector(name_selector) if name_selector else (None, None)
+        attributes = list(getattr(item_type, '_harvest_attributes', ()))
+        if self.is_snapshot:
+            records = [HarvestedItem(*record) for record in
+                       self._we.harvest(by, value, name_by, name_value, attributes, limit)]
+            self._index_items(records)
+            return records
+        records = wait_for_result(
+            lambda: get_driver().execute_script(HARVEST_ITEMS, self._we, by, value, name_by, name_value, attributes,
+                                                limit),
+            name=f'Waiting for {self.__class__.__name__} items to exist by selector {self._item}',
+            bypass_exceptions=(NoSuchElementException, StaleElementReferenceException, WebDriverException),
+            timeout=timeout)
+        records = [HarvestedItem(*record) for record in records or []]
+        self._index_items(records)
+        return records
+
+    def _harvest_items_one_by_one(self, limit=None, timeout=None) -> list:
+        items_we = self._find_elements_by_selector(selector=self._item, context=self._we, timeout=timeout)
+        return [HarvestedItem(item_we, item_we.is_displayed(), None, {}) for item_we in items_we[:limit]]
+
+    def _build_item(self, record: HarvestedItem, scroll=False):
+        list_item = self._list_item_type(web_element=record.element, prefetched=record)
+        if scroll:
+            list_item.scroll_to()
+        return list_item
+
+    def _build_items_as_ordered_dict(self, records, scroll=None) -> OrderedDict:
+        scroll = self._scroll_to_items if scroll is None else scroll
+        self._logger.debug('*** Found %d %s - %s items', len(records), self.__class__.__name__,
+                           self._list_item_type.__name__)
+        items_ordered_dict = OrderedDict()
+        for record in records:
+            list_item = self._build_item(record, scroll=scroll)
+            items_ordered_dict.update({list_item.name: list_item})
+        return items_ordered_dict
+
     @property
     def items(self):
-        items_we = self._find_elements_by_selector(selector=self._item, context=self._we, timeout=self._timeout)
-        self._logger.debug(
-            f'*** Found {len(items_we)} {self.__class__.__name__} - {self._list_item_type.__name__} items')
-        items_array = []
-        for item_we in items_we:
-            if item_we.is_displayed():
-                item_component = self._list_item_type(web_element=item_we)
-                items_array.append(item_component)
-        return items_array
+        records = self._harvest_items()
+        self._logger.debug('*** Found %d %s - %s items', len(records), self.__class__.__name__,
+                           self._list_item_type.__name__)
+        return [self._build_item(record, scroll=self._scroll_to_items) for record in records if record.visible]
 
     @property
     def items_names(self):
-        return list(self.items_as_ordered_dict.keys())
+        return list(self._build_items_as_ordered_dict(self._harvest_items(), scroll=False).keys())
+
+    def _index_items(self, records):
+        if not self._item_index_ttl:
+            return
+        now = voltron_globals.monotonic()
+        generation = navigation_generation()
+        # A fresh harvest replaces whatever the index held, so it never outgrows the list
+        self._item_index = {key: entry for key, entry in self._item_index.items()
+                            if key[1] and entry[1] == generation and entry[2] > now}
+        for record in records:
+            if record.name is not None:
+                self._item_index.setdefault((normalize_item_name(record.name), False),
+                                            (record, generation, now + self._item_index_ttl))
+
+    def _indexed_item(self, key) -> Optional[HarvestedItem]:
+        entry = self._item_index.get(key)
+        if entry is None:
+            return None
+        record, generation, expires = entry
+        if voltron_globals.monotonic() >= expires or generation != navigation_generation():
+            del self._item_index[key]
+            return None
+        return record
+
+    def _indexed_names(self) -> list:
+        # Names already known from earlier lookups, for error messages that must not trigger another harvest
+        return [record.name for record, _, _ in self._item_index.values()]
+
+    def _query_item(self, key) -> Optional[HarvestedItem]:
+        by, value = parse_selector(self._item)
+        name_selector = getattr(self._list_item_type, '_name_selector', None)
+        name_by, name_value = parse_selector(name_selector) if name_selector else (None, None)
+        if self.is_snapshot:
+            expected, prefix = key
+            return next((record for record in map(HarvestedItem._make, self._we.harvest(
+                by, value, name_by, name_value, (), None))
+                         if (normalize_item_name(record.name).startswith(expected) if prefix
+                             else normalize_item_name(record.name) == expected)), None)
+        found = get_driver().execute_script(FIND_ITEM_BY_NAME, self._we, by, value, name_by, name_value, *key)
+        if not found:
+            return None
+        record = HarvestedItem(found[0], True, found[1], {})
+        if self._item_index_ttl:
+            self._item_index[key] = (record, navigation_generation(),
+                                     voltron_globals.monotonic() + self._item_index_ttl)
+        return record
+
+    def _find_item_record(self, item_name, prefix=False, timeout=5) -> Optional[HarvestedItem]:
+        key = (normalize_item_name(item_name), prefix)
+        record = self._indexed_item(key)
+        if record is not None:
+            return record
+        return wait_for_result(lambda: self._query_item(key),
+                               name=f'Specified "{item_name}" to appear between items',
+                               bypass_exceptions=(
+                                   NoSuchElementException, StaleElementReferenceException, WebDriverException),
+                               timeout=timeout)
 
-    def click_item(self, item_name: str, timeout: int = 5):
+    def find_item(self, item_name: str, prefix=False, timeout: int = 5):
+        # Looks up one item by its name (exact or prefix, case and whitespace insensitive) with a single script
+        # call per poll, whatever the length of the list
         if not item_name:
             raise VoltronException('Item name was not specified')
-
-        item_found = wait_for_result(lambda: next((item for item_name_, item in self.items_as_ordered_dict.items()
-                                                   if item_name_.upper().strip() == item_name.upper()), None),
-                                     timeout=timeout,
-                                     name=f'Specified "{item_name}" to appear between items')
+        if not self._harvest_in_batch:
+            normalized = normalize_item_name(item_name)
+            return wait_for_result(
+                lambda: next((item for item_name_, item in self.items_as_ordered_dict.items()
+                              if (normalize_item_name(item_name_).startswith(normalized) if prefix
+                                  else normalize_item_name(item_name_) == normalized)), None),
+                timeout=timeout,
+                name=f'Specified "{item_name}" to appear between items')
+        record = self._find_item_record(item_name, prefix=prefix, timeout=timeout)
+        return self._build_item(record) if record else None
+
+    def click_item(self, item_name: str, timeout: int = 5, prefix=False):
+        item_found = self.find_item(item_name, prefix=prefix, timeout=timeout)
         if not item_found:
-            raise VoltronException(
-                f'"{self.__class__.__name__}" item: "{item_name}" not found in items list: {self.items_names}')
-        item_found.click()
+            raise VoltronException(f'"{self.__class__.__name__}" item: "{item_name}" not found in items list: '
+                                   f'{self._indexed_names()}')
+        try:
+            item_found.click()
+        except StaleElementReferenceException:
+            # The indexed handle belongs to a re-rendered list; look the item up again once
+            self._item_index.pop((normalize_item_name(item_name), prefix), None)
+            item_found = self.find_item(item_name, prefix=prefix, timeout=timeout)
+            if not item_found:
+                raise VoltronException(f'"{self.__class__.__name__}" item: "{item_name}" disappeared from items list')
+            item_found.click()
 
     @property
     def has_items(self):
-        items_we = self._find_elements_by_selector(selector=self._item, context=self._we, timeout=self._timeout)
-        return bool(items_we)
+        return bool(self.count_of_items)
 
     @property
     def first_item(self):
-        item_we = self._find_element_by_selector(selector=self._item, context=self._we, timeout=self._timeout)
-        if not item_we:
+        records = self._harvest_items(limit=1)
+        if not records:
             return (None, None)
-        list_item = self._list_item_type(web_element=item_we)
+        list_item = self._build_item(records[0])
         return (list_item.name, list_item)
 
-    def n_items_as_ordered_dict(self, no_of_items=5) -> OrderedDict:
-        items_we = self._find_elements_by_selector(selector=self._item, context=self._we, timeout=self._timeout)
-        self._logger.debug(
-            f'*** Found {len(items_we)} {self.__class__.__name__} - {self._list_item_type.__name__} items')
-        n_items_ordered_dict = OrderedDict()
-        for item_we in items_we[:no_of_items]:
-            list_item = self._list_item_type(web_element=item_we)
-            list_item.scroll_to()
-            n_items_ordered_dict.update({list_item.name: list_item})
-        return n_items_ordered_dict
+    def n_items_as_ordered_dict(self, no_of_items=5, scroll=None) -> OrderedDict:
+        return self._build_items_as_ordered_dict(self._harvest_items(limit=no_of_items), scroll=scroll)
 
     @property
     def count_of_items(self):
-        return len(self._find_elements_by_selector(selector=self._item, context=self._we, timeout=self._timeout))
+        if not self._harvest_in_batch:
+            return len(self._find_elements_by_selector(selector=self._item, context=self._we, timeout=self._timeout))
+        by, value = parse_selector(self._item)
+        if self.is_snapshot:
+            return len(self._we.find_elements(by, value))
+        count = wait_for_result(lambda: get_driver().execute_script(COUNT_ITEMS, self._we, by, value),
+                                name=f'Waiting for {self.__class__.__name__} items to exist by selector {self._item}',
+                                bypass_exceptions=(
+                                    NoSuchElementException, StaleElementReferenceException, WebDriverException),
+                                timeout=self._timeout)
+        return count or 0
 
     @property
     def items_as_ordered_dict(self) -> OrderedDict:
-        items_we = self._find_elements_by_selector(selector=self._item, context=self._we, timeout=self._timeout)
-        self._logger.debug(
-            f'*** Found {len(items_we)} {self.__class__.__name__} - {self._list_item_type.__name__} items')
-        items_ordered_dict = OrderedDict()
-        for item_we in items_we:
-            list_item = self._list_item_type(web_element=item_we)
-            list_item.scroll_to()
-            items_ordered_dict.update({list_item.name: list_item})
-        return items_ordered_dict
+        return self._build_items_as_ordered_dict(self._harvest_items())
+
+    @property
+    def name(self):
+        if self._prefetched is not None and self._prefetched.name is not None:
+            return self._prefetched.name
+        if self._name_selector:
+            return self._get_webelement_text(selector=self._name_selector, timeout=self._timeout)
+        return self._get_webelement_text(we=self._we)
 
     def scroll_to(self):
         self.scroll_to_we()
 
+    def pipeline(self) -> ActionPipeline:
+        if self.is_snapshot:
+            # Interactions need the live element; the component keeps using it from now on
+            self._we = self._we.live()
+        return ActionPipeline(self._we, owner=self.__class__.__name__)
+
     def click(self):
-        self.scroll_to_we()
+        # The button text is only read for debug logging, in the same script as the scroll
+        label = self._logger.isEnabledFor(logging.DEBUG)
+        pipeline = self.pipeline().scroll()
+        if label:
+            pipeline.read_text()
         try:
-            self.perform_click()
-        except WebDriverException as e:
+            results = pipeline.click(trusted=self._trusted_click).run()
+        except StaleElementReferenceException:
+            # Callers such as click_item look the element up again
+            raise
+        except (WebDriverException, PipelineError) as e:
             raise VoltronException(f'Can not click on {self.__class__.__name__}. {e}')
+        if label:
+            self._logger.debug('*** User has clicked "%s" button. Call "%s.click" method', results[1].value,
+                               self.__class__.__name__)
 
     def perform_click(self, we=None):
-        self._logger.debug(
-            f'*** User has clicked "{self._we.text}" button. Call "{self.__class__.__name__}.click" method'
-        )
-        we = we if we else self._we
-        try:
-            we.click()
-        except:
-            # This is JS Click
-            # Please Implement Javascript Click if Not Implemented
-            get_driver().execute_script("arguments[0].click()", self._we)
+        # Click without click()'s error wrapping; `we` defaults to the component's own element
+        self._logger.debug('*** User has clicked "%s". Call "%s.click" method', self.__class__.__name__,
+                           self.__class__.__name__)
+        pipeline = self.pipeline() if we is None else ActionPipeline(we, owner=self.__class__.__name__)
+        pipeline.scroll().click(trusted=self._trusted_click).run()
 
     def is_displayed(self, expected_result=True, timeout=1, poll_interval=0.5, name=None, scroll_to=True,
                      bypass_exceptions=(NoSuchElementException, StaleElementReferenceException)) -> bool:
@@ -265,13 +451,18 @@ class ComponentBase(object):
 
     def scroll_to_we(self, web_element=None):
         if web_element is None:
-            self._logger.debug(
-                f'*** Nothing passed to scroll function, scrolling to current web element "{self.__class__.__name__}"')
+            self._logger.debug('*** Nothing passed to scroll function, scrolling to current web element "%s"',
+                               self.__class__.__name__)
             web_element = self._we
+        if getattr(web_element, 'is_snapshot', False):
+            return
         # Use js to scroll to current web element
         scroll_to_center_of_element(web_element)
 
     def get_attribute(self, attribute):
-        result = self._we.get_attribute(attribute)
-        self._logger.debug(f'*** Found attribute "{result}" for {self.__class__.__name__}')
+        if self._prefetched is not None and attribute in self._prefetched.attributes:
+            result = self._prefetched.attributes[attribute]
+        else:
+            result = self._we.get_attribute(attribute)
+        self._logger.debug('*** Found attribute "%s" for %s', result, self.__class__.__name__)
         return result
@@ -0,0 +1,173 @@
+import difflib
+import json
+import os
+import re
+import threading
+from typing import NamedTuple
+
+from selenium.common import NoSuchElementException, StaleElementReferenceException, WebDriverException
+
+from selenium_helper.ComponentBase import ComponentBase
+from selenium_helper.globals import get_driver, wait_for_result, VoltronException
+from selenium_helper.scripts import DISCOVER_FORM_FIELDS, APPLY_FORM_VALUES, READ_FORM_VALUES
+
+_LABEL_NOISE_RE = re.compile(r'[^\w\s+#]')
+_TRUE_ANSWERS = {'yes', 'y', 'true', 'on', '1', 'checked'}
+_FALSE_ANSWERS = {'no', 'n', 'false', 'off', '0', 'unchecked', ''}
+
+
+def normalize_label(label) -> str:
+    # "Years of experience with React? *" -> "years of experience with react"
+    return ' '.join(_LABEL_NOISE_RE.sub(' ', (label or '').lower()).split())
+
+
+class FormField(NamedTuple):
+    elements: list
+    kind: str
+    label: str
+    name: str
+    value: object
+    options: list
+    required: bool
+
+
+class FillResult(NamedTuple):
+    filled: dict
+    unanswered: list
+    mismatched: dict
+
+    @property
+    def complete(self) -> bool:
+        return not self.mismatched and not any(field.required for field in self.unanswered)
+
+
+class AnswerCache(object):
+    # Answers by normalized question label, kept in a JSON file. Lookups fall back to the closest known label
+    # (difflib ratio >= cutoff), so small wording changes between employers' forms still find the answer.
+
+    def __init__(self, path='answers.json', cutoff=0.8):
+        self._path = path
+        self._cutoff = cutoff
+        self._lock = threading.Lock()
+        self._dirty = False
+        try:
+            with open(path, encoding='utf-8') as answers_file:
+                self._answers = {normalize_label(label): answer for label, answer in json.load(answers_file).items()}
+        except FileNotFoundError:
+            self._answers = {}
+
+    def __len__(self):
+        return len(self._answers)
+
+    def get(self, label, default=None):
+        key = normalize_label(label)
+        if key in self._answers:
+            return self._answers[key]
+        match = difflib.get_close_matches(key, self._answers.keys(), n=1, cutoff=self._cutoff)
+        return self._answers[match[0]] if match else default
+
+    def set(self, label, answer):
+        key = normalize_label(label)
+        with self._lock:
+            if key not in self._answers or self._answers[key] != answer:
+                self._answers[key] = answer
+                self._dirty = True
+
+    def update(self, answers: dict):
+        for label, answer in answers.items():
+            self.set(label, answer)
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            temporary = f'{self._path}.tmp'
+            with open(temporary, 'w', encoding='utf-8') as answers_file:
+                json.dump(self._answers, answers_file, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(temporary, self._path)
+            self._dirty = False
+
+
+def _as_bool(answer):
+    # Checkbox answers from JSON or a form may be strings: "No" must not check the box. None when unrecognized.
+    if isinstance(answer, bool):
+        return answer
+    if isinstance(answer, (int, float)):
+        return bool(answer)
+    text = str(answer).strip().lower()
+    if text in _TRUE_ANSWERS:
+        return True
+    if text in _FALSE_ANSWERS:
+        return False
+    return None
+
+
+def _matches(actual, expected, kind) -> bool:
+    if kind == 'checkbox':
+        return bool(actual) is expected
+    return str(actual if actual is not None else '').strip().lower() == str(expected).strip().lower()
+
+
+class FormFillBase(ComponentBase):
+    # One step of a form: fields are discovered, filled and verified with three script calls whatever their number
+
+    def fields(self, timeout=None) -> list:
+        # Only a failing call (the step still rendering) is retried: an empty list is a form without fields, so it
+        # is wrapped to count as a result instead of being waited out
+        found = wait_for_result(lambda: (get_driver().execute_script(DISCOVER_FORM_FIELDS, self._we),),
+                                name=f'Waiting for {self.__class__.__name__} form fields',
+                                bypass_exceptions=(
+                                    NoSuchElementException, StaleElementReferenceException, WebDriverException),
+                                timeout=self._timeout if timeout is None else timeout)
+        records = found[0] if found else None
+        return [FormField(*record) for record in records or []]
+
+    @staticmethod
+    def _lookup(answers):
+        if isinstance(answers, AnswerCache):
+            return answers.get
+        normalized = {normalize_label(label): answer for label, answer in (answers or {}).items()}
+        return lambda label: normalized.get(normalize_label(label))
+
+    def fill(self, answers, overrides: dict = None, strict=False) -> FillResult:
+        # answers: AnswerCache or {label: answer}; checkboxes take booleans (or yes/no strings), selects and radio
+        # groups the option text or value, other fields strings. With an AnswerCache, every verified answer is
+        # remembered under the field's label and saved, so overrides and fuzzy matches are found directly next time.
+        fields = self.fields()
+        lookups = (self._lookup(overrides), self._lookup(answers))
+        planned, unanswered, verified = [], [], {}
+        for field in fields:
+            answer = next((found for found in (lookup(field.label) for lookup in lookups) if found is not None), None)
+            if answer is not None and field.kind == 'checkbox':
+                answer = _as_bool(answer)
+            if answer is None:
+                unanswered.append(field)
+            elif not _matches(field.value, answer, field.kind):
+                planned.append((field, answer))
+            else:
+                verified[field.label] = answer
+        if planned:
+            get_driver().execute_script(APPLY_FORM_VALUES,
+                                        [[field.elements, field.kind, answer] for field, answer in planned])
+            actual = get_driver().execute_script(READ_FORM_VALUES,
+                                                 [[field.elements, field.kind] for field, _ in planned])
+        else:
+            actual = []
+        filled, mismatched = {}, {}
+        for (field, answer), value in zip(planned, actual):
+            if _matches(value, answer, field.kind):
+                filled[field.label] = value
+                verified[field.label] = answer
+            else:
+                mismatched[field.label] = (answer, value)
+        self._logger.debug('*** %s filled %d of %d fields, %d unanswered, %d mismatched', self.__class__.__name__,
+                           len(filled), len(fields), len(unanswered), len(mismatched))
+        if isinstance(answers, AnswerCache) and verified:
+            answers.update(verified)
+            answers.save()
+        result = FillResult(filled, unanswered, mismatched)
+        if strict and not result.complete:
+            raise VoltronException(
+                f'"{self.__class__.__name__}" form is incomplete: unanswered '
+                f'{[field.label for field in unanswered if field.required]}, mismatched {mismatched}')
+        return result
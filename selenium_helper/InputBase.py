@@ -1,28 +1,36 @@
-from time import sleep
+import random
 
 from selenium.common import InvalidElementStateException, ElementNotInteractableException
-from selenium.webdriver import Keys
 
 from selenium_helper.ComponentBase import ComponentBase
-from selenium_helper.globals import wait_for_result, get_driver
+from selenium_helper.globals import wait_for_result, get_driver, pause, VoltronException
+from selenium_helper.scripts import FOCUS, GET_VALUE, SET_VALUE
+
+TYPING_BULK = 'bulk'
+TYPING_CHUNKED = 'chunked'
+TYPING_PER_CHAR = 'per_char'
+TYPING_CDP = 'cdp'
 
 
 def get_value(web_element):
-    return get_driver().execute_script("return arguments[0].value;", web_element)
+    return get_driver().execute_script(GET_VALUE, web_element)
 
 
 def set_value(_we, param):
-    script = """
-    arguments[0].setAttribute('value', arguments[1]);
-    arguments[0].value = arguments[1];
-    arguments[0].dispatchEvent(new Event('change'));
-    """
     driver = get_driver()
-    driver.execute_script(script, _we, param)
+    driver.execute_script(SET_VALUE, _we, param)
+
+
+def _has_special_keys(keys: str) -> bool:
+    # selenium Keys are private-use unicode code points that Input.insertText would type literally
+    return any('\ue000' <= symbol <= '\ue0ff' for symbol in keys)
 
 
 class InputBase(ComponentBase):
     _send_keys_delay = 0.1
+    _typing_mode = TYPING_BULK
+    _chunk_size = 8
+    _chunk_jitter = (0.02, 0.08)
 
     @property
     def value(self):
@@ -34,25 +42,23 @@ class InputBase(ComponentBase):
 
     @value.setter
     def value(self, value):
-        self.scroll_to_we()
-        driver = get_driver()
-        try:
-            self._we.clear()
-            self.send_keys(str(value))
-        except (InvalidElementStateException, ElementNotInteractableException):
-            driver.execute_script("arguments[0].value='';arguments[0]", self._we)
-            driver.execute_script(f"arguments[0].value={value};arguments[0].dispatchEvent(new Event('change'));",
-                                  self._we)
-        self._logger.debug(
-            f'*** User has set "{value}" on Input. Call of "{self.__class__.__name__}"'
-        )
+        value = str(value)
+        # Scroll and clear, typing, then blur and read-back: three round-trips whatever the typing mode
+        self.pipeline().scroll().set_value('').run()
         try:
-            self._we.send_keys(Keys.SHIFT + Keys.TAB)
+            self.send_keys(value)
         except (InvalidElementStateException, ElementNotInteractableException):
-            pass
-        wait_for_result(lambda: str(self.value) == str(value),
-                        timeout=1,
-                        name=f'{self.__class__.__name__} value to appear')
+            self._logger.debug('*** Input "%s" is not typeable, value will be set by script', self.__class__.__name__)
+        self._logger.debug('*** User has set "%s" on Input. Call of "%s"', value, self.__class__.__name__)
+        # Leaving the field commits it like SHIFT+TAB did; the typed value is checked before any script write
+        typed = self.pipeline().blur().read_value().run()[-1].value
+        if str(typed) == value:
+            return
+        self._logger.warning('*** Typing into %s gave "%s" instead of "%s", setting it by script',
+                             self.__class__.__name__, typed, value)
+        actual = self.pipeline().set_value(value).run()[-1].value
+        if str(actual) != value:
+            self._logger.warning('*** %s value is "%s" instead of "%s"', self.__class__.__name__, actual, value)
         # try:
         #     if tests.settings.device_type == 'mobile' and tests.use_browser_stack:
         #         get_driver().hide_keyboard()
@@ -69,10 +75,28 @@ class InputBase(ComponentBase):
         if value:
             self._we.clear()
 
-    def send_keys(self, keys, delay=_send_keys_delay):
-        for symbol in str(keys):
-            self._we.send_keys(symbol)
-            sleep(delay)
+    def send_keys(self, keys, delay=_send_keys_delay, mode=None):
+        keys = str(keys)
+        mode = self._typing_mode if mode is None else mode
+        if mode == TYPING_BULK:
+            self._we.send_keys(keys)
+        elif mode == TYPING_CHUNKED:
+            for start in range(0, len(keys), self._chunk_size):
+                self._we.send_keys(keys[start:start + self._chunk_size])
+                pause(random.uniform(*self._chunk_jitter))
+        elif mode == TYPING_PER_CHAR:
+            for symbol in keys:
+                self._we.send_keys(symbol)
+                pause(delay)
+        elif mode == TYPING_CDP:
+            if _has_special_keys(keys):
+                self._we.send_keys(keys)
+            else:
+                driver = get_driver()
+                driver.execute_script(FOCUS, self._we)
+                driver.execute_cdp_cmd('Input.insertText', {'text': keys})
+        else:
+            raise VoltronException(f'Unknown typing mode "{mode}"')
 
     def is_active(self, expected_result=True, timeout=1):
         return wait_for_result(lambda: self._we.is_displayed() and self._we.is_enabled(),
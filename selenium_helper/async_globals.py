@@ -0,0 +1,109 @@
+import asyncio
+import inspect
+import logging
+import sys
+from contextvars import ContextVar
+from time import monotonic
+
+from selenium.common import NoSuchElementException, StaleElementReferenceException, WebDriverException, \
+    InvalidSelectorException
+
+from selenium_helper.async_webdriver import AsyncWebDriver
+from selenium_helper.globals import VoltronException, GeneralException, parse_selector
+
+_logger = logging.getLogger(name='voltron_logger')
+_current_driver = ContextVar('voltron_async_driver', default=None)
+
+
+def set_async_driver(value: AsyncWebDriver):
+    # Binds the driver to the current asyncio task (and the tasks it spawns afterwards)
+    return _current_driver.set(value)
+
+
+def get_async_driver() -> AsyncWebDriver:
+    return _current_driver.get()
+
+
+async def wait_for_result(
+        func,
+        fargs=(),
+        fkwargs=None,
+        name=None,
+        poll_interval=0.5,
+        expected_result=True,
+        bypass_exceptions=(NoSuchElementException, StaleElementReferenceException),
+        timeout=30,
+        first_poll_interval=0.05,
+        backoff=1.5
+):
+    # Same contract as globals.wait_for_result; func may return an awaitable, sleeps yield to the event loop
+    if name is None:
+        name = func.__name__
+    if not fkwargs:
+        fkwargs = {}
+    if not isinstance(expected_result, bool):
+        raise VoltronException(f'Expected result should be True or False, instead it is {expected_result}')
+    result = None
+    started = monotonic()
+    time_to_stop = started + max(timeout, 0)
+    interval = min(first_poll_interval, poll_interval)
+    caller_name = sys._getframe(1).f_code.co_name
+    while True:
+        try:
+            value = func(*fargs, **fkwargs)
+            # Only a finished call replaces the result: a bypassed failure must not leave the awaitable behind
+            if inspect.isawaitable(value):
+                value = await value
+            result = value
+            if bool(result) is expected_result:
+                _logger.info('[%s] Condition "%s" succeed with result "%s" in %.3f sec',
+                             caller_name, name, bool(result), monotonic() - started)
+                return result
+        except bypass_exceptions as err:
+            _logger.debug('[%s] Overriding bypassed "%s" exception in WAIT with message:\n"%s"',
+                          caller_name, err.__class__.__name__, err)
+        remaining = time_to_stop - monotonic()
+        if remaining <= 0:
+            break
+        await asyncio.sleep(min(interval, remaining))
+        interval = min(interval * backoff, poll_interval)
+
+    _logger.debug('[%s] Failed waiting for condition "%s" to result "%s" in %.3f sec',
+                  caller_name, name, expected_result, monotonic() - started)
+    return result
+
+
+async def find_element(selector, context=None,
+                       bypass_exceptions=(NoSuchElementException, StaleElementReferenceException, WebDriverException),
+                       timeout=15):
+    context = context if context else get_async_driver()
+    (by, val) = parse_selector(selector)
+    try:
+        element = await context.find_element(by=by, value=val)
+    except InvalidSelectorException as e:
+        raise GeneralException(e.msg)
+    except (NoSuchElementException, WebDriverException):
+        return await wait_for_result(lambda: context.find_element(by=by, value=val),
+                                     name=f'Waiting for web element to exist by selector {selector}',
+                                     bypass_exceptions=bypass_exceptions,
+                                     timeout=timeout)
+    return element
+
+
+async def find_elements(selector, context=None,
+                        bypass_exceptions=(NoSuchElementException, StaleElementReferenceException, WebDriverException),
+                        timeout=15):
+    context = context if context else get_async_driver()
+    (by, val) = parse_selector(selector)
+    try:
+        elements = await context.find_elements(by=by, value=val)
+    except InvalidSelectorException as e:
+        raise VoltronException(e.msg)
+    except WebDriverException:
+        elements = None
+    if not elements:
+        elements = await wait_for_result(lambda: context.find_elements(by=by, value=val),
+                                         name=f'Waiting for web elements to exist by selector {selector}',
+                                         bypass_exceptions=bypass_exceptions,
+                                         timeout=timeout)
+    return [] if elements is None else elements
@@ -0,0 +1,179 @@
+import aiohttp
+from selenium.common import WebDriverException, NoSuchElementException, StaleElementReferenceException, \
+    InvalidSelectorException, JavascriptException, ElementNotInteractableException, InvalidElementStateException, \
+    TimeoutException
+from selenium.webdriver.common.by import By
+
+from selenium_helper.globals import ELEMENT_KEY
+
+_ERRORS = {
+    'no such element': NoSuchElementException,
+    'stale element reference': StaleElementReferenceException,
+    'invalid selector': InvalidSelectorException,
+    'javascript error': JavascriptException,
+    'element not interactable': ElementNotInteractableException,
+    'invalid element state': InvalidElementStateException,
+    'timeout': TimeoutException,
+    'script timeout': TimeoutException,
+}
+
+
+def to_w3c_locator(by, value):
+    # Same translation selenium's RemoteWebDriver does for the non-W3C strategies
+    if by == By.ID:
+        return By.CSS_SELECTOR, f'[id="{value}"]'
+    if by == By.NAME:
+        return By.CSS_SELECTOR, f'[name="{value}"]'
+    return by, value
+
+
+def create_http_session(limit=100, keepalive_timeout=60, timeout=120) -> aiohttp.ClientSession:
+    # One keep-alive connection pool can be shared by every AsyncWebDriver of the event loop
+    connector = aiohttp.TCPConnector(limit=limit, keepalive_timeout=keepalive_timeout)
+    return aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout))
+
+
+class AsyncWebElement(object):
+    __slots__ = ('_parent', 'id')
+
+    def __init__(self, parent, element_id):
+        self._parent = parent
+        self.id = element_id
+
+    @property
+    def parent(self):
+        return self._parent
+
+    def __eq__(self, other):
+        return isinstance(other, AsyncWebElement) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def __repr__(self):
+        return f'<AsyncWebElement {self.id}>'
+
+    async def _execute(self, method, command, payload=None):
+        return await self._parent.command(method, f'/element/{self.id}{command}', payload)
+
+    async def find_element(self, by=By.ID, value=None):
+        using, value = to_w3c_locator(by, value)
+        return await self._execute('POST', '/element', {'using': using, 'value': value})
+
+    async def find_elements(self, by=By.ID, value=None):
+        using, value = to_w3c_locator(by, value)
+        return await self._execute('POST', '/elements', {'using': using, 'value': value})
+
+    async def click(self):
+        await self._execute('POST', '/click', {})
+
+    async def clear(self):
+        await self._execute('POST', '/clear', {})
+
+    async def send_keys(self, *value):
+        text = ''.join(str(item) for item in value)
+        await self._execute('POST', '/value', {'text': text, 'value': list(text)})
+
+    async def get_text(self) -> str:
+        return await self._execute('GET', '/text')
+
+    async def get_attribute(self, name):
+        return await self._execute('GET', f'/attribute/{name}')
+
+    async def get_property(self, name):
+        return await self._execute('GET', f'/property/{name}')
+
+    async def is_displayed(self) -> bool:
+        return await self._execute('GET', '/displayed')
+
+    async def is_enabled(self) -> bool:
+        return await self._execute('GET', '/enabled')
+
+    async def is_selected(self) -> bool:
+        return await self._execute('GET', '/selected')
+
+
+class AsyncWebDriver(object):
+    # Minimal W3C WebDriver client speaking to chromedriver (or a Selenium grid) over a pooled aiohttp session
+
+    def __init__(self, executor_url, session_id, http: aiohttp.ClientSession, owns_http=False):
+        self._executor_url = executor_url.rstrip('/')
+        self.session_id = session_id
+        self._http = http
+        self._owns_http = owns_http
+
+    @classmethod
+    async def create(cls, executor_url, capabilities=None, http: aiohttp.ClientSession = None):
+        owns_http = http is None
+        http = http if http is not None else create_http_session()
+        payload = {'capabilities': {'alwaysMatch': capabilities or {'browserName': 'chrome'}}}
+        value = await cls._request(http, 'POST', f'{executor_url.rstrip("/")}/session', payload)
+        return cls(executor_url, value['sessionId'], http, owns_http=owns_http)
+
+    @staticmethod
+    async def _request(http, method, url, payload=None):
+        async with http.request(method, url, json=payload) as response:
+            body = await response.json(content_type=None)
+        value = body.get('value') if isinstance(body, dict) else None
+        if response.status >= 400 or (isinstance(value, dict) and 'error' in value):
+            error = value.get('error', '') if isinstance(value, dict) else ''
+            message = value.get('message', '') if isinstance(value, dict) else str(body)
+            raise _ERRORS.get(error, WebDriverException)(message)
+        return value
+
+    async def command(self, method, command, payload=None):
+        url = f'{self._executor_url}/session/{self.session_id}{command}'
+        value = await self._request(self._http, method, url, self._wrap(payload))
+        return self._unwrap(value)
+
+    def _wrap(self, value):
+        if isinstance(value, AsyncWebElement):
+            return {ELEMENT_KEY: value.id}
+        if isinstance(value, dict):
+            return {key: self._wrap(item) for key, item in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._wrap(item) for item in value]
+        return value
+
+    def _unwrap(self, value):
+        if isinstance(value, dict):
+            if ELEMENT_KEY in value:
+                return AsyncWebElement(self, value[ELEMENT_KEY])
+            return {key: self._unwrap(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self._unwrap(item) for item in value]
+        return value
+
+    async def get(self, url):
+        await self.command('POST', '/url', {'url': url})
+
+    async def current_url(self) -> str:
+        return await self.command('GET', '/url')
+
+    async def find_element(self, by=By.ID, value=None):
+        using, value = to_w3c_locator(by, value)
+        return await self.command('POST', '/element', {'using': using, 'value': value})
+
+    async def find_elements(self, by=By.ID, value=None):
+        using, value = to_w3c_locator(by, value)
+        return await self.command('POST', '/elements', {'using': using, 'value': value})
+
+    async def execute_script(self, script, *args):
+        return await self.command('POST', '/execute/sync', {'script': script, 'args': list(args)})
+
+    async def execute_async_script(self, script, *args):
+        return await self.command('POST', '/execute/async', {'script': script, 'args': list(args)})
+
+    async def execute_cdp_cmd(self, cmd, cmd_args=None):
+        # chromedriver's vendor endpoint, as selenium's ChromiumDriver.execute_cdp_cmd uses it
+        return await self.command('POST', '/goog/cdp/execute', {'cmd': cmd, 'params': cmd_args or {}})
+
+    async def set_script_timeout(self, timeout):
+        await self.command('POST', '/timeouts', {'script': int(timeout * 1000)})
+
+    async def quit(self):
+        try:
+            await self.command('DELETE', '')
+        finally:
+            if self._owns_http:
+                await self._http.close()
@@ -0,0 +1,105 @@
+import logging
+
+from selenium.common import StaleElementReferenceException
+
+from selenium_helper.globals import get_driver, navigation_generation
+
+_logger = logging.getLogger('voltron_logger')
+
+
+def _is_stale(err: BaseException) -> bool:
+    # ComponentBase re-raises WebDriver errors as VoltronException, so look through the exception chain
+    while err is not None:
+        if isinstance(err, StaleElementReferenceException):
+            return True
+        err = err.__cause__ or err.__context__
+    return False
+
+
+class SelfHealingComponent(object):
+    # Proxy around a component: any attribute read, write or method call that hits a stale element re-locates
+    # the component's own handle and retries once. If its context is gone too, the component is rebuilt.
+    __slots__ = ('_component', '_factory')
+
+    def __init__(self, component, factory):
+        object.__setattr__(self, '_component', component)
+        object.__setattr__(self, '_factory', factory)
+
+    @property
+    def component(self):
+        return self._component
+
+    def _heal(self):
+        component = self._component
+        _logger.debug('*** Stale handle of cached "%s", locating it again', component.__class__.__name__)
+        try:
+            component._we = component._find_myself(timeout=component._timeout)
+        except Exception as err:
+            if not _is_stale(err):
+                raise
+            object.__setattr__(self, '_component', self._factory())
+
+    def _retry_on_stale(self, action):
+        try:
+            return action()
+        except Exception as err:
+            if not _is_stale(err):
+                raise
+        self._heal()
+        return action()
+
+    def __getattr__(self, name):
+        attribute = self._retry_on_stale(lambda: getattr(self._component, name))
+        if callable(attribute) and not isinstance(attribute, type):
+            return lambda *args, **kwargs: self._retry_on_stale(
+                lambda: getattr(self._component, name)(*args, **kwargs))
+        return attribute
+
+    def __setattr__(self, name, value):
+        self._retry_on_stale(lambda: setattr(self._component, name, value))
+
+    def __repr__(self):
+        return f'<SelfHealingComponent {self._component!r}>'
+
+
+class cached_component(object):
+    # Page-object property that builds its component once per page instance and navigation generation:
+    #
+    #     @cached_component
+    #     def search(self):
+    #         return InputBase(selector=self._search_bar)
+    #
+    # Use @cached_component(track_url=True) to also rebuild when the URL changes without globals.navigate
+    # (costs one current_url call per access).
+
+    def __init__(self, factory=None, track_url=False):
+        self._factory = factory
+        self._track_url = track_url
+        self._name = getattr(factory, '__name__', None)
+        self.__doc__ = getattr(factory, '__doc__', None)
+
+    def __call__(self, factory):
+        self._factory = factory
+        self._name = factory.__name__
+        self.__doc__ = factory.__doc__
+        return self
+
+    def __set_name__(self, owner, name):
+        self._name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        drv = get_driver()
+        key = (navigation_generation(drv), drv.current_url if self._track_url else None)
+        cache = instance.__dict__.setdefault('_component_cache', {})
+        cached = cache.get(self._name)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        component = SelfHealingComponent(self._factory(instance), lambda: self._factory(instance))
+        cache[self._name] = (key, component)
+        return component
+
+
+def invalidate_components(page):
+    page.__dict__.pop('_component_cache', None)
@@ -0,0 +1,150 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from queue import Queue, Empty
+from time import monotonic
+
+from selenium.common import WebDriverException
+
+from selenium_helper.globals import VoltronException, bind_driver, unbind_driver
+
+_logger = logging.getLogger('voltron_logger')
+
+
+def is_driver_alive(driver) -> bool:
+    try:
+        return driver.execute_script('return 1;') == 1
+    except Exception:
+        return False
+
+
+class PooledSession(object):
+    __slots__ = ('driver', 'uses', 'created')
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+        self.created = monotonic()
+
+
+class DriverPool(object):
+    # Holds up to `size` browser sessions created lazily by `factory`. A session is bound to the current
+    # thread/task for the duration of `session()`, so get_driver() and everything built on it (ComponentBase,
+    # InputBase, find_element, ...) transparently use that browser.
+
+    def __init__(self, factory, size=2, max_uses=50, health_check=is_driver_alive, acquire_timeout=120):
+        if size < 1:
+            raise VoltronException(f'Driver pool size should be positive, got {size}')
+        self._factory = factory
+        self._size = size
+        self._max_uses = max_uses
+        self._health_check = health_check
+        self._acquire_timeout = acquire_timeout
+        self._idle = Queue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+    @property
+    def size(self):
+        return self._size
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self._closed or self._created >= self._size:
+                return False
+            self._created += 1
+            return True
+
+    def _spawn(self) -> PooledSession:
+        try:
+            driver = self._factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        _logger.debug('*** Driver pool started a new session (%d/%d)', self._created, self._size)
+        return PooledSession(driver)
+
+    def _discard(self, session: PooledSession):
+        # The slot is only given back once the browser is gone, so a replacement never races its predecessor for
+        # resources it frees on quit (e.g. its profile directory)
+        try:
+            session.driver.quit()
+        except Exception as err:
+            _logger.warning('*** Unable to quit pooled driver: %s', err)
+        finally:
+            with self._lock:
+                self._created -= 1
+
+    def _is_healthy(self, session: PooledSession) -> bool:
+        return self._health_check is None or self._health_check(session.driver)
+
+    def acquire(self, timeout=None) -> PooledSession:
+        if self._closed:
+            raise VoltronException('Driver pool is closed')
+        deadline = monotonic() + (self._acquire_timeout if timeout is None else timeout)
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except Empty:
+                if self._reserve_slot():
+                    session = self._spawn()
+                else:
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        raise VoltronException(f'No browser session became available in driver pool of {self._size}')
+                    try:
+                        session = self._idle.get(timeout=min(remaining, 0.5))
+                    except Empty:
+                        continue
+            if session.uses and not self._is_healthy(session):
+                _logger.warning('*** Pooled browser session failed health check, replacing it')
+                self._discard(session)
+                continue
+            session.uses += 1
+            return session
+
+    def release(self, session: PooledSession, crashed=False):
+        if crashed or self._closed or session.uses >= self._max_uses:
+            self._discard(session)
+        else:
+            self._idle.put(session)
+
+    @contextmanager
+    def session(self, timeout=None):
+        session = self.acquire(timeout=timeout)
+        token = bind_driver(session.driver)
+        crashed = False
+        try:
+            yield session.driver
+        except WebDriverException:
+            crashed = not self._is_healthy(session)
+            raise
+        finally:
+            unbind_driver(token)
+            self.release(session, crashed=crashed)
+
+    def run(self, func, *args, **kwargs):
+        with self.session():
+            return func(*args, **kwargs)
+
+    def map(self, func, iterable):
+        with ThreadPoolExecutor(max_workers=self._size, thread_name_prefix='voltron-session') as executor:
+            return list(executor.map(lambda item: self.run(func, item), iterable))
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except Empty:
+                break
+            self._discard(session)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -1,16 +1,30 @@
-import inspect
 import logging
 import re
-from time import time, sleep
-
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from functools import lru_cache
+from time import monotonic, sleep
+from typing import NamedTuple
+from weakref import WeakKeyDictionary
 
 from selenium.common import NoSuchElementException, StaleElementReferenceException, WebDriverException, \
     InvalidSelectorException
 from selenium.webdriver.chrome.webdriver import WebDriver
 from selenium.webdriver.common.by import By
+from selenium.webdriver.remote.webelement import WebElement
+
+from selenium_helper.voltron_logging import SAMPLED
+from selenium_helper.scripts import wait_condition_script, FIND_ELEMENT_CONDITION, FIND_ELEMENTS_CONDITION
 
 _logger = logging.getLogger(name='voltron_logger')
+# W3C WebDriver web element identifier, the key of element references in command parameters and responses
+ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
 driver = None
+_current_driver = ContextVar('voltron_driver', default=None)
+browser_side_waits = False
+wait_observers = []
 
 
 def wait_for_result(
@@ -21,98 +35,251 @@ def wait_for_result(
         poll_interval=0.5,
         expected_result=True,
         bypass_exceptions=(NoSuchElementException, StaleElementReferenceException),
-        timeout=30
+        timeout=30,
+        first_poll_interval=0.05,
+        backoff=1.5
 ):
+    # Polls start at first_poll_interval and grow by backoff up to poll_interval, against a monotonic deadline
     if name is None:
         name = func.__name__
     logger = logging.getLogger('voltron_logger')
     if not fkwargs:
         fkwargs = {}
-    sleeping_time = 0
     if not isinstance(expected_result, bool):
         raise VoltronException(f'Expected result should be True or False, instead it is {expected_result}')
     result = None
-    waiting_time = time()
-    period = poll_interval / 2
-    time_to_stop = time() + (timeout if timeout > period else period)
-    try:
-        caller_name = inspect.stack()[1].function
-    except RuntimeError:
-        caller_name = inspect.stack()[1].function
-    while waiting_time < time_to_stop:
+    started = monotonic()
+    time_to_stop = started + max(timeout, 0)
+    interval = min(first_poll_interval, poll_interval)
+    caller_name = sys._getframe(1).f_code.co_name
+    while True:
         try:
             result = func(*fargs, **fkwargs)
             if bool(result) is expected_result:
-                logger.info(
-                    f'[{caller_name}] Condition "{name}" succeed with result "{bool(result)}" in {sleeping_time} sec')
+                logger.info('[%s] Condition "%s" succeed with result "%s" in %.3f sec',
+                            caller_name, name, bool(result), monotonic() - started)
+                if wait_observers:
+                    _notify_wait_observers(name, caller_name, started, True)
                 return result
 
         except bypass_exceptions as err:
-            logger.debug(
-                f'[{caller_name}] Overriding bypassed "{err.__class__.__name__}" exception in WAIT with message:\n"{err}"')
-        logger.debug(f'Waiting {sleeping_time} sec for condition "{name}" to result "{expected_result}",'
-                     f' current is "{bool(result)}"')
+            logger.debug('[%s] Overriding bypassed "%s" exception in WAIT with message:\n"%s"',
+                         caller_name, err.__class__.__name__, err, extra=SAMPLED)
+        remaining = time_to_stop - monotonic()
+        if remaining <= 0:
+            break
+        logger.debug('Waiting %.3f sec for condition "%s" to result "%s", current is "%s"',
+                     monotonic() - started, name, expected_result, bool(result), extra=SAMPLED)
+        sleep(min(interval, remaining))
+        interval = min(interval * backoff, poll_interval)
 
-        sleeping_time += poll_interval
-        waiting_time += poll_interval
-        sleep(poll_interval)
+    logger.debug('[%s] Failed waiting for condition "%s" to result "%s" in %.3f sec',
+                 caller_name, name, expected_result, monotonic() - started)
+    if wait_observers:
+        _notify_wait_observers(name, caller_name, started, False)
+    return result
 
-    else:
-        logger.debug(
-            f'[{caller_name}] Failed waiting for condition "{name}" to result "{expected_result}" in {sleeping_time} sec')
+
+def _notify_wait_observers(name, caller_name, started, succeed):
+    # Observers are called as observer(name, caller_name, started, elapsed, succeed), times from time.monotonic
+    elapsed = monotonic() - started
+    for observer in list(wait_observers):
+        observer(name, caller_name, started, elapsed, succeed)
+
+
+def wait_in_browser(condition, *args, name=None, timeout=30):
+    # condition is a JS function body reading `args`; the wait resolves on the first DOM mutation that makes it
+    # truthy and returns None on timeout
+    drv = get_driver()
+    _ensure_script_timeout(drv, timeout)
+    caller_name = sys._getframe(1).f_code.co_name
+    started = monotonic()
+    result = drv.execute_async_script(wait_condition_script(condition), int(timeout * 1000), *args)
+    _logger.info('[%s] Browser-side condition "%s" finished with result "%s" in %.3f sec',
+                 caller_name, name or condition, bool(result), monotonic() - started)
+    if wait_observers:
+        _notify_wait_observers(name or condition, caller_name, started, bool(result))
     return result
 
 
+_script_timeouts = WeakKeyDictionary()
+_navigation_generations = WeakKeyDictionary()
+
+
+def _ensure_script_timeout(drv, timeout):
+    required = timeout + 5
+    if _script_timeouts.get(drv, 0) < required:
+        drv.set_script_timeout(required)
+        _script_timeouts[drv] = required
+
+
+def set_browser_side_waits(value: bool):
+    global browser_side_waits
+    browser_side_waits = value
+
+
+def set_clock(monotonic_func=None, sleep_func=None):
+    # Clock of waits and pauses, e.g. the virtual one of a replay; no arguments restores the real clock
+    global monotonic, sleep
+    monotonic = monotonic_func or time.monotonic
+    sleep = sleep_func or time.sleep
+
+
+def pause(seconds):
+    sleep(seconds)
+
+
 def set_driver(value: WebDriver):
     global driver
     driver = value
 
 
 def get_driver() -> WebDriver:
-    return driver
+    # A driver bound to the current thread/task (see bind_driver) wins over the process-wide one
+    current = _current_driver.get()
+    return current if current is not None else driver
+
+
+def navigate(url, drv: WebDriver = None):
+    # driver.get that also starts a new navigation generation, which drops cached page-object components
+    drv = drv if drv is not None else get_driver()
+    drv.get(url)
+    _navigation_generations[drv] = _navigation_generations.get(drv, 0) + 1
+
+
+def navigation_generation(drv: WebDriver = None) -> int:
+    return _navigation_generations.get(drv if drv is not None else get_driver(), 0)
+
+
+def bind_driver(value: WebDriver) -> Token:
+    return _current_driver.set(value)
+
+
+def unbind_driver(token: Token):
+    _current_driver.reset(token)
+
+
+@contextmanager
+def use_driver(value: WebDriver):
+    token = bind_driver(value)
+    try:
+        yield value
+    finally:
+        unbind_driver(token)
 
 
 class GeneralException(Exception):
     pass
 
 
-def parse_selector(selector=''):
-    by = {
-        'css': By.CSS_SELECTOR,
-        'xpath': By.XPATH,
-        'id': By.ID,
-        'name': By.NAME,
-        'tag': By.TAG_NAME,
-    }
+_SELECTOR_TYPES = {
+    'css': By.CSS_SELECTOR,
+    'xpath': By.XPATH,
+    'id': By.ID,
+    'name': By.NAME,
+    'tag': By.TAG_NAME,
+}
+_SELECTOR_PREFIXES = {by: prefix for prefix, by in _SELECTOR_TYPES.items()}
+_SELECTOR_RE = re.compile(r'^([a-z]+)=(.+)')
+_PATTERN_RE = re.compile(r'{([a-zA-Z0-9]+)}')
+SELECTOR_CACHE_SIZE = 2048
+
+
+class Selector(NamedTuple):
+    by: str
+    value: str
+
+    def __str__(self):
+        return f'{_SELECTOR_PREFIXES[self.by]}={self.value}'
+
+
+class SelectorPattern(object):
+    __slots__ = ('pattern', 'names', '_parts')
+
+    def __init__(self, pattern: str):
+        self.pattern = pattern
+        # Literal chunks at even positions, placeholder names at odd positions
+        self._parts = tuple(_PATTERN_RE.split(pattern))
+        self.names = self._parts[1::2]
+
+    def format(self, pattern_values) -> str:
+        parts = list(self._parts)
+        for index in range(1, len(parts), 2):
+            name = parts[index]
+            try:
+                parts[index] = str(pattern_values[name])
+            except KeyError:
+                raise VoltronException(
+                    f'Error building sector from pattern, Value argument must be missed for "{name}"')
+            except Exception as err:
+                raise VoltronException(f'Unknown exception parsing selector pattern: "{err}"')
+        return ''.join(parts)
+
+    def __str__(self):
+        return self.pattern
+
+    def __repr__(self):
+        return f'SelectorPattern({self.pattern!r})'
+
+
+def parse_selector(selector='') -> Selector:
+    if isinstance(selector, Selector):
+        return selector
     if not isinstance(selector, str):
         raise GeneralException(f'Selector should be a string value got "{selector}" with type "{type(selector)}"')
-    matcher = re.match(r'^([a-z]+)=(.+)', selector)
+    return _parse_selector(selector)
+
+
+@lru_cache(maxsize=SELECTOR_CACHE_SIZE)
+def _parse_selector(selector: str) -> Selector:
+    matcher = _SELECTOR_RE.match(selector)
     # TODO: allow whitespace characters in xpath, e.g.: xpath = .//*
     if matcher is not None and matcher.lastindex == 2:
         sector_type = matcher.group(1)
         selector_string = matcher.group(2)
-        if sector_type in by.keys():
-            return (by[sector_type], selector_string)
+        if sector_type in _SELECTOR_TYPES:
+            return Selector(_SELECTOR_TYPES[sector_type], selector_string)
         else:
             raise GeneralException(f'Unknown selector type "{sector_type}"')
     else:
         raise GeneralException(f"Selector doesn't match pattern 'xpath=//*', given '{selector}'")
 
 
+@lru_cache(maxsize=SELECTOR_CACHE_SIZE)
+def compile_pattern(pattern_data: str) -> SelectorPattern:
+    return SelectorPattern(pattern_data)
+
+
+def compile_selector(selector: str):
+    # Meant for class-level selector attributes: plain selectors become immutable Selector tuples,
+    # templated ones ("xpath=//*[text()='{name}']") become SelectorPattern formatters
+    pattern = compile_pattern(selector)
+    if pattern.names:
+        return pattern
+    return parse_selector(selector)
+
+
+def selector_cache_info() -> dict:
+    return {'selectors': _parse_selector.cache_info(), 'patterns': compile_pattern.cache_info()}
+
+
+def clear_selector_cache():
+    _parse_selector.cache_clear()
+    compile_pattern.cache_clear()
+
+
 class VoltronException(Exception):
     pass
 
 
 def parse_pattern(pattern_data='', pattern_values={}):
-    names = re.findall(r'{([a-zA-Z0-9]+)}', pattern_data)
-    for name in names:
-        try:
-            pattern_data = pattern_data.replace('{%s}' % name, pattern_values[name])
-        except NameError:
-            raise VoltronException(f'Error building sector from pattern, Value argument must be missed for "{name}"')
-        except Exception as err:
-            raise VoltronException(f'Unknown exception parsing selector pattern: "{err}"')
-    _logger.debug(f'Parsed selector pattern "{pattern_data}"')
+    if isinstance(pattern_data, Selector):
+        return pattern_data
+    pattern = pattern_data if isinstance(pattern_data, SelectorPattern) else compile_pattern(pattern_data)
+    if not pattern.names:
+        return pattern.pattern
+    pattern_data = pattern.format(pattern_values)
+    _logger.debug('Parsed selector pattern "%s"', pattern_data)
     return pattern_data
 
 
@@ -126,6 +293,16 @@ def find_element(selector, context=None,
     except InvalidSelectorException as e:
         raise GeneralException(e.msg)
     except (NoSuchElementException, WebDriverException):
+        if getattr(context, 'is_snapshot', False):
+            # A snapshot never changes, there is nothing to wait for
+            return None
+        if browser_side_waits:
+            try:
+                return wait_in_browser(FIND_ELEMENT_CONDITION, _script_context(context), by, val,
+                                       name=f'Waiting for web element to exist by selector {selector}',
+                                       timeout=timeout)
+            except bypass_exceptions:
+                return None
         return wait_for_result(lambda: context.find_element(by=by, value=val),
                                name=f'Waiting for web element to exist by selector {selector}',
                                bypass_exceptions=bypass_exceptions,
@@ -149,10 +326,23 @@ def find_elements(selector, context=None,
                                    bypass_exceptions=bypass_exceptions,
                                    timeout=timeout
                                    )
-    if not elements:
+    if not elements and getattr(context, 'is_snapshot', False):
+        return []
+    if not elements and browser_side_waits:
+        try:
+            elements = wait_in_browser(FIND_ELEMENTS_CONDITION, _script_context(context), by, val,
+                                       name=f'Waiting for web elements to exist by selector {selector}',
+                                       timeout=timeout)
+        except bypass_exceptions:
+            elements = None
+    elif not elements:
         elements = wait_for_result(lambda: context.find_elements(by=by, value=val),
                                    name=f'Waiting for web elements to exist by selector {selector}',
                                    bypass_exceptions=bypass_exceptions,
                                    timeout=timeout
                                    )
     return [] if elements is None else elements
+
+
+def _script_context(context):
+    return context if isinstance(context, WebElement) else None
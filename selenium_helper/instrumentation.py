@@ -0,0 +1,170 @@
+import json
+import logging
+import os
+import sys
+import threading
+from bisect import bisect_left
+from time import monotonic
+
+from selenium_helper.ComponentBase import ComponentBase
+from selenium_helper import globals as voltron_globals
+
+_logger = logging.getLogger('voltron_logger')
+
+# Upper bounds of the latency histogram buckets, in milliseconds
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float('inf'))
+_FRAMEWORK_MODULES = ('selenium.', 'selenium_helper.', 'urllib3.', 'undetected_chromedriver.')
+
+
+class LatencyStats(object):
+    __slots__ = ('count', 'total', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, elapsed * 1000)] += 1
+
+    def percentile(self, fraction) -> float:
+        # Upper bound (ms) of the bucket holding the requested percentile
+        threshold = self.count * fraction
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= threshold:
+                return min(bound, self.max * 1000)
+        return self.max * 1000
+
+
+def find_command_owner(depth=2) -> str:
+    # First frame that runs inside a component method, otherwise the first frame of user code
+    frame = sys._getframe(depth)
+    fallback = None
+    while frame is not None:
+        instance = frame.f_locals.get('self')
+        if isinstance(instance, ComponentBase):
+            return f'{instance.__class__.__name__}.{frame.f_code.co_name}'
+        module = frame.f_globals.get('__name__', '')
+        if fallback is None and not module.startswith(_FRAMEWORK_MODULES):
+            owner = instance.__class__.__name__ if instance is not None else module
+            fallback = f'{owner}.{frame.f_code.co_name}'
+        frame = frame.f_back
+    return fallback or '<unknown>'
+
+
+class Tracer(object):
+
+    def __init__(self, max_events=200000):
+        self._lock = threading.Lock()
+        self._origin = monotonic()
+        self._max_events = max_events
+        self._commands = {}
+        self._owners = {}
+        self._waits = {}
+        self._events = []
+        self._drivers = []
+
+    def instrument(self, driver):
+        # Every WebDriver and WebElement call ends in driver.execute, so wrapping it on the instance sees them all
+        original = driver.execute
+        session = getattr(driver, 'session_id', None) or str(len(self._drivers))
+
+        def execute(driver_command, params=None):
+            started = monotonic()
+            try:
+                return original(driver_command, params)
+            finally:
+                self.record_command(driver_command, find_command_owner(), started, monotonic() - started, session)
+
+        driver.execute = execute
+        self._drivers.append((driver, original))
+        if self.record_wait not in voltron_globals.wait_observers:
+            voltron_globals.wait_observers.append(self.record_wait)
+        return driver
+
+    def uninstrument(self):
+        for driver, original in self._drivers:
+            driver.execute = original
+        self._drivers = []
+        if self.record_wait in voltron_globals.wait_observers:
+            voltron_globals.wait_observers.remove(self.record_wait)
+
+    def _add_event(self, event):
+        if len(self._events) < self._max_events:
+            self._events.append(event)
+
+    def record_command(self, command, owner, started, elapsed, session=None):
+        with self._lock:
+            self._commands.setdefault(command, LatencyStats()).add(elapsed)
+            self._owners.setdefault((owner, command), LatencyStats()).add(elapsed)
+            self._add_event({'name': command, 'cat': 'webdriver', 'ph': 'X',
+                             'ts': (started - self._origin) * 1e6, 'dur': elapsed * 1e6,
+                             'pid': os.getpid(), 'tid': threading.get_ident(),
+                             'args': {'owner': owner, 'session': session}})
+
+    def record_wait(self, name, caller_name, started, elapsed, succeed):
+        with self._lock:
+            self._waits.setdefault(caller_name, LatencyStats()).add(elapsed)
+            self._add_event({'name': f'wait: {name}', 'cat': 'wait', 'ph': 'X',
+                             'ts': (started - self._origin) * 1e6, 'dur': elapsed * 1e6,
+                             'pid': os.getpid(), 'tid': threading.get_ident(),
+                             'args': {'caller': caller_name, 'succeed': succeed}})
+
+    @property
+    def command_count(self) -> int:
+        return sum(stats.count for stats in self._commands.values())
+
+    @property
+    def wait_time(self) -> float:
+        return sum(stats.total for stats in self._waits.values())
+
+    @staticmethod
+    def _table(title, rows):
+        header = f'{title:<60} {"count":>7} {"total ms":>10} {"mean ms":>9} {"p50 ms":>8} {"p95 ms":>8} {"max ms":>9}'
+        lines = [header, '-' * len(header)]
+        for label, stats in sorted(rows, key=lambda row: row[1].total, reverse=True):
+            lines.append(f'{label[:60]:<60} {stats.count:>7} {stats.total * 1000:>10.1f} '
+                         f'{stats.total * 1000 / stats.count:>9.1f} {stats.percentile(0.5):>8.1f} '
+                         f'{stats.percentile(0.95):>8.1f} {stats.max * 1000:>9.1f}')
+        return lines
+
+    def summary(self) -> str:
+        with self._lock:
+            lines = [f'WebDriver commands: {self.command_count}, time lost in waits: {self.wait_time:.3f} sec', '']
+            lines += self._table('command', self._commands.items())
+            lines.append('')
+            lines += self._table('owner / command', [(f'{owner} / {command}', stats)
+                                                     for (owner, command), stats in self._owners.items()])
+            if self._waits:
+                lines.append('')
+                lines += self._table('wait caller', self._waits.items())
+        return '\n'.join(lines)
+
+    def export_chrome_trace(self, path):
+        # Loadable in chrome://tracing or https://ui.perfetto.dev
+        with self._lock:
+            events = list(self._events)
+        with open(path, 'w') as trace_file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+        _logger.info('*** WebDriver trace with %d events written to "%s"', len(events), path)
+
+
+_tracer = None
+
+
+def instrument(driver, tracer: Tracer = None) -> Tracer:
+    global _tracer
+    tracer = tracer if tracer is not None else (_tracer or Tracer())
+    _tracer = tracer
+    tracer.instrument(driver)
+    return tracer
+
+
+def get_tracer() -> Tracer:
+    return _tracer
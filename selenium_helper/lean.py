@@ -0,0 +1,53 @@
+import logging
+from typing import NamedTuple, Tuple
+
+_logger = logging.getLogger('voltron_logger')
+
+# Network.setBlockedURLs matches URL wildcards, so resource types are expressed as the URL shapes that carry them
+RESOURCE_TYPE_PATTERNS = {
+    'image': ('*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.svg*', '*.ico*', '*media.licdn.com/dms/image/*'),
+    'media': ('*.mp4*', '*.webm*', '*.m3u8*', '*.mp3*', '*.ts?*', '*dms.licdn.com/playlist/*'),
+    'font': ('*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'),
+    'stylesheet': ('*.css*',),
+}
+
+TRACKING_URL_PATTERNS = (
+    '*doubleclick.net/*', '*google-analytics.com/*', '*googletagmanager.com/*', '*googlesyndication.com/*',
+    '*px.ads.linkedin.com/*', '*ads.linkedin.com/*', '*snap.licdn.com/*', '*linkedin.com/li/track*',
+    '*linkedin.com/sensorCollect*', '*linkedin.com/realtime/*',
+)
+
+
+class LeanProfile(NamedTuple):
+    resource_types: Tuple[str, ...] = ('image', 'media', 'font')
+    url_patterns: Tuple[str, ...] = TRACKING_URL_PATTERNS
+    # 'eager' returns from driver.get once the DOM is ready instead of waiting for every subresource
+    page_load_strategy: str = 'eager'
+
+    @property
+    def blocked_urls(self) -> list:
+        patterns = [pattern for resource_type in self.resource_types
+                    for pattern in RESOURCE_TYPE_PATTERNS.get(resource_type, ())]
+        return patterns + list(self.url_patterns)
+
+
+DEFAULT_LEAN_PROFILE = LeanProfile()
+
+
+def lean_chrome_options(options, profile: LeanProfile = DEFAULT_LEAN_PROFILE):
+    # Launch-time part of the profile; has no effect when attaching to a running browser
+    options.page_load_strategy = profile.page_load_strategy
+    if 'image' in profile.resource_types:
+        options.add_argument('--blink-settings=imagesEnabled=false')
+    return options
+
+
+def apply_lean_profile(driver, profile: LeanProfile = DEFAULT_LEAN_PROFILE):
+    # Requests matching the profile are failed by the browser's network stack before they are sent
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': profile.blocked_urls})
+    _logger.debug('*** Lean page-load profile blocks %d URL patterns', len(profile.blocked_urls))
+
+
+def clear_lean_profile(driver):
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
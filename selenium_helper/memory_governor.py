@@ -0,0 +1,169 @@
+import logging
+from typing import NamedTuple, Optional
+
+from selenium.common import WebDriverException
+
+from selenium_helper import globals as voltron_globals
+from selenium_helper.globals import get_driver, navigate
+from selenium_helper.scripts import PRUNE_NODES, MEMORY_USAGE
+
+_logger = logging.getLogger('voltron_logger')
+_MB = 1024 * 1024
+
+PRUNE = 'prune'
+RECYCLE = 'recycle'
+
+
+class MemorySample(NamedTuple):
+    heap_used: float
+    heap_total: float
+    nodes: int
+    documents: Optional[int]
+    listeners: Optional[int]
+    # Reading of the globals clock, virtual during a replay
+    taken: float
+
+    @property
+    def heap_used_mb(self) -> float:
+        return self.heap_used / _MB
+
+
+class MemoryLimits(NamedTuple):
+    # Pruning starts at the soft limits; the tab is recycled when a hard limit is still crossed after pruning
+    prune_heap_mb: float = 300
+    prune_nodes: int = 40000
+    recycle_heap_mb: float = 700
+    recycle_nodes: int = 120000
+
+
+class MemoryGovernor(object):
+    # Keeps a long-running tab's renderer small: samples JS heap and DOM size every `interval` seconds, frees the
+    # subtrees of processed nodes (`processed_selector`), and reopens the page in a fresh tab when that is not
+    # enough. `position` returns the url to reopen, `on_new_target` re-applies per-tab DevTools state (URL
+    # blocking, network capture) to the new tab before it loads, `on_recycle` runs after a recycle (e.g. to
+    # re-locate components), and `recycle_session` replaces the whole browser after `max_tab_recycles` tab recycles.
+    # The reopened url only restores the results page, not the scroll offset within it: cards that were already
+    # processed are served again and have to be dropped by id (JobSearchResults does).
+
+    def __init__(self, driver=None, limits: MemoryLimits = MemoryLimits(), interval=30,
+                 processed_selector='li[data-voltron-seen]', keep_processed=10, detach=False,
+                 position=None, on_new_target=None, on_recycle=None, recycle_session=None, max_tab_recycles=None):
+        self._driver = driver
+        self.limits = limits
+        self.interval = interval
+        self.processed_selector = processed_selector
+        self.keep_processed = keep_processed
+        self.detach = detach
+        self._position = position
+        self._on_new_target = on_new_target
+        self._on_recycle = on_recycle
+        self._recycle_session = recycle_session
+        self._max_tab_recycles = max_tab_recycles
+        self._cdp = True
+        self._cdp_enabled = None
+        self._next_check = 0.0
+        self.samples = []
+        self.pruned = 0
+        self.tab_recycles = 0
+
+    @property
+    def driver(self):
+        return self._driver if self._driver is not None else get_driver()
+
+    def sample(self) -> Optional[MemorySample]:
+        driver = self.driver
+        if self._cdp:
+            try:
+                if self._cdp_enabled is not driver:
+                    driver.execute_cdp_cmd('Performance.enable', {})
+                    self._cdp_enabled = driver
+                metrics = {metric['name']: metric['value'] for metric in
+                           driver.execute_cdp_cmd('Performance.getMetrics', {}).get('metrics', [])}
+            except (AttributeError, WebDriverException):
+                # Not a Chromium session
+                self._cdp = False
+            else:
+                if 'JSHeapUsedSize' in metrics:
+                    return self._record(MemorySample(metrics['JSHeapUsedSize'], metrics.get('JSHeapTotalSize', 0),
+                                                     int(metrics.get('Nodes', 0)), metrics.get('Documents'),
+                                                     metrics.get('JSEventListeners'),
+                                                     voltron_globals.monotonic()))
+        usage = driver.execute_script(MEMORY_USAGE)
+        if not usage:
+            return None
+        return self._record(MemorySample(usage[0], usage[1], usage[2], None, None, voltron_globals.monotonic()))
+
+    def _record(self, sample: MemorySample) -> MemorySample:
+        # Only a recent window is kept, for the end-of-run report
+        self.samples = self.samples[-119:] + [sample]
+        return sample
+
+    def _over(self, sample: MemorySample, heap_mb, nodes) -> bool:
+        return sample.heap_used_mb >= heap_mb or sample.nodes >= nodes
+
+    def prune(self) -> int:
+        pruned = self.driver.execute_script(PRUNE_NODES, self.processed_selector, self.keep_processed, self.detach)
+        self.pruned += pruned or 0
+        return pruned or 0
+
+    def _collect_garbage(self):
+        # Without a collection the heap size would not reflect the freed nodes yet
+        if self._cdp:
+            try:
+                self.driver.execute_cdp_cmd('HeapProfiler.collectGarbage', {})
+            except WebDriverException:
+                pass
+
+    def recycle_tab(self, url=None):
+        # A new tab gets a fresh document; closing the old one releases its DOM and heap
+        driver = self.driver
+        url = url or (self._position() if self._position is not None else driver.current_url)
+        old_handle = driver.current_window_handle
+        driver.switch_to.new_window('tab')
+        new_handle = driver.current_window_handle
+        driver.switch_to.window(old_handle)
+        driver.close()
+        driver.switch_to.window(new_handle)
+        # The tab is a new DevTools target: domains enabled and URLs blocked on the old one do not carry over
+        self._cdp_enabled = None
+        if self._on_new_target is not None:
+            self._on_new_target(driver)
+        navigate(url, driver)
+        self.tab_recycles += 1
+        _logger.info('*** Memory governor recycled the tab (%d so far), reopened %s', self.tab_recycles, url)
+
+    def recycle(self):
+        if (self._recycle_session is not None and self._max_tab_recycles is not None
+                and self.tab_recycles >= self._max_tab_recycles):
+            # The callback may return the replacement driver
+            driver = self._recycle_session()
+            if driver is not None and self._driver is not None:
+                self._driver = driver
+            self._cdp_enabled = None
+            self.tab_recycles = 0
+        else:
+            self.recycle_tab()
+        if self._on_recycle is not None:
+            self._on_recycle()
+
+    def check(self, force=False) -> Optional[str]:
+        # Cheap to call after every batch: does nothing until the sampling interval has passed
+        now = voltron_globals.monotonic()
+        if not force and now < self._next_check:
+            return None
+        self._next_check = now + self.interval
+        sample = self.sample()
+        if sample is None:
+            return None
+        _logger.debug('*** Renderer memory: %.1f MB JS heap, %d DOM nodes', sample.heap_used_mb, sample.nodes)
+        if not self._over(sample, self.limits.prune_heap_mb, self.limits.prune_nodes):
+            return None
+        pruned = self.prune()
+        self._collect_garbage()
+        after = self.sample()
+        _logger.debug('*** Memory governor pruned %d nodes, now %.1f MB JS heap, %d DOM nodes', pruned,
+                      after.heap_used_mb if after else -1, after.nodes if after else -1)
+        if after is not None and self._over(after, self.limits.recycle_heap_mb, self.limits.recycle_nodes):
+            self.recycle()
+            return RECYCLE
+        return PRUNE
@@ -0,0 +1,163 @@
+import base64
+import glob
+import io
+import json
+import logging
+import os
+import re
+from typing import NamedTuple, Iterable, Iterator, Optional
+
+from selenium.common import WebDriverException
+
+from selenium_helper.globals import get_driver
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+_logger = logging.getLogger('voltron_logger')
+
+
+class CapturedResponse(NamedTuple):
+    request_id: str
+    url: str
+    status: int
+    mime_type: str
+    body: bytes
+
+
+def enable_performance_log(options):
+    # chromedriver then records DevTools Network events, read back with driver.get_log('performance')
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    return options
+
+
+def iter_json_items(body: bytes, prefix='item'):
+    # ijson prefix syntax ('included.item'); with ijson the payload is decoded incrementally, otherwise it is
+    # parsed whole and walked
+    if ijson is not None:
+        yield from ijson.items(io.BytesIO(body), prefix, use_float=True)
+        return
+    document = json.loads(body)
+    nodes = [document]
+    for key in prefix.split('.') if prefix else ():
+        nodes = [item for node in nodes for item in node] if key == 'item' else \
+            [node[key] for node in nodes if isinstance(node, dict) and key in node]
+    yield from nodes
+
+
+class NetworkCapture(object):
+    # Responses whose url matches one of `url_patterns` (regular expressions), taken from the performance log.
+    # One get_log call returns every event since the previous one; bodies are fetched once per matching response.
+
+    def __init__(self, url_patterns, driver=None, save_dir=None):
+        self._patterns = [re.compile(pattern) for pattern in url_patterns]
+        self._driver = driver
+        self._pending = {}
+        self._save_dir = save_dir
+        if save_dir:
+            os.makedirs(save_dir, exist_ok=True)
+        self.captured = 0
+
+    @property
+    def driver(self):
+        return self._driver if self._driver is not None else get_driver()
+
+    @property
+    def pending(self) -> int:
+        # Matching responses whose body has not finished loading yet
+        return len(self._pending)
+
+    def matches(self, url) -> bool:
+        return any(pattern.search(url) for pattern in self._patterns)
+
+    def reset(self):
+        # Drops everything logged so far, e.g. before opening the page whose responses are wanted, or after
+        # switching to a new tab whose pending requests will never finish
+        self.driver.get_log('performance')
+        self._pending.clear()
+
+    def attach(self, driver=None):
+        # Governor on_new_target hook: the new tab needs the Network domain for response bodies
+        driver = driver if driver is not None else self.driver
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+        except WebDriverException as err:
+            _logger.debug('*** Unable to enable network events on the new tab: %s', err)
+        self.reset()
+
+    def drain(self) -> Iterator[CapturedResponse]:
+        finished = []
+        for entry in self.driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            method, params = message.get('method'), message.get('params', {})
+            if method == 'Network.responseReceived':
+                response = params['response']
+                if self.matches(response['url']):
+                    self._pending[params['requestId']] = response
+            elif method == 'Network.loadingFinished' and params.get('requestId') in self._pending:
+                finished.append(params['requestId'])
+            elif method == 'Network.loadingFailed':
+                self._pending.pop(params.get('requestId'), None)
+        for request_id in finished:
+            response = self._pending.pop(request_id)
+            body = self._body(request_id)
+            if body is None:
+                continue
+            captured = CapturedResponse(request_id, response['url'], response.get('status', 0),
+                                        response.get('mimeType', ''), body)
+            self.captured += 1
+            if self._save_dir:
+                self._save(captured)
+            yield captured
+
+    def _body(self, request_id) -> Optional[bytes]:
+        try:
+            result = self.driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except WebDriverException as err:
+            # The body is gone once the page that requested it navigated away
+            _logger.debug('*** Response body of %s is not available: %s', request_id, err)
+            return None
+        if result.get('base64Encoded'):
+            return base64.b64decode(result['body'])
+        return result['body'].encode('utf-8')
+
+    def _save(self, captured: CapturedResponse):
+        path = os.path.join(self._save_dir, f'{self.captured:06d}')
+        with open(f'{path}.json', 'wb') as body_file:
+            body_file.write(captured.body)
+        with open(f'{path}.meta.json', 'w', encoding='utf-8') as meta_file:
+            json.dump({'request_id': captured.request_id, 'url': captured.url, 'status': captured.status,
+                       'mime_type': captured.mime_type}, meta_file)
+
+
+class ReplaySource(object):
+    # Stand-in for NetworkCapture over bodies saved with save_dir (or any *.json files), for working offline
+
+    def __init__(self, paths: Iterable[str]):
+        if isinstance(paths, str):
+            paths = sorted(glob.glob(os.path.join(paths, '*.json')))
+        self._paths = [path for path in paths if not path.endswith('.meta.json')]
+        self.captured = 0
+
+    @property
+    def pending(self) -> int:
+        return 0
+
+    def reset(self):
+        pass
+
+    def drain(self) -> Iterator[CapturedResponse]:
+        paths, self._paths = self._paths, []
+        for path in paths:
+            meta_path = f'{path[:-len(".json")]}.meta.json'
+            meta = {}
+            if os.path.exists(meta_path):
+                with open(meta_path, encoding='utf-8') as meta_file:
+                    meta = json.load(meta_file)
+            with open(path, 'rb') as body_file:
+                body = body_file.read()
+            self.captured += 1
+            yield CapturedResponse(meta.get('request_id', path), meta.get('url', path), meta.get('status', 200),
+                                   meta.get('mime_type', 'application/json'), body)
@@ -0,0 +1,97 @@
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+from selenium.common import NoSuchElementException, StaleElementReferenceException, WebDriverException
+from selenium.webdriver.remote.webelement import WebElement
+
+from selenium_helper import globals as voltron_globals
+from selenium_helper.globals import get_driver, wait_for_result, wait_in_browser, parse_selector, Selector, \
+    VoltronException, _script_context
+from selenium_helper.scripts import FIRST_MATCHING_STATE_CONDITION, condition_script
+
+
+class PageState(NamedTuple):
+    name: str
+    element: Optional[WebElement]
+
+
+class JsPredicate(NamedTuple):
+    # Function body run in the page with `context` (the context element or document); returns an element, true or
+    # a falsy value
+    body: str
+
+
+def js(body: str) -> JsPredicate:
+    return JsPredicate(body)
+
+
+@lru_cache(maxsize=64)
+def _condition(predicates: tuple) -> str:
+    if not predicates:
+        return FIRST_MATCHING_STATE_CONDITION
+    functions = ',\n'.join(f'function (context) {{\n{body}\n}}' for body in predicates)
+    return f'var voltronStatePredicates = [\n{functions}\n];\n{FIRST_MATCHING_STATE_CONDITION}'
+
+
+_one_shot_script = lru_cache(maxsize=64)(condition_script)
+
+
+def _compile_states(states: dict, visible=True):
+    entries, predicates = [], []
+    for name, state in states.items():
+        if isinstance(state, JsPredicate):
+            entries.append([name, 'predicate', len(predicates)])
+            predicates.append(state.body)
+        elif isinstance(state, (str, Selector)):
+            by, value = parse_selector(state)
+            entries.append([name, 'selector', by, value, visible])
+        else:
+            raise VoltronException(f'Page state "{name}" should be a selector or js() predicate, got {state!r}')
+    return _condition(tuple(predicates)), entries
+
+
+def find_state(states: dict, context=None, visible=True) -> Optional[PageState]:
+    # Single check of all states, no waiting
+    condition, entries = _compile_states(states, visible=visible)
+    found = get_driver().execute_script(_one_shot_script(condition), _script_context(context), entries)
+    return PageState(*found) if found else None
+
+
+def wait_for_any(states: dict, timeout=15, context=None, visible=True, name=None) -> Optional[PageState]:
+    # states: {name: selector or js(...)} in priority order. Every poll (or DOM mutation, with browser-side waits)
+    # checks all of them in one script and the first that holds wins; None when none did within the timeout.
+    condition, entries = _compile_states(states, visible=visible)
+    name = name or f'Any of page states {", ".join(states)}'
+    if voltron_globals.browser_side_waits:
+        found = wait_in_browser(condition, _script_context(context), entries, name=name, timeout=timeout)
+    else:
+        script = _one_shot_script(condition)
+        found = wait_for_result(lambda: get_driver().execute_script(script, _script_context(context), entries),
+                                name=name,
+                                bypass_exceptions=(
+                                    NoSuchElementException, StaleElementReferenceException, WebDriverException),
+                                timeout=timeout)
+    return PageState(*found) if found else None
+
+
+class PageStates(object):
+    # Named outcomes of a page, e.g. after submitting a search:
+    #     state = PageStates({'results': 'css=li.result', 'empty': 'css=.no-results'}).expect(timeout=20)
+
+    def __init__(self, states: dict, visible=True):
+        self.states = dict(states)
+        self.visible = visible
+
+    def current(self, context=None) -> Optional[PageState]:
+        return find_state(self.states, context=context, visible=self.visible)
+
+    def wait(self, timeout=15, context=None) -> Optional[PageState]:
+        return wait_for_any(self.states, timeout=timeout, context=context, visible=self.visible)
+
+    def expect(self, *names, timeout=15, context=None) -> PageState:
+        state = self.wait(timeout=timeout, context=context)
+        if state is None:
+            raise VoltronException(f'None of page states {list(self.states)} appeared in {timeout} sec')
+        if names and state.name not in names:
+            raise VoltronException(f'Page is in state "{state.name}", expected one of {list(names)}')
+        return state
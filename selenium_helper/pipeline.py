@@ -0,0 +1,113 @@
+from typing import NamedTuple, Any, Optional
+
+from selenium.common import WebDriverException
+
+from selenium_helper.globals import get_driver, VoltronException
+from selenium_helper.scripts import RUN_PIPELINE, CLICK
+
+
+class PipelineError(VoltronException):
+    pass
+
+
+class StepResult(NamedTuple):
+    step: str
+    value: Any
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class ActionPipeline(object):
+    # Chain of actions on one element, e.g. component.pipeline().scroll().read_text().click().run().
+    # Consecutive script steps run as one execute_script; only steps needing trusted input events (native clicks,
+    # send_keys) are WebDriver commands of their own.
+
+    def __init__(self, element, owner=None):
+        self._element = element
+        self._owner = owner or element.__class__.__name__
+        self._steps = []
+
+    def __len__(self):
+        return len(self._steps)
+
+    def _add(self, name, *args, native=False):
+        self._steps.append((name, args, native))
+        return self
+
+    def scroll(self):
+        return self._add('scroll')
+
+    def click(self, trusted=False):
+        # Script clicks are not trusted events; handlers that check event.isTrusted need trusted=True
+        return self._add('click', native=trusted)
+
+    def send_keys(self, *keys):
+        return self._add('send_keys', *keys, native=True)
+
+    def focus(self):
+        return self._add('focus')
+
+    def blur(self):
+        return self._add('blur')
+
+    def read_text(self):
+        return self._add('text')
+
+    def read_attribute(self, name):
+        return self._add('attribute', name)
+
+    def read_property(self, name):
+        return self._add('property', name)
+
+    def read_value(self):
+        return self._add('value')
+
+    def set_value(self, value):
+        # Native value setter plus input/change events, returns the value read back
+        return self._add('set_value', str(value))
+
+    def is_displayed(self):
+        return self._add('displayed')
+
+    def _run_native(self, name, args) -> StepResult:
+        if name == 'click':
+            try:
+                self._element.click()
+            except WebDriverException:
+                # Covered or animating elements still take a script click
+                get_driver().execute_script(CLICK, self._element)
+        else:
+            self._element.send_keys(*args)
+        return StepResult(name, None)
+
+    def _run_scripted(self, steps) -> list:
+        records = get_driver().execute_script(RUN_PIPELINE, self._element,
+                                              [[name, *args] for name, args, _ in steps]) or []
+        return [StepResult(name, value if ok else None, None if ok else value)
+                for (name, _, _), (ok, value) in zip(steps, records)]
+
+    def run(self, raise_on_error=True) -> list:
+        # Results of the steps that ran, in order; execution stops at the first failed step
+        results, batch = [], []
+        steps, self._steps = self._steps, []
+        for step in steps + [None]:
+            if step is not None and not step[2]:
+                batch.append(step)
+                continue
+            if batch:
+                ran = self._run_scripted(batch)
+                results += ran
+                if len(ran) < len(batch) and (not ran or ran[-1].ok):
+                    raise PipelineError(f'"{self._owner}" pipeline step "{batch[len(ran)][0]}" did not run')
+                if not ran[-1].ok:
+                    break
+                batch = []
+            if step is not None:
+                results.append(self._run_native(step[0], step[1]))
+        failed = next((result for result in results if not result.ok), None)
+        if failed is not None and raise_on_error:
+            raise PipelineError(f'"{self._owner}" pipeline step "{failed.step}" failed: {failed.error}')
+        return results
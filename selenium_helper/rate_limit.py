@@ -0,0 +1,67 @@
+import threading
+
+from selenium_helper import globals as voltron_globals
+from selenium_helper.globals import VoltronException
+
+
+class TokenBucket(object):
+    # `rate` tokens per second refill a bucket of `capacity`; a full bucket allows a burst of `capacity` calls.
+    # Time comes from the globals clock, so a replay runs throttled code on its virtual time.
+
+    def __init__(self, rate, capacity=1):
+        if rate <= 0 or capacity < 1:
+            raise VoltronException(f'Token bucket needs a positive rate and capacity, got {rate} and {capacity}')
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = voltron_globals.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def per_minute(cls, calls, burst=1):
+        return cls(calls / 60.0, capacity=burst)
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens=1) -> float:
+        # Takes the tokens and returns 0, or returns how many seconds to wait before they are available
+        with self._lock:
+            self._refill(voltron_globals.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def refund(self, tokens=1):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def acquire(self, tokens=1, timeout=None) -> bool:
+        deadline = None if timeout is None else voltron_globals.monotonic() + timeout
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return True
+            if deadline is not None:
+                remaining = deadline - voltron_globals.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            voltron_globals.pause(wait)
+
+
+def acquire_all(buckets, tokens=1):
+    # Takes a token from every bucket without holding any of them while waiting on another, so a slow per-session
+    # bucket never starves the shared global one
+    buckets = [bucket for bucket in buckets if bucket is not None]
+    while True:
+        waits = [bucket.try_acquire(tokens) for bucket in buckets]
+        if not any(waits):
+            return
+        # Return what was taken from the buckets that were ready, then wait for the slowest one
+        for bucket, wait in zip(buckets, waits):
+            if not wait:
+                bucket.refund(tokens)
+        voltron_globals.pause(max(waits))
@@ -0,0 +1,228 @@
+import gzip
+import json
+import logging
+import threading
+from collections import deque
+from time import monotonic, sleep
+
+from selenium.common import exceptions as selenium_exceptions
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.remote.locator_converter import LocatorConverter
+from selenium.webdriver.remote.switch_to import SwitchTo
+from selenium.webdriver.remote.webelement import WebElement
+
+from selenium_helper import globals as voltron_globals
+from selenium_helper.globals import VoltronException, ELEMENT_KEY
+
+_logger = logging.getLogger('voltron_logger')
+
+TRACE_VERSION = 1
+# How far a replay looks ahead in the trace for a command the recording issued later than the replay does
+_LOOKAHEAD = 200
+
+
+class ReplayDivergence(VoltronException):
+    pass
+
+
+def _encode(value):
+    if isinstance(value, WebElement):
+        return {ELEMENT_KEY: value.id}
+    if isinstance(value, dict):
+        return {key: _encode(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return repr(value)
+
+
+def _signature(command, params) -> str:
+    # What a replayed command has to agree on with the recorded one; arguments (element ids, typed text) may not
+    params = params or {}
+    detail = params.get('script') or params.get('url') or params.get('cmd') or \
+        (f'{params["using"]}={params["value"]}' if 'using' in params else '')
+    return f'{command} {detail}' if detail else command
+
+
+class Recorder(object):
+    # Writes every command of the recorded drivers with its parameters, response and timing to a gzip JSON lines
+    # trace. Scripts are stored once and referenced by number after that.
+
+    def __init__(self, path):
+        self.path = path
+        self._file = gzip.open(path, 'wt', encoding='utf-8')
+        self._lock = threading.Lock()
+        self._origin = monotonic()
+        self._scripts = {}
+        self._drivers = []
+        self.commands = 0
+
+    def record(self, driver):
+        original = driver.execute
+        session = len(self._drivers)
+
+        def execute(driver_command, params=None):
+            started = monotonic()
+            try:
+                response = original(driver_command, params)
+            except selenium_exceptions.WebDriverException as err:
+                self._write_command(session, driver_command, params, started, error=err)
+                raise
+            self._write_command(session, driver_command, params, started, response=response)
+            return response
+
+        self._write({'trace': TRACE_VERSION, 's': session, 'session_id': getattr(driver, 'session_id', None),
+                     'capabilities': _encode(getattr(driver, 'capabilities', None) or {})})
+        driver.execute = execute
+        self._drivers.append((driver, original))
+        return driver
+
+    def _write(self, entry):
+        self._file.write(json.dumps(entry, separators=(',', ':')))
+        self._file.write('\n')
+
+    def _write_command(self, session, command, params, started, response=None, error=None):
+        elapsed = monotonic() - started
+        params = dict(params or {})
+        with self._lock:
+            if self._file.closed:
+                return
+            script = params.get('script')
+            if isinstance(script, str):
+                if script not in self._scripts:
+                    self._scripts[script] = len(self._scripts)
+                    self._write({'script': self._scripts[script], 'text': script})
+                params['script'] = self._scripts[script]
+            entry = {'s': session, 'c': command, 'p': _encode(params), 't': round(started - self._origin, 6),
+                     'd': round(elapsed, 6)}
+            if error is not None:
+                entry['e'] = [error.__class__.__name__, error.msg]
+            else:
+                entry['r'] = _encode(response.get('value') if isinstance(response, dict) else response)
+            self._write(entry)
+            self.commands += 1
+
+    def close(self):
+        with self._lock:
+            for driver, original in self._drivers:
+                driver.execute = original
+            self._drivers = []
+            if not self._file.closed:
+                self._file.close()
+                _logger.info('*** WebDriver recording with %d commands written to "%s"', self.commands, self.path)
+
+
+def record(driver, path) -> Recorder:
+    recorder = Recorder(path)
+    recorder.record(driver)
+    return recorder
+
+
+def load_trace(path, session=0):
+    # Header and command entries of one recorded session, scripts resolved back to their text
+    header, entries, scripts = None, [], {}
+    with gzip.open(path, 'rt', encoding='utf-8') as trace_file:
+        for line in trace_file:
+            entry = json.loads(line)
+            if 'text' in entry:
+                scripts[entry['script']] = entry['text']
+            elif entry.get('s') != session:
+                continue
+            elif 'trace' in entry:
+                header = entry
+            else:
+                if 'script' in entry['p']:
+                    entry['p']['script'] = scripts[entry['p']['script']]
+                entries.append(entry)
+    if header is None:
+        raise VoltronException(f'"{path}" has no recorded session {session}')
+    return header, entries
+
+
+class ReplayClock(object):
+    # Virtual time of a replay: waits and recorded command latencies advance it, but only 1/speed of it is really
+    # slept (none at all with speed=None), so timeouts and poll schedules keep their recorded meaning
+
+    def __init__(self, speed=None):
+        self.speed = speed
+        self._offset = 0.0
+        self._lock = threading.Lock()
+
+    def monotonic(self) -> float:
+        return monotonic() + self._offset
+
+    def sleep(self, seconds):
+        if seconds <= 0:
+            return
+        real = seconds / self.speed if self.speed else 0.0
+        if real:
+            sleep(real)
+        with self._lock:
+            self._offset += seconds - real
+
+
+class ReplayDriver(WebDriver):
+    # Chrome WebDriver served from a Recorder trace: no browser, no session. Commands are matched to the trace in
+    # order; a wait that polls more often than the recording did gets the last answer again.
+
+    def __init__(self, path, session=0, clock: ReplayClock = None, strict=False):
+        # The parent __init__ would start a browser session
+        header, entries = load_trace(path, session)
+        self._entries = deque(entries)
+        self._last = None
+        self._strict = strict
+        self.clock = clock if clock is not None else ReplayClock()
+        self.replayed = 0
+        self.skipped = 0
+        self.session_id = header.get('session_id') or f'replay-{session}'
+        self.caps = header.get('capabilities') or {}
+        self.command_executor = None
+        self.error_handler = None
+        self.pinned_scripts = {}
+        self.locator_converter = LocatorConverter()
+        self._is_remote = True
+        self._switch_to = SwitchTo(self)
+        self._authenticator_id = None
+
+    def _next(self, driver_command, params):
+        signature = _signature(driver_command, params)
+        for position, entry in enumerate(self._entries):
+            if position >= (1 if self._strict else _LOOKAHEAD):
+                break
+            if _signature(entry['c'], entry['p']) == signature:
+                for _ in range(position):
+                    _logger.debug('*** Replay skipped recorded "%s"', self._entries.popleft()['c'])
+                self.skipped += position
+                self._last = self._entries.popleft()
+                return self._last
+        if self._last is not None and _signature(self._last['c'], self._last['p']) == signature:
+            return self._last
+        expected = _signature(self._entries[0]['c'], self._entries[0]['p'])[:120] if self._entries else 'end of trace'
+        raise ReplayDivergence(f'Replay diverged from the recording: got "{signature[:120]}", expected "{expected}"')
+
+    def execute(self, driver_command, params=None):
+        entry = self._next(driver_command, params)
+        self.replayed += 1
+        self.clock.sleep(entry['d'])
+        if 'e' in entry:
+            name, message = entry['e']
+            error = getattr(selenium_exceptions, name, None)
+            if not isinstance(error, type) or not issubclass(error, selenium_exceptions.WebDriverException):
+                error = selenium_exceptions.WebDriverException
+            raise error(message)
+        return {'value': self._unwrap_value(entry.get('r')), 'sessionId': self.session_id}
+
+    def quit(self):
+        if self._entries:
+            _logger.debug('*** Replay stopped with %d recorded commands left', len(self._entries))
+        self._entries.clear()
+
+
+def replay(path, speed=None, session=0, strict=False) -> ReplayDriver:
+    # Replay driver made the current one, with waits on its virtual clock
+    clock = ReplayClock(speed)
+    driver = ReplayDriver(path, session=session, clock=clock, strict=strict)
+    voltron_globals.set_clock(clock.monotonic, clock.sleep)
+    voltron_globals.set_driver(driver)
+    return driver
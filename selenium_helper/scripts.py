@@ -0,0 +1,391 @@
+# JavaScript snippets executed through WebDriver.execute_script.
+# Selectors are passed as the (by, value) pair returned by parse_selector.
+
+LOCATOR_PRELUDE = """
+function voltronFindAll(context, by, value) {
+    context = context || document;
+    switch (by) {
+        case 'xpath':
+            var snapshot = document.evaluate(value, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            var found = [];
+            for (var i = 0; i < snapshot.snapshotLength; i++) {
+                found.push(snapshot.snapshotItem(i));
+            }
+            return found;
+        case 'css selector':
+            return Array.prototype.slice.call(context.querySelectorAll(value));
+        case 'id':
+            return Array.prototype.slice.call(context.querySelectorAll('[id="' + value.replace(/"/g, '\\\\"') + '"]'));
+        case 'name':
+            return Array.prototype.slice.call(
+                context.querySelectorAll('[name="' + value.replace(/"/g, '\\\\"') + '"]'));
+        case 'tag name':
+            return Array.prototype.slice.call(context.getElementsByTagName(value));
+    }
+    throw new Error('Unsupported locator strategy "' + by + '"');
+}
+function voltronFind(context, by, value) {
+    var found = voltronFindAll(context, by, value);
+    return found.length ? found[0] : null;
+}
+function voltronIsVisible(element) {
+    if (!element || !element.isConnected) {
+        return false;
+    }
+    var style = window.getComputedStyle(element);
+    if (style.display === 'none' || style.visibility === 'hidden' || style.opacity === '0') {
+        return false;
+    }
+    return element.getClientRects().length > 0;
+}
+function voltronText(element) {
+    return element ? (element.innerText || element.textContent || '').trim() : '';
+}
+"""
+
+SCROLL_TO_CENTER = "return arguments[0].scrollIntoView({ behavior: 'instant', block: 'center' });"
+SCROLL_TO_BOTTOM = "window.scrollTo(0,document.body.scrollHeight);"
+SCROLL_TO_TOP = "window.scrollTo(0,0);"
+CLICK = "arguments[0].click()"
+OUTER_HTML = "return arguments[0].outerHTML;"
+# Live element of a snapshot node: its position among the captured root's descendant elements (-1: the root
+# itself), checked against the tag name so a DOM that changed or was parsed differently is not silently mistaken
+# arguments: captured root element or null for the document, index, lower-case tag name
+SNAPSHOT_NODE = """
+var root = arguments[0] || document.documentElement, index = arguments[1], tag = arguments[2];
+var element = index < 0 ? root : root.querySelectorAll('*')[index];
+return element && element.tagName.toLowerCase() === tag ? element : null;
+"""
+GET_VALUE = "return arguments[0].value;"
+SET_VALUE = """
+    arguments[0].setAttribute('value', arguments[1]);
+    arguments[0].value = arguments[1];
+    arguments[0].dispatchEvent(new Event('change'));
+    """
+
+# arguments: context, by, value, name by, name value, attribute names, limit
+HARVEST_ITEMS = LOCATOR_PRELUDE + """
+var context = arguments[0], by = arguments[1], value = arguments[2];
+var nameBy = arguments[3], nameValue = arguments[4], attributes = arguments[5] || [], limit = arguments[6];
+var items = voltronFindAll(context, by, value);
+if (limit !== null && limit !== undefined) {
+    items = items.slice(0, limit);
+}
+return items.map(function (item) {
+    var nameElement = nameBy ? voltronFind(item, nameBy, nameValue) : item;
+    var values = {};
+    attributes.forEach(function (attribute) {
+        values[attribute] = item.getAttribute(attribute);
+    });
+    return [item, voltronIsVisible(item), voltronText(nameElement), values];
+});
+"""
+
+# Names are compared trimmed, with collapsed whitespace and upper-cased; the expected name is normalized by the caller
+# arguments: context, by, value, name by, name value, normalized name, prefix match
+# returns: [item, name] of the first matching item or null
+FIND_ITEM_BY_NAME = LOCATOR_PRELUDE + """
+var context = arguments[0], by = arguments[1], value = arguments[2];
+var nameBy = arguments[3], nameValue = arguments[4], expected = arguments[5], prefix = arguments[6];
+var items = voltronFindAll(context, by, value);
+for (var i = 0; i < items.length; i++) {
+    var name = voltronText(nameBy ? voltronFind(items[i], nameBy, nameValue) : items[i]);
+    var normalized = name.replace(/\\s+/g, ' ').toUpperCase();
+    if (prefix ? normalized.indexOf(expected) === 0 : normalized === expected) {
+        return [items[i], name];
+    }
+}
+return null;
+"""
+
+# arguments: context, by, value
+COUNT_ITEMS = LOCATOR_PRELUDE + """
+return voltronFindAll(arguments[0], arguments[1], arguments[2]).length;
+"""
+
+# Async wait template: the condition body is evaluated on start, on every DOM mutation and on a slow safety tick.
+# arguments: timeout in ms, *condition arguments (available as `args`), callback
+WAIT_FOR_CONDITION = LOCATOR_PRELUDE + """
+var done = arguments[arguments.length - 1];
+var timeout = arguments[0];
+var args = Array.prototype.slice.call(arguments, 1, arguments.length - 1);
+var observer = null, timer = null, ticker = null, finished = false;
+function condition() {
+/*CONDITION*/
+}
+function finish(result) {
+    if (finished) {
+        return;
+    }
+    finished = true;
+    if (observer) {
+        observer.disconnect();
+    }
+    clearTimeout(timer);
+    clearInterval(ticker);
+    done(result);
+}
+function check() {
+    var result = null;
+    try {
+        result = condition.apply(null, args);
+    } catch (e) {
+        result = null;
+    }
+    if (result) {
+        finish(result);
+        return true;
+    }
+    return false;
+}
+if (!check()) {
+    observer = new MutationObserver(check);
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true});
+    ticker = setInterval(check, 250);
+    timer = setTimeout(function () { finish(null); }, timeout);
+}
+"""
+
+FIND_ELEMENT_CONDITION = "return voltronFind(args[0], args[1], args[2]);"
+FIND_ELEMENTS_CONDITION = "var found = voltronFindAll(args[0], args[1], args[2]); return found.length ? found : null;"
+
+
+def wait_condition_script(condition: str) -> str:
+    return WAIT_FOR_CONDITION.replace('/*CONDITION*/', condition)
+
+
+def condition_script(condition: str) -> str:
+    # The same condition body evaluated once, for polling from Python
+    return LOCATOR_PRELUDE + 'var args = arguments;\n' + condition
+
+
+# First state of a page-state map that holds, in priority order. States are [name, 'selector', by, value, visible
+# only] or [name, 'predicate', index into voltronStatePredicates]; predicates return an element, true or null.
+# args: context, states; result: [name, element or null] or null
+FIRST_MATCHING_STATE_CONDITION = """
+var context = args[0], states = args[1];
+var predicates = typeof voltronStatePredicates === 'undefined' ? [] : voltronStatePredicates;
+for (var i = 0; i < states.length; i++) {
+    var state = states[i], found = null;
+    if (state[1] === 'selector') {
+        var candidates = voltronFindAll(context, state[2], state[3]);
+        for (var j = 0; j < candidates.length && !found; j++) {
+            if (!state[4] || voltronIsVisible(candidates[j])) {
+                found = candidates[j];
+            }
+        }
+    } else {
+        found = predicates[state[2]](context || document);
+    }
+    if (found) {
+        return [state[0], found instanceof Element ? found : null];
+    }
+}
+return null;
+"""
+
+FOCUS = "arguments[0].focus();"
+
+# Steps of an ActionPipeline against one element, run in order until the first failure.
+# arguments: element, [[operation, *operation arguments], ...]
+# returns: [[true, value] or [false, error message], ...] for the steps that ran
+RUN_PIPELINE = LOCATOR_PRELUDE + """
+var element = arguments[0], steps = arguments[1], results = [];
+function voltronSetValue(element, expected) {
+    if (element.value === expected) {
+        return;
+    }
+    var prototype = element instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype :
+        element instanceof HTMLSelectElement ? HTMLSelectElement.prototype : HTMLInputElement.prototype;
+    var descriptor = Object.getOwnPropertyDescriptor(prototype, 'value');
+    if (descriptor && descriptor.set) {
+        descriptor.set.call(element, expected);
+    } else {
+        element.value = expected;
+    }
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+}
+for (var i = 0; i < steps.length; i++) {
+    var step = steps[i], value = null;
+    try {
+        switch (step[0]) {
+            case 'scroll': element.scrollIntoView({behavior: 'instant', block: 'center'}); break;
+            case 'click': element.click(); break;
+            case 'focus': element.focus(); break;
+            case 'blur': element.blur(); break;
+            case 'text': value = voltronText(element); break;
+            case 'attribute': value = element.getAttribute(step[1]); break;
+            case 'property': value = element[step[1]]; break;
+            case 'value': value = element.value; break;
+            case 'set_value': voltronSetValue(element, step[1]); value = element.value; break;
+            case 'displayed': value = voltronIsVisible(element); break;
+            default: throw new Error('unknown step "' + step[0] + '"');
+        }
+        results.push([true, value === undefined ? null : value]);
+    } catch (err) {
+        results.push([false, String(err && err.message || err)]);
+        break;
+    }
+}
+return results;
+"""
+
+# Form fields of a container with their question label. Radio buttons sharing a name are one field.
+# arguments: form container
+# returns: [[elements, kind, label, name, value, options, required], ...]; kind is the input type, 'textarea' or
+# 'select'; value is the checked state for checkboxes and the checked option text for radio groups
+FORM_FIELD_PRELUDE = """
+function voltronLabelOf(element) {
+    var label = null;
+    if (element.id) {
+        label = document.querySelector('label[for="' + CSS.escape(element.id) + '"]');
+    }
+    label = label || element.closest('label');
+    if (label) {
+        return (label.innerText || label.textContent || '').trim();
+    }
+    if (element.getAttribute('aria-labelledby')) {
+        return element.getAttribute('aria-labelledby').split(/\\s+/).map(function (id) {
+            var labelled = document.getElementById(id);
+            return labelled ? (labelled.innerText || labelled.textContent || '').trim() : '';
+        }).join(' ').trim();
+    }
+    return element.getAttribute('aria-label') || element.getAttribute('placeholder') || element.name || '';
+}
+function voltronFieldValue(elements, kind) {
+    var element = elements[0];
+    if (kind === 'checkbox') {
+        return element.checked;
+    }
+    if (kind === 'radio') {
+        var checked = elements.filter(function (radio) { return radio.checked; })[0];
+        return checked ? voltronLabelOf(checked) : null;
+    }
+    if (kind === 'select') {
+        var option = element.options[element.selectedIndex];
+        return option ? option.text.trim() : null;
+    }
+    return element.value;
+}
+"""
+
+DISCOVER_FORM_FIELDS = FORM_FIELD_PRELUDE + """
+var root = arguments[0] || document;
+var controls = root.querySelectorAll('input, textarea, select');
+var fields = [], groups = {};
+for (var i = 0; i < controls.length; i++) {
+    var control = controls[i];
+    var kind = control.tagName === 'INPUT' ? (control.type || 'text').toLowerCase() : control.tagName.toLowerCase();
+    if (['hidden', 'submit', 'button', 'reset', 'image', 'file'].indexOf(kind) !== -1 || control.disabled) {
+        continue;
+    }
+    if (kind === 'radio') {
+        var group = groups[control.name];
+        if (group) {
+            group[0].push(control);
+            group[5].push(voltronLabelOf(control));
+            continue;
+        }
+        var fieldset = control.closest('fieldset');
+        var legend = fieldset && fieldset.querySelector('legend');
+        group = groups[control.name] = [[control], kind,
+            legend ? (legend.innerText || legend.textContent || '').trim() : control.name,
+            control.name, null, [voltronLabelOf(control)], control.required];
+        fields.push(group);
+        continue;
+    }
+    var options = kind === 'select' ? Array.prototype.map.call(control.options, function (option) {
+        return option.text.trim();
+    }) : [];
+    fields.push([[control], kind, voltronLabelOf(control), control.name || control.id, null, options,
+        control.required || control.getAttribute('aria-required') === 'true']);
+}
+fields.forEach(function (field) {
+    field[4] = voltronFieldValue(field[0], field[1]);
+});
+return fields;
+"""
+
+# Sets every field in one call: native value setters plus input/change events for text and select fields, real
+# clicks for checkboxes and radios so frameworks see the same events as for a user
+# arguments: [[elements, kind, value], ...]; checkbox values are booleans, normalized by FormFillBase
+APPLY_FORM_VALUES = FORM_FIELD_PRELUDE + """
+function matches(text, expected) {
+    return (text || '').trim().toLowerCase() === String(expected).trim().toLowerCase();
+}
+arguments[0].forEach(function (entry) {
+    var elements = entry[0], kind = entry[1], value = entry[2], element = elements[0];
+    if (kind === 'checkbox') {
+        if (element.checked !== Boolean(value)) {
+            element.click();
+        }
+        return;
+    }
+    if (kind === 'radio') {
+        var radio = elements.filter(function (candidate) {
+            return matches(voltronLabelOf(candidate), value) || matches(candidate.value, value);
+        })[0];
+        if (radio && !radio.checked) {
+            radio.click();
+        }
+        return;
+    }
+    var prototype = HTMLInputElement.prototype;
+    if (kind === 'select') {
+        prototype = HTMLSelectElement.prototype;
+        var option = Array.prototype.filter.call(element.options, function (candidate) {
+            return matches(candidate.text, value) || matches(candidate.value, value);
+        })[0];
+        if (!option) {
+            return;
+        }
+        value = option.value;
+    } else if (kind === 'textarea') {
+        prototype = HTMLTextAreaElement.prototype;
+    }
+    element.dispatchEvent(new Event('focus'));
+    Object.getOwnPropertyDescriptor(prototype, 'value').set.call(element, String(value));
+    element.dispatchEvent(new Event('input', {bubbles: true}));
+    element.dispatchEvent(new Event('change', {bubbles: true}));
+    element.dispatchEvent(new Event('blur'));
+});
+"""
+
+# arguments: [[elements, kind], ...]; returns the current value of each field
+READ_FORM_VALUES = FORM_FIELD_PRELUDE + """
+return arguments[0].map(function (entry) {
+    return voltronFieldValue(entry[0], entry[1]);
+});
+"""
+
+# Frees the subtrees of nodes that were already processed. Emptied nodes keep their height so the scroll position
+# and occlusion logic of virtualized lists are not disturbed; the newest `keep` matches are left alone.
+# arguments: css selector of processed nodes, number of newest nodes to keep, whether to detach them entirely
+# returns: number of pruned nodes
+PRUNE_NODES = """
+var nodes = document.querySelectorAll(arguments[0]);
+var keep = arguments[1] || 0, detach = arguments[2], pruned = 0;
+for (var i = 0; i < nodes.length - keep; i++) {
+    var node = nodes[i];
+    if (node.hasAttribute('data-voltron-pruned')) {
+        continue;
+    }
+    if (detach) {
+        node.remove();
+    } else {
+        node.style.height = node.offsetHeight + 'px';
+        node.replaceChildren();
+        node.setAttribute('data-voltron-pruned', '1');
+    }
+    pruned++;
+}
+return pruned;
+"""
+
+# Fallback memory probe for sessions without CDP
+# returns: [used JS heap, total JS heap, DOM nodes] or null
+MEMORY_USAGE = """
+var memory = performance.memory;
+return memory ? [memory.usedJSHeapSize, memory.totalJSHeapSize, document.getElementsByTagName('*').length] : null;
+"""
@@ -0,0 +1,177 @@
+import re
+from functools import lru_cache
+
+from lxml import etree, html as lxml_html
+from lxml.cssselect import CSSSelector
+from selenium.common import NoSuchElementException, InvalidSelectorException
+from selenium.webdriver.common.by import By
+
+from selenium_helper.globals import get_driver, VoltronException
+from selenium_helper.scripts import OUTER_HTML, SNAPSHOT_NODE
+
+_HIDDEN_STYLE = re.compile(r'(display\s*:\s*none|visibility\s*:\s*hidden)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def _css(value) -> CSSSelector:
+    try:
+        return CSSSelector(value, translator='html')
+    except Exception as err:
+        raise InvalidSelectorException(f'Invalid css selector "{value}": {err}')
+
+
+def _text(node) -> str:
+    lines = (' '.join(line.split()) for line in node.text_content().splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+class DomSnapshot(object):
+    # Parsed copy of the page (page_source) or of one element (outerHTML), taken with a single WebDriver call.
+    # Nodes are mapped back to live elements through their position among the captured root's descendants; lxml
+    # paths are not used for that, they differ from the live DOM for namespaced (SVG, MathML) elements.
+
+    def __init__(self, source, live_root=None, driver=None):
+        self._driver = driver if driver is not None else get_driver()
+        self._live_root = live_root
+        if live_root is None:
+            self._root = lxml_html.document_fromstring(source)
+        else:
+            self._root = lxml_html.fragment_fromstring(source)
+        self._elements = {}
+        self._positions = None
+
+    @classmethod
+    def capture(cls, element=None, driver=None):
+        # Without an element the whole document is captured
+        driver = driver if driver is not None else get_driver()
+        if element is None:
+            return cls(driver.page_source, driver=driver)
+        return cls(driver.execute_script(OUTER_HTML, element), live_root=element, driver=driver)
+
+    @property
+    def root(self) -> 'SnapshotElement':
+        return self.element(self._root)
+
+    def element(self, node) -> 'SnapshotElement':
+        element = self._elements.get(node)
+        if element is None:
+            element = self._elements[node] = SnapshotElement(self, node)
+        return element
+
+    def select(self, node, by, value) -> list:
+        if by == By.XPATH:
+            try:
+                found = node.xpath(value)
+            except etree.XPathError as err:
+                raise InvalidSelectorException(f'Invalid xpath "{value}": {err}')
+            found = [match for match in found if isinstance(match, etree.ElementBase)]
+        elif by == By.CSS_SELECTOR:
+            # querySelectorAll never returns the element it is called on
+            found = [match for match in _css(value)(node) if match is not node]
+        elif by == By.ID:
+            found = node.xpath('.//*[@id=$value]', value=value)
+        elif by == By.NAME:
+            found = node.xpath('.//*[@name=$value]', value=value)
+        elif by == By.TAG_NAME:
+            found = node.xpath(f'.//{value}')
+        else:
+            raise InvalidSelectorException(f'Unsupported locator "{by}" in snapshot')
+        return [self.element(match) for match in found]
+
+    def position(self, node) -> int:
+        # Document-order index among the root's descendant elements, as querySelectorAll('*') counts them
+        if node is self._root:
+            return -1
+        if self._positions is None:
+            self._positions = {descendant: index for index, descendant in
+                               enumerate(item for item in self._root.iterdescendants() if isinstance(item.tag, str))}
+        return self._positions[node]
+
+    def to_live(self, element: 'SnapshotElement'):
+        if element.node is self._root and self._live_root is not None:
+            return self._live_root
+        position = self.position(element.node)
+        live = self._driver.execute_script(SNAPSHOT_NODE, self._live_root, position, element.node.tag.lower())
+        if live is None:
+            raise VoltronException(f'Snapshot element <{element.tag_name}> #{position} is no longer in the page')
+        return live
+
+    def is_visible(self, node) -> bool:
+        # Only what the markup says; computed styles are not part of a snapshot
+        while node is not None:
+            if 'hidden' in node.attrib or node.get('aria-hidden') == 'true' or node.get('type') == 'hidden':
+                return False
+            if _HIDDEN_STYLE.search(node.get('style', '')):
+                return False
+            node = node.getparent()
+        return True
+
+
+class SnapshotElement(object):
+    # Read-only WebElement stand-in; reads are answered from memory, interactions need live()
+    is_snapshot = True
+
+    def __init__(self, snapshot: DomSnapshot, node):
+        self.snapshot = snapshot
+        self.node = node
+
+    def __repr__(self):
+        return f'<SnapshotElement {self.node.tag} {dict(self.node.attrib)}>'
+
+    def find_element(self, by=By.ID, value=None):
+        found = self.snapshot.select(self.node, by, value)
+        if not found:
+            raise NoSuchElementException(
+                f'Unable to locate element in snapshot: {{"method":"{by}","selector":"{value}"}}')
+        return found[0]
+
+    def find_elements(self, by=By.ID, value=None) -> list:
+        return self.snapshot.select(self.node, by, value)
+
+    @property
+    def tag_name(self) -> str:
+        return self.node.tag
+
+    @property
+    def text(self) -> str:
+        # WebElement.text semantics: hidden elements have no rendered text
+        return _text(self.node) if self.snapshot.is_visible(self.node) else ''
+
+    def get_attribute(self, name):
+        if name in ('innerText', 'textContent'):
+            return _text(self.node)
+        if name in ('checked', 'selected', 'disabled', 'readonly', 'required', 'multiple'):
+            return 'true' if name in self.node.attrib else None
+        return self.node.get(name)
+
+    get_dom_attribute = get_attribute
+    get_property = get_attribute
+
+    def is_displayed(self) -> bool:
+        return self.snapshot.is_visible(self.node)
+
+    def is_enabled(self) -> bool:
+        return 'disabled' not in self.node.attrib
+
+    def is_selected(self) -> bool:
+        return 'checked' in self.node.attrib or 'selected' in self.node.attrib
+
+    def harvest(self, by, value, name_by, name_value, attributes, limit) -> list:
+        # Same records as the HARVEST_ITEMS script, whose names fall back to textContent for hidden elements, so
+        # names and item keys agree between snapshot and live mode
+        items = self.find_elements(by, value)
+        items = items if limit is None else items[:limit]
+        records = []
+        for item in items:
+            name_element = (item.find_elements(name_by, name_value) or [None])[0] if name_by else item
+            records.append([item, item.is_displayed(), _text(name_element.node) if name_element is not None else '',
+                            {attribute: item.node.get(attribute) for attribute in attributes}])
+        return records
+
+    def live(self):
+        return self.snapshot.to_live(self)
+
+    def _read_only(self, *args, **kwargs):
+        raise VoltronException(f'<{self.node.tag}> is a read-only snapshot element, use live() to interact with it')
+
+    click = clear = send_keys = submit = _read_only
@@ -0,0 +1,105 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from time import monotonic
+
+LOGGER_NAME = 'voltron_logger'
+DEFAULT_FORMAT = '%(asctime)s %(levelname)-7s %(threadName)s %(name)s: %(message)s'
+# Pass as `extra=` on messages logged once per poll; the sampling filter keeps one of them per call site and interval
+SAMPLED = {'voltron_sampled': True}
+
+_listener = None
+_handler = None
+_lock = threading.Lock()
+
+
+class lazy(object):
+    # %-style logging argument that calls `func` only when the record is formatted, i.e. when its level is enabled.
+    # The QueueHandler merges the arguments in the thread that logs, while the driver or element is still valid.
+    __slots__ = ('_func', '_args')
+
+    def __init__(self, func, *args):
+        self._func = func
+        self._args = args
+
+    def __str__(self):
+        try:
+            return str(self._func(*self._args))
+        except Exception as err:
+            return f'<unavailable: {err.__class__.__name__}>'
+
+    __repr__ = __str__
+
+
+class RateSamplingFilter(logging.Filter):
+    # Lets through one SAMPLED record per call site every `interval` seconds; the next one that passes tells how many
+    # were dropped in between. Records without the SAMPLED marker are never dropped.
+
+    def __init__(self, interval=1.0):
+        super().__init__()
+        self.interval = interval
+        self._sites = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not getattr(record, 'voltron_sampled', False) or self.interval <= 0:
+            return True
+        site = (record.pathname, record.lineno)
+        now = monotonic()
+        with self._lock:
+            last, dropped = self._sites.get(site, (None, 0))
+            if last is not None and now - last < self.interval:
+                self._sites[site] = (last, dropped + 1)
+                return False
+            self._sites[site] = (now, 0)
+        if dropped:
+            record.msg = f'{record.msg} (+{dropped} similar suppressed)'
+        return True
+
+
+def configure_logging(level=None, loggers=(LOGGER_NAME,), root_level=logging.WARNING, sample_interval=1.0,
+                      handlers=None, fmt=DEFAULT_FORMAT) -> QueueListener:
+    # Every record goes through an in-memory queue; formatting of the final output and all I/O happen on the
+    # listener thread. `level` (default VOLTRON_LOG_LEVEL or INFO) applies to `loggers`, everything else only
+    # logs from `root_level` up.
+    global _listener, _handler
+    level = level if level is not None else os.environ.get('VOLTRON_LOG_LEVEL', 'INFO').upper()
+    if handlers is None:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(fmt))
+        handlers = [stream_handler]
+    with _lock:
+        _stop()
+        records = queue.SimpleQueue()
+        _handler = QueueHandler(records)
+        _handler.addFilter(RateSamplingFilter(sample_interval))
+        root = logging.getLogger()
+        root.addHandler(_handler)
+        root.setLevel(root_level)
+        for name in loggers:
+            logging.getLogger(name).setLevel(level)
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+    return _listener
+
+
+def _stop():
+    global _listener, _handler
+    if _handler is not None:
+        logging.getLogger().removeHandler(_handler)
+        _handler = None
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def stop_logging():
+    # Flushes the queue; registered at exit so no record is lost
+    with _lock:
+        _stop()
+
+
+atexit.register(stop_logging)
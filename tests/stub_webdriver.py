@@ -0,0 +1,148 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from aiohttp import web
+
+from selenium_helper.scripts import GET_VALUE, RUN_PIPELINE, FIND_ITEM_BY_NAME
+
+# Spelled out rather than imported, so the tests check the protocol and not the client's constant
+ELEMENT_KEY = 'element-6066-11e4-a52e-4f735466cecf'
+
+
+class StubWebDriverServer(object):
+    # Minimal W3C WebDriver endpoint: css selectors resolve to element ids, elements have a text and a value
+
+    def __init__(self, elements=None, items=None):
+        # {css selector: (element id, text)}
+        self.elements = dict(elements or {})
+        # List items for FIND_ITEM_BY_NAME, {css selector: [(element id, name), ...]}
+        self.items = dict(items or {})
+        # {(session id, element id): value}
+        self.values = {}
+        self.sessions = 0
+        self.commands = []
+        self.clicked = []
+        app = web.Application()
+        app.router.add_post('/session', self._new_session)
+        app.router.add_delete('/session/{session}', self._delete_session)
+        app.router.add_post('/session/{session}/element', self._find_element)
+        app.router.add_post('/session/{session}/elements', self._find_elements)
+        app.router.add_get('/session/{session}/element/{element}/text', self._text)
+        app.router.add_post('/session/{session}/element/{element}/clear', self._clear)
+        app.router.add_post('/session/{session}/element/{element}/click', self._click)
+        app.router.add_post('/session/{session}/element/{element}/value', self._send_keys)
+        app.router.add_post('/session/{session}/execute/sync', self._execute)
+        self._runner = web.AppRunner(app)
+        self.url = None
+
+    async def start(self):
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+        self.url = f'http://127.0.0.1:{self._runner.addresses[0][1]}'
+
+    async def stop(self):
+        await self._runner.cleanup()
+
+    @staticmethod
+    def _ok(value=None):
+        return web.json_response({'value': value})
+
+    @staticmethod
+    def _error(error, message, status=404):
+        return web.json_response({'value': {'error': error, 'message': message}}, status=status)
+
+    def _log(self, request):
+        self.commands.append((request.method, request.path))
+
+    async def _new_session(self, request):
+        self._log(request)
+        self.sessions += 1
+        return self._ok({'sessionId': f'stub-session-{self.sessions}', 'capabilities': {'browserName': 'stub'}})
+
+    async def _delete_session(self, request):
+        self._log(request)
+        return self._ok()
+
+    async def _find_element(self, request):
+        self._log(request)
+        locator = await request.json()
+        if locator['value'] not in self.elements:
+            return self._error('no such element', f'Unable to locate {locator["value"]}')
+        return self._ok({ELEMENT_KEY: self.elements[locator['value']][0]})
+
+    async def _find_elements(self, request):
+        self._log(request)
+        locator = await request.json()
+        found = self.elements.get(locator['value'])
+        return self._ok([{ELEMENT_KEY: found[0]}] if found else [])
+
+    def _by_id(self, element_id):
+        return next(text for found_id, text in self.elements.values() if found_id == element_id)
+
+    async def _text(self, request):
+        self._log(request)
+        return self._ok(self._by_id(request.match_info['element']))
+
+    async def _click(self, request):
+        self._log(request)
+        self.clicked.append(request.match_info['element'])
+        return self._ok()
+
+    async def _clear(self, request):
+        self._log(request)
+        self.values[request.match_info['session'], request.match_info['element']] = ''
+        return self._ok()
+
+    async def _send_keys(self, request):
+        self._log(request)
+        key = request.match_info['session'], request.match_info['element']
+        # Special keys (SHIFT+TAB) move the focus, they do not type
+        typed = ''.join(symbol for symbol in (await request.json())['text'] if not '\ue000' <= symbol <= '\ue0ff')
+        self.values[key] = self.values.get(key, '') + typed
+        return self._ok()
+
+    async def _execute(self, request):
+        self._log(request)
+        payload = await request.json()
+        element = payload['args'][0][ELEMENT_KEY] if payload['args'] else None
+        key = request.match_info['session'], element
+        if payload['script'] == GET_VALUE:
+            return self._ok(self.values.get(key, ''))
+        if payload['script'] == RUN_PIPELINE:
+            return self._ok(self._run_pipeline(key, payload['args'][1]))
+        if payload['script'] == FIND_ITEM_BY_NAME:
+            return self._ok(self._find_item_by_name(*payload['args'][1:]))
+        return self._ok()
+
+    def _run_pipeline(self, key, steps):
+        results = []
+        for name, *args in steps:
+            if name == 'set_value':
+                self.values[key] = args[0]
+            elif name not in ('scroll', 'focus', 'blur', 'value'):
+                results.append([False, f'unknown step "{name}"'])
+                break
+            results.append([True, self.values.get(key, '') if name in ('set_value', 'value') else None])
+        return results
+
+    def _find_item_by_name(self, by, value, name_by, name_value, expected, prefix):
+        for element_id, name in self.items.get(value, ()):
+            normalized = ' '.join(name.split()).upper()
+            if normalized.startswith(expected) if prefix else normalized == expected:
+                return [{ELEMENT_KEY: element_id}, name]
+        return None
+
+
+@asynccontextmanager
+async def stub_webdriver(elements=None, items=None):
+    server = StubWebDriverServer(elements, items)
+    await server.start()
+    try:
+        yield server
+    finally:
+        await server.stop()
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
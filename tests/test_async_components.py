@@ -0,0 +1,141 @@
+import asyncio
+import gc
+import warnings
+
+import pytest
+
+from selenium_helper.AsyncComponentBase import AsyncComponentBase
+from selenium_helper.AsyncInputBase import AsyncInputBase
+from selenium_helper.async_globals import set_async_driver, wait_for_result, find_elements
+from selenium_helper.async_webdriver import AsyncWebDriver
+from selenium_helper.globals import VoltronException
+from tests.stub_webdriver import stub_webdriver, run
+
+ELEMENTS = {'ul.results': ('results', 'React Developer'), 'input.search': ('search', '')}
+
+
+async def _session(server):
+    driver = await AsyncWebDriver.create(server.url)
+    set_async_driver(driver)
+    return driver
+
+
+def test_component_is_found_and_reads_text():
+    async def scenario():
+        async with stub_webdriver(ELEMENTS) as server:
+            driver = await _session(server)
+            try:
+                results = await AsyncComponentBase(selector='css=ul.results')
+                assert results._we.id == 'results'
+                assert await results.name == 'React Developer'
+            finally:
+                await driver.quit()
+
+    run(scenario())
+
+
+def test_missing_component_raises_instead_of_keeping_the_coroutine():
+    async def scenario():
+        async with stub_webdriver(ELEMENTS) as server:
+            driver = await _session(server)
+            try:
+                with pytest.raises(VoltronException, match='component not found'):
+                    await AsyncComponentBase(selector='css=.missing', timeout=0.3)
+            finally:
+                await driver.quit()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('error', RuntimeWarning)
+        run(scenario())
+        gc.collect()
+
+
+def test_wait_for_result_returns_last_finished_value_on_timeout():
+    async def failing():
+        raise VoltronException('not yet')
+
+    result = run(wait_for_result(failing, bypass_exceptions=(VoltronException,), timeout=0.1))
+    assert result is None
+
+
+def test_find_elements_waits_for_late_elements():
+    async def scenario():
+        async with stub_webdriver(ELEMENTS) as server:
+            driver = await _session(server)
+            try:
+                asyncio.get_running_loop().call_later(0.2, server.elements.update, {'li.result': ('item', 'Job')})
+                elements = await find_elements('css=li.result', timeout=2)
+                assert [element.id for element in elements] == ['item']
+            finally:
+                await driver.quit()
+
+    run(scenario())
+
+
+def test_sessions_share_one_event_loop():
+    async def scenario():
+        async with stub_webdriver(ELEMENTS) as server:
+            async def one_session():
+                driver = await _session(server)
+                try:
+                    search = await AsyncInputBase(selector='css=input.search')
+                    await search.set_value('react')
+                    return await search.value
+                finally:
+                    await driver.quit()
+
+            assert await asyncio.gather(*(one_session() for _ in range(5))) == ['react'] * 5
+
+    run(scenario())
+
+
+def test_set_value_types_in_bulk_and_reads_back_once():
+    async def scenario():
+        async with stub_webdriver(ELEMENTS) as server:
+            driver = await _session(server)
+            try:
+                search = await AsyncInputBase(selector='css=input.search')
+                del server.commands[:]
+                await search.set_value('react developer')
+                assert server.values[driver.session_id, 'search'] == 'react developer'
+                # Scroll and clear, one bulk send_keys, blur and read-back
+                assert [method for method, _ in server.commands] == ['POST'] * 3
+                assert server.commands[1][1].endswith('/element/search/value')
+            finally:
+                await driver.quit()
+
+    run(scenario())
+
+
+class _Job(AsyncComponentBase):
+    pass
+
+
+class _Jobs(AsyncComponentBase):
+    _list_item_type = _Job
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._item = 'css=li.job'
+
+
+def test_click_item_looks_up_by_name_and_reuses_the_index():
+    items = {'li.job': [('job-1', 'React Developer'), ('job-2', ' Vue   developer ')]}
+
+    async def scenario():
+        async with stub_webdriver(ELEMENTS, items) as server:
+            driver = await _session(server)
+            try:
+                jobs = await _Jobs(selector='css=ul.results')
+                await jobs.click_item('vue developer')
+                lookups = sum(1 for _, path in server.commands if path.endswith('/execute/sync'))
+                await jobs.click_item('Vue Developer')
+                assert server.clicked == ['job-2', 'job-2']
+                # The second click only scrolls: the name came from the index
+                assert sum(1 for _, path in server.commands if path.endswith('/execute/sync')) == lookups + 1
+                with pytest.raises(VoltronException, match=r"not found in items list: \[' Vue   developer '\]"):
+                    await jobs.click_item('Angular Developer', timeout=0.2)
+            finally:
+                await driver.quit()
+
+    run(scenario())
@@ -0,0 +1,74 @@
+import pytest
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.scenarios import ResultsList, build_search_fixture
+from selenium_helper import scripts
+from selenium_helper.globals import VoltronException, compile_selector, set_driver
+
+
+@pytest.fixture
+def driver():
+    fake = FakeWebDriver(build_search_fixture(5))
+    set_driver(fake)
+    yield fake
+    set_driver(None)
+
+
+def _count_script(driver, script):
+    calls = []
+    handler = driver._scripts[script]
+
+    def counted(*args):
+        calls.append(args)
+        return handler(*args)
+
+    driver.register_script(script, counted)
+    return calls
+
+
+def _results():
+    return ResultsList(selector=compile_selector('css=ul.results'))
+
+
+def test_click_item_reuses_harvested_names(driver):
+    results = _results()
+    assert len(results.items_names) == 5
+    lookups = _count_script(driver, scripts.FIND_ITEM_BY_NAME)
+    results.click_item('react  developer 3')
+    assert lookups == []
+    assert driver.find_element('css selector', 'li[data-job-id="3"]').get_attribute('data-clicks') == '1'
+
+
+def test_missing_item_does_not_harvest_the_list(driver):
+    results = _results()
+    results.click_item('React Developer 1')
+    harvests = _count_script(driver, scripts.HARVEST_ITEMS)
+    with pytest.raises(VoltronException, match=r"not found in items list: \['React Developer 1'\]"):
+        results.click_item('Angular Developer', timeout=0.2)
+    assert harvests == []
+
+
+def test_items_are_harvested_with_one_script_call(driver):
+    results = _results()
+    harvests = _count_script(driver, scripts.HARVEST_ITEMS)
+    driver.commands.clear()
+    items = results.items
+    assert [item.name for item in items] == [f'React Developer {index}' for index in range(5)]
+    assert [item.get_attribute('data-job-id') for item in items] == [str(index) for index in range(5)]
+    assert len(harvests) == 1 and driver.commands['executeScript'] == 1
+
+
+def test_one_by_one_harvest_gives_the_same_names(driver, monkeypatch):
+    batched = _results().items_names
+    monkeypatch.setattr(ResultsList, '_harvest_in_batch', False)
+    harvests = _count_script(driver, scripts.HARVEST_ITEMS)
+    assert _results().items_names == batched
+    assert harvests == []
+
+
+def test_hidden_items_are_left_out(driver):
+    driver.find_element('css selector', 'li[data-job-id="2"]').node.set('style', 'display:none')
+    driver.dom_changed()
+    assert [item.name for item in _results().items] == ['React Developer 0', 'React Developer 1',
+                                                        'React Developer 3', 'React Developer 4']
+    assert _results().count_of_items == 5
@@ -0,0 +1,73 @@
+from xml.etree import ElementTree
+
+import pytest
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.scenarios import build_search_fixture
+from selenium_helper.InputBase import InputBase
+from selenium_helper.component_cache import SelfHealingComponent, cached_component, invalidate_components
+from selenium_helper.globals import compile_selector, navigate, set_driver
+
+
+@pytest.fixture
+def driver():
+    fake = FakeWebDriver(build_search_fixture(1))
+    set_driver(fake)
+    yield fake
+    set_driver(None)
+
+
+class _SearchPage(object):
+    def __init__(self):
+        self.built = 0
+
+    @cached_component
+    def search(self):
+        self.built += 1
+        return InputBase(selector=compile_selector('css=#global-nav-typeahead'), timeout=1)
+
+    @cached_component(track_url=True)
+    def tracked_search(self):
+        self.built += 1
+        return InputBase(selector=compile_selector('css=#global-nav-typeahead'), timeout=1)
+
+
+def _rerender_search(driver):
+    # Swaps the input for an identical new node, as a framework re-render does
+    header = driver.find_element('css selector', 'header').node
+    driver.remove(header[0])
+    ElementTree.SubElement(header, 'input', {'id': 'global-nav-typeahead', 'value': ''})
+    driver.dom_changed()
+
+
+def test_component_is_built_once_per_navigation(driver):
+    page = _SearchPage()
+    search = page.search
+    assert isinstance(search, SelfHealingComponent) and page.search is search and page.built == 1
+    navigate('https://www.linkedin.com/jobs/', driver)
+    assert page.search is not search and page.built == 2
+    assert page.search is page.search and page.built == 2
+
+
+def test_url_tracking_rebuilds_after_plain_get(driver):
+    page = _SearchPage()
+    tracked, search = page.tracked_search, page.search
+    driver.get('https://www.linkedin.com/jobs/search/?keywords=react')
+    assert page.tracked_search is not tracked and page.search is search
+
+
+def test_invalidate_drops_every_component_of_the_page(driver):
+    page = _SearchPage()
+    search = page.search
+    invalidate_components(page)
+    assert page.search is not search and page.built == 2
+
+
+def test_stale_component_locates_itself_again(driver):
+    page = _SearchPage()
+    search = page.search
+    _rerender_search(driver)
+    search.value = 'Hiring React Js'
+    assert driver.find_element('css selector', '#global-nav-typeahead').get_attribute('value') == 'Hiring React Js'
+    # Healed in place: the cached proxy is kept and nothing was rebuilt
+    assert page.search is search and page.built == 1
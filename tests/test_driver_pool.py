@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+from selenium.common import WebDriverException
+
+from selenium_helper.driver_pool import DriverPool
+from selenium_helper.globals import VoltronException, get_driver
+
+
+class _Driver(object):
+    # Browser on a profile that only becomes free again once quit() has finished
+    def __init__(self, profile, free_profiles):
+        self.profile = profile
+        self._free_profiles = free_profiles
+
+    def quit(self):
+        time.sleep(0.2)
+        self._free_profiles.append(self.profile)
+
+
+def test_discarded_session_frees_its_slot_only_after_quit():
+    free_profiles = [0]
+
+    def factory():
+        return _Driver(free_profiles.pop(0), free_profiles)
+
+    pool = DriverPool(factory, size=1, health_check=None)
+    session = pool.acquire()
+    releasing = threading.Thread(target=pool.release, args=(session,), kwargs={'crashed': True})
+    releasing.start()
+    time.sleep(0.05)
+    # The crashed session is still quitting: the replacement must wait for its profile instead of failing
+    replacement = pool.acquire(timeout=5)
+    releasing.join()
+    assert replacement.driver.profile == 0 and free_profiles == []
+    pool.release(replacement)
+    pool.close()
+    assert free_profiles == [0]
+
+
+class _Browser(object):
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.quits = 0
+
+    def quit(self):
+        self.quits += 1
+
+
+def _pool(browsers, **kwargs):
+    def factory():
+        browsers.append(_Browser(len(browsers)))
+        return browsers[-1]
+
+    return DriverPool(factory, **{'health_check': lambda driver: driver.alive, **kwargs})
+
+
+def test_sessions_bind_their_driver_to_the_thread():
+    browsers = []
+    pool = _pool(browsers, size=3)
+    started = threading.Barrier(3)
+
+    def visit(item):
+        started.wait(timeout=5)
+        # Every worker sees its own browser through the globals, not a shared one
+        return item, get_driver().number
+
+    results = pool.map(visit, range(3))
+    pool.close()
+    assert [item for item, _ in results] == [0, 1, 2]
+    assert sorted(number for _, number in results) == [0, 1, 2]
+    assert [browser.quits for browser in browsers] == [1, 1, 1]
+    assert get_driver() is None
+
+
+def test_sessions_are_recycled_after_max_uses():
+    browsers = []
+    pool = _pool(browsers, size=1, max_uses=2)
+    used = [pool.run(lambda: get_driver().number) for _ in range(5)]
+    assert used == [0, 0, 1, 1, 2]
+    assert [browser.quits for browser in browsers] == [1, 1, 0]
+
+
+def test_unhealthy_session_is_replaced():
+    browsers = []
+    pool = _pool(browsers, size=1)
+    with pool.session() as driver:
+        driver.alive = False
+    # The idle session is checked on its next checkout, not trusted
+    with pool.session() as driver:
+        assert driver.number == 1
+    assert browsers[0].quits == 1
+
+
+def test_session_crashing_its_browser_is_discarded():
+    browsers = []
+    pool = _pool(browsers, size=1)
+    with pytest.raises(WebDriverException):
+        with pool.session() as driver:
+            driver.alive = False
+            raise WebDriverException('chrome not reachable')
+    assert browsers[0].quits == 1
+    pool.close()
+    with pytest.raises(VoltronException, match='closed'):
+        pool.acquire()
@@ -0,0 +1,80 @@
+import json
+import time
+
+import pytest
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.scenarios import build_search_fixture
+from selenium_helper.FormFillBase import AnswerCache, FormFillBase
+from selenium_helper.globals import compile_selector, set_driver
+
+
+@pytest.fixture
+def driver():
+    fake = FakeWebDriver(build_search_fixture(1))
+    set_driver(fake)
+    yield fake
+    set_driver(None)
+
+
+def _form():
+    return FormFillBase(selector=compile_selector('css=form#apply'), timeout=2)
+
+
+def _value(driver, selector, name='value'):
+    return driver.find_element('css selector', selector).get_attribute(name)
+
+
+def test_labels_match_despite_punctuation_and_wording(driver, tmp_path):
+    path = tmp_path / 'answers.json'
+    path.write_text(json.dumps({'Mobile phone number': '+91 98765 43210',
+                                'Years of experience in React': '4'}))
+    result = _form().fill(AnswerCache(str(path)))
+    assert result.filled == {'Mobile phone number *': '+91 98765 43210', 'Years of experience with React?': '4'}
+    assert _value(driver, '#years') == '4'
+
+
+def test_select_takes_the_option_text(driver):
+    result = _form().fill({'Notice period': 'one month'})
+    assert result.filled == {'Notice period': 'One month'} and not result.mismatched
+    assert _value(driver, '#notice option[value="2"]', 'selected') == 'selected'
+
+
+@pytest.mark.parametrize('answer, checked', [(True, True), ('Yes', True), ('No', False), ('false', False)])
+def test_checkbox_answers_are_booleans(driver, answer, checked):
+    result = _form().fill({'Willing to relocate': answer})
+    assert (_value(driver, 'input[name="relocate"]', 'checked') is not None) is checked
+    assert not result.mismatched and not [field for field in result.unanswered if field.kind == 'checkbox']
+
+
+def test_unrecognized_checkbox_answer_is_left_unanswered(driver):
+    result = _form().fill({'Willing to relocate': 'maybe'})
+    assert [field.label for field in result.unanswered if field.kind == 'checkbox'] == ['Willing to relocate']
+    assert _value(driver, 'input[name="relocate"]', 'checked') is None
+
+
+def test_missing_answers_are_reported(driver):
+    result = _form().fill({'Notice period': 'Immediately'})
+    assert sorted(field.label for field in result.unanswered) == [
+        'Mobile phone number *', 'Willing to relocate', 'Years of experience with React?']
+    assert result.complete
+
+
+def test_form_without_fields_returns_at_once(driver):
+    form = driver.find_element('css selector', 'form#apply').node
+    for child in list(form):
+        form.remove(child)
+    driver.dom_changed()
+    started = time.monotonic()
+    assert _form().fields() == []
+    assert time.monotonic() - started < 1
+
+
+def test_new_answers_are_remembered(driver, tmp_path):
+    path = tmp_path / 'answers.json'
+    path.write_text(json.dumps({'Notice period': 'Immediately'}))
+    _form().fill(AnswerCache(str(path)), overrides={'Years of experience with React': '5'})
+    saved = json.loads(path.read_text())
+    assert saved['years of experience with react'] == '5'
+    assert saved['notice period'] == 'Immediately'
+    assert AnswerCache(str(path)).get('Years of experience with React?') == '5'
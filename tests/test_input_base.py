@@ -0,0 +1,79 @@
+import pytest
+from selenium.webdriver import Keys
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.scenarios import build_search_fixture
+from selenium_helper import globals as voltron_globals
+from selenium_helper.InputBase import TYPING_BULK, TYPING_CDP, TYPING_CHUNKED, TYPING_PER_CHAR, InputBase
+from selenium_helper.globals import VoltronException, compile_selector, set_driver
+
+
+@pytest.fixture
+def driver():
+    fake = FakeWebDriver(build_search_fixture(1))
+    set_driver(fake)
+    yield fake
+    set_driver(None)
+
+
+@pytest.fixture
+def pauses():
+    slept = []
+    voltron_globals.set_clock(sleep_func=slept.append)
+    yield slept
+    voltron_globals.set_clock()
+
+
+def _search():
+    return InputBase(selector=compile_selector('css=#global-nav-typeahead'), timeout=2)
+
+
+def _typed(driver):
+    return driver.find_element('css selector', '#global-nav-typeahead').get_attribute('value')
+
+
+@pytest.mark.parametrize('mode, sends', [(TYPING_BULK, 1), (TYPING_CHUNKED, 3), (TYPING_PER_CHAR, 17)])
+def test_typing_modes_send_keys_in_chunks_of_their_size(driver, pauses, mode, sends):
+    search = _search()
+    driver.commands.clear()
+    search.send_keys('Hiring React Js 2', delay=0.01, mode=mode)
+    assert driver.commands['sendKeysToElement'] == sends
+    assert len(pauses) == (0 if mode == TYPING_BULK else sends)
+    assert _typed(driver) == 'Hiring React Js 2'
+
+
+def test_cdp_typing_inserts_text_in_one_command(driver):
+    search = _search()
+    driver.commands.clear()
+    search.send_keys('Hiring React Js', mode=TYPING_CDP)
+    assert driver.commands['executeCdpCommand'] == 1 and driver.commands['sendKeysToElement'] == 0
+
+
+def test_cdp_typing_leaves_special_keys_to_send_keys(driver):
+    search = _search()
+    driver.commands.clear()
+    search.send_keys('Hiring React Js' + Keys.ENTER, mode=TYPING_CDP)
+    assert driver.commands['executeCdpCommand'] == 0 and driver.commands['sendKeysToElement'] == 1
+
+
+def test_unknown_typing_mode_is_rejected(driver):
+    with pytest.raises(VoltronException, match='Unknown typing mode "voice"'):
+        _search().send_keys('React', mode='voice')
+
+
+def test_setting_a_value_takes_three_round_trips(driver):
+    search = _search()
+    driver.commands.clear()
+    search.value = 'Hiring React Js'
+    # Scroll and clear, typing, blur and read-back
+    assert driver.command_count == 3
+    assert driver.commands['executeScript'] == 2 and driver.commands['sendKeysToElement'] == 1
+    assert _typed(driver) == 'Hiring React Js'
+
+
+def test_value_is_written_by_script_when_typing_goes_missing(driver, monkeypatch):
+    # The fake's Input.insertText types nothing, like a page swallowing the keystrokes
+    monkeypatch.setattr(InputBase, '_typing_mode', TYPING_CDP)
+    search = _search()
+    search.value = 'Hiring React Js'
+    assert _typed(driver) == 'Hiring React Js'
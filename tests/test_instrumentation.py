@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.scenarios import ResultsList, build_search_fixture
+from selenium_helper import globals as voltron_globals
+from selenium_helper.globals import compile_selector, set_driver, wait_for_result
+from selenium_helper.instrumentation import LatencyStats, Tracer
+
+
+@pytest.fixture
+def driver():
+    fake = FakeWebDriver(build_search_fixture(3))
+    set_driver(fake)
+    yield fake
+    set_driver(None)
+
+
+@pytest.fixture
+def tracer(driver):
+    tracer = Tracer()
+    tracer.instrument(driver)
+    yield tracer
+    tracer.uninstrument()
+
+
+def test_commands_are_counted_per_component_method(driver, tracer):
+    ResultsList(selector=compile_selector('css=ul.results')).items_names
+    driver.get('https://www.linkedin.com/jobs/')
+    assert tracer.command_count == driver.command_count == 3
+    owners = {owner: command for owner, command in tracer._owners}
+    assert owners['ResultsList._find_element_by_selector'] == 'findElement'
+    # Outside any component the first frame of non-framework code owns the command, here the fake itself
+    assert owners['FakeWebDriver.get'] == 'get'
+    assert 'ResultsList._find_element_by_selector / findElement' in tracer.summary()
+
+
+def test_waits_are_recorded_by_caller(tracer):
+    wait_for_result(lambda: False, name='never', timeout=0.1)
+    assert tracer.wait_time >= 0.1
+    assert 'test_waits_are_recorded_by_caller' in tracer.summary()
+
+
+def test_chrome_trace_has_an_event_per_command_and_wait(driver, tracer, tmp_path):
+    driver.find_element('css selector', 'ul.results')
+    wait_for_result(lambda: True, name='ready')
+    path = tmp_path / 'trace.json'
+    tracer.export_chrome_trace(str(path))
+    events = json.loads(path.read_text())['traceEvents']
+    assert [(event['name'], event['cat'], event['ph']) for event in events] == [
+        ('findElement', 'webdriver', 'X'), ('wait: ready', 'wait', 'X')]
+
+
+def test_uninstrument_restores_the_driver(driver, tracer):
+    tracer.uninstrument()
+    assert driver.execute.__func__ is FakeWebDriver.execute
+    assert tracer.record_wait not in voltron_globals.wait_observers
+    driver.find_element('css selector', 'ul.results')
+    assert tracer.command_count == 0
+
+
+def test_percentiles_are_bucket_bounds_capped_by_the_max():
+    stats = LatencyStats()
+    for elapsed in [0.003] * 90 + [0.040] * 9 + [0.300]:
+        stats.add(elapsed)
+    assert stats.percentile(0.5) == 5
+    assert stats.percentile(0.95) == 50
+    assert stats.percentile(1.0) == pytest.approx(300)
@@ -0,0 +1,89 @@
+import json
+
+import pytest
+
+from Linkedin import JobCapture
+from Linkedin.JobCapture import jobs_from_responses, stream_captured_jobs
+from selenium_helper import globals as voltron_globals
+from selenium_helper.network_capture import ReplaySource, CapturedResponse
+
+
+def _card(job_id, title):
+    return {'$type': 'com.linkedin.voyager.dash.jobs.JobPostingCard',
+            '*jobPosting': f'urn:li:fsd_jobPosting:{job_id}',
+            'jobPostingTitle': title, 'primaryDescription': {'text': f'Company {job_id}'},
+            'secondaryDescription': {'text': 'Pune'},
+            'footerItems': [{'type': 'LISTED_DATE', 'timeAt': 1760745600000}]}
+
+
+def _posting(job_id, title):
+    return {'$type': 'com.linkedin.voyager.dash.jobs.JobPosting', 'entityUrn': f'urn:li:fsd_jobPosting:{job_id}',
+            'title': title}
+
+
+def _body(*entities) -> bytes:
+    return json.dumps({'data': {}, 'included': list(entities)}).encode('utf-8')
+
+
+def _save(directory, number, body, url):
+    (directory / f'{number:06d}.json').write_bytes(body)
+    (directory / f'{number:06d}.meta.json').write_text(json.dumps(
+        {'request_id': str(number), 'url': url, 'status': 200, 'mime_type': 'application/json'}))
+
+
+@pytest.fixture
+def virtual_clock():
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    voltron_globals.set_clock(lambda: now[0], sleep)
+    yield now
+    voltron_globals.set_clock()
+
+
+def test_saved_bodies_replay_into_job_records(tmp_path):
+    _save(tmp_path, 1, _body(_card('101', 'React Developer'), _posting('101', 'React Developer (posting)'),
+                             _posting('102', 'Vue Developer')),
+          'https://www.linkedin.com/voyager/api/voyagerJobsDashJobCards')
+    _save(tmp_path, 2, b'{"included": [', 'https://www.linkedin.com/voyager/api/voyagerJobsDashJobPostings')
+    source = ReplaySource(str(tmp_path))
+    records = list(jobs_from_responses(source.drain()))
+    assert [(record.job_id, record.title) for record in records] == [('101', 'React Developer'),
+                                                                      ('102', 'Vue Developer')]
+    assert records[0].company == 'Company 101' and records[0].posted == '2025-10-18'
+    assert source.captured == 2 and list(source.drain()) == []
+
+
+class _LateCapture(object):
+    # Serves the responses of each page in bursts, the later ones while others are still in flight
+    def __init__(self, pages):
+        self._pages = [list(bursts) for bursts in pages]
+        self._bursts = []
+        self.resets = 0
+
+    @property
+    def pending(self):
+        return sum(1 for burst in self._bursts[1:] if burst)
+
+    def reset(self):
+        self.resets += 1
+        self._bursts = self._pages.pop(0) if self._pages else []
+
+    def drain(self):
+        burst = self._bursts.pop(0) if self._bursts else []
+        return iter(CapturedResponse(str(index), 'url', 200, 'application/json', body)
+                    for index, body in enumerate(burst))
+
+
+def test_stream_drains_late_responses_before_the_next_page(monkeypatch, virtual_clock):
+    monkeypatch.setattr(JobCapture.LinkedIn, 'job_search', classmethod(lambda cls, *args, **kwargs: None))
+    capture = _LateCapture([
+        [[_body(_card('1', 'React Developer'))], [], [_body(_card('2', 'Vue Developer'))],
+         [_body(_card('3', 'Angular Developer'))]],
+        [[]],
+    ])
+    records = list(stream_captured_jobs(capture, 'developer', timeout=5, quiet=0.5))
+    assert [record.job_id for record in records] == ['1', '2', '3']
+    assert capture.resets == 2
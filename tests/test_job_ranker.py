@@ -0,0 +1,23 @@
+from Linkedin.JobRanker import JobRanker, Profile, tokenize
+from Linkedin.JobSearch import JobRecord
+
+
+def test_tokenize_keeps_tech_names_and_drops_bare_punctuation():
+    tokens = tokenize('Senior React.js dev. Pune, India. C++ / C# ... + node.js, .NET and ASP.NET')
+    assert tokens == ['senior', 'react.js', 'dev', 'pune', 'india', 'c++', 'c#', 'node.js', '.net', 'and', 'asp.net']
+
+
+def test_punctuation_does_not_enter_the_vocabulary():
+    ranker = JobRanker()
+    ranker.add(JobRecord('1', 'React dev. + Node.js ...', 'Acme', 'Pune', None, None))
+    ranker.add(JobRecord('2', 'Java developer.', 'Globex', 'Mumbai', None, None))
+    assert set(ranker._vocabulary) == {'react', 'dev', 'node.js', 'acme', 'pune', 'java', 'developer', 'globex',
+                                       'mumbai'}
+
+
+def test_matching_skills_rank_first():
+    ranker = JobRanker()
+    ranker.extend([JobRecord('1', 'Senior Java developer', 'Globex', 'Mumbai', None, None),
+                   JobRecord('2', 'Senior React.js developer', 'Acme', 'Pune', None, None)])
+    top = ranker.top(Profile(skills=('react.js',), seniority='senior', locations=('pune',)), k=2)
+    assert [record.job_id for _, record in top] == ['2', '1']
@@ -0,0 +1,53 @@
+import json
+import os
+import threading
+from time import time
+
+from Linkedin.JobSearch import JobRecord, JsonlSink
+from Linkedin.JobStore import JobStore
+
+
+def _record(job_id, title='React Developer'):
+    return JobRecord(job_id, title, f'Company {job_id}', 'Pune', None, f'https://www.linkedin.com/jobs/view/{job_id}/')
+
+
+def test_recent_ids_are_limited_to_the_window(tmp_path):
+    now = time()
+    with JobStore(str(tmp_path / 'jobs.sqlite3')) as store:
+        store.add(_record('old'), seen=now - store.recent_window - 60)
+        store.add(_record('new'), seen=now)
+        assert store.recent_ids() == ['new']
+        assert sorted(store.recent_ids(since=0)) == ['new', 'old']
+
+
+def test_touch_keeps_skipped_postings_in_the_window(tmp_path):
+    now = time()
+    with JobStore(str(tmp_path / 'jobs.sqlite3')) as store:
+        store.add(_record('old'), seen=now - store.recent_window - 60)
+        store.touch(['old'], seen=now)
+        assert store.recent_ids() == ['old']
+
+
+def test_postings_outside_the_window_are_still_deduplicated(tmp_path):
+    path = str(tmp_path / 'jobs.sqlite3')
+    with JobStore(path) as store:
+        store.add(_record('old'), seen=time() - JobStore.recent_window - 60)
+    with JobStore(path) as store:
+        assert 'old' not in store.recent_ids()
+        fresh = _record('fresh', 'Vue Developer')
+        assert list(store.track([_record('old'), fresh])) == [fresh]
+
+
+def test_sinks_on_the_same_file_do_not_interleave(tmp_path):
+    path = str(tmp_path / 'jobs.jsonl')
+    records = [_record(str(index), 'React Developer ' * 200) for index in range(50)]
+    with JsonlSink(path) as first, JsonlSink(os.path.join(str(tmp_path), '.', 'jobs.jsonl')) as second:
+        assert first._lock is second._lock
+        writers = [threading.Thread(target=sink.consume, args=(records,)) for sink in (first, second)]
+        for writer in writers:
+            writer.start()
+        for writer in writers:
+            writer.join()
+    with open(path, encoding='utf-8') as jsonl_file:
+        lines = [json.loads(line) for line in jsonl_file]
+    assert len(lines) == 100
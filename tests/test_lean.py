@@ -0,0 +1,51 @@
+from selenium.webdriver import ChromeOptions
+
+from Linkedin.LinkedIn import LinkedIn
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.scenarios import build_search_fixture
+from selenium_helper.lean import (RESOURCE_TYPE_PATTERNS, TRACKING_URL_PATTERNS, LeanProfile, apply_lean_profile,
+                                  clear_lean_profile, lean_chrome_options)
+
+
+def _cdp_calls(driver, monkeypatch):
+    calls = []
+    execute_cdp_cmd = driver.execute_cdp_cmd
+
+    def recorded(cmd, cmd_args):
+        calls.append((cmd, cmd_args))
+        return execute_cdp_cmd(cmd, cmd_args)
+
+    monkeypatch.setattr(driver, 'execute_cdp_cmd', recorded)
+    return calls
+
+
+def test_blocked_urls_cover_the_resource_types_and_trackers():
+    profile = LeanProfile(resource_types=('font', 'video'), url_patterns=('*ads.linkedin.com/*',))
+    # Unknown resource types block nothing
+    assert profile.blocked_urls == list(RESOURCE_TYPE_PATTERNS['font']) + ['*ads.linkedin.com/*']
+    assert set(TRACKING_URL_PATTERNS) <= set(LeanProfile().blocked_urls)
+
+
+def test_chrome_options_load_eagerly_without_images():
+    options = lean_chrome_options(ChromeOptions())
+    assert options.page_load_strategy == 'eager'
+    assert '--blink-settings=imagesEnabled=false' in options.arguments
+    options = lean_chrome_options(ChromeOptions(), LeanProfile(resource_types=('font',), page_load_strategy='none'))
+    assert options.page_load_strategy == 'none' and options.arguments == []
+
+
+def test_profile_is_applied_and_cleared_over_cdp(monkeypatch):
+    driver = FakeWebDriver(build_search_fixture(1))
+    calls = _cdp_calls(driver, monkeypatch)
+    profile = LeanProfile(resource_types=('stylesheet',), url_patterns=())
+    apply_lean_profile(driver, profile)
+    clear_lean_profile(driver)
+    assert calls == [('Network.enable', {}), ('Network.setBlockedURLs', {'urls': ['*.css*']}),
+                     ('Network.setBlockedURLs', {'urls': []})]
+    assert driver.commands['executeCdpCommand'] == 3
+
+
+def test_search_url_is_encoded():
+    assert LinkedIn.jobs_search_url('React & Node.js', location='Pune, India', start=25) == (
+        'https://www.linkedin.com/jobs/search/?keywords=React+%26+Node.js&location=Pune%2C+India&start=25')
+    assert LinkedIn.jobs_search_url('react') == 'https://www.linkedin.com/jobs/search/?keywords=react'
@@ -0,0 +1,90 @@
+import logging
+import threading
+
+import pytest
+
+from selenium_helper import voltron_logging
+from selenium_helper.voltron_logging import (LOGGER_NAME, SAMPLED, RateSamplingFilter, configure_logging, lazy,
+                                             stop_logging)
+
+
+class _Collector(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append((record.threadName, record.levelname, record.getMessage()))
+
+
+@pytest.fixture
+def collector():
+    root, logger = logging.getLogger(), logging.getLogger(LOGGER_NAME)
+    levels = root.level, logger.level
+    collector = _Collector()
+    configure_logging(level='DEBUG', handlers=[collector], sample_interval=60)
+    yield collector
+    stop_logging()
+    root.setLevel(levels[0])
+    logger.setLevel(levels[1])
+
+
+def _record(lineno=10):
+    record = logging.LogRecord(LOGGER_NAME, logging.DEBUG, 'wait.py', lineno, 'Waiting for "%s"', ('list',), None)
+    record.voltron_sampled = True
+    return record
+
+
+def test_records_reach_the_handlers_through_the_listener(collector):
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.debug('typed "%s"', 'React')
+    logging.getLogger('urllib3').info('connection pool is full')
+    logging.getLogger('urllib3').warning('retrying')
+    stop_logging()
+    # The root level holds back chatty libraries; records keep the thread that logged them, not the listener's
+    assert [(level, message) for _, level, message in collector.records] == [
+        ('DEBUG', 'typed "React"'), ('WARNING', 'retrying')]
+    assert {thread for thread, _, _ in collector.records} == {threading.current_thread().name}
+
+
+def test_lazy_arguments_are_only_evaluated_when_logged(collector):
+    calls = []
+
+    def expensive():
+        calls.append(1)
+        return 'outer html'
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(logging.INFO)
+    logger.debug('snapshot %s', lazy(expensive))
+    assert calls == []
+    logger.info('snapshot %s', lazy(expensive))
+    logger.info('snapshot %s', lazy(lambda: 1 / 0))
+    stop_logging()
+    assert calls
+    assert [message for _, _, message in collector.records] == [
+        'snapshot outer html', 'snapshot <unavailable: ZeroDivisionError>']
+
+
+def test_sampled_polls_are_rate_limited_per_call_site(collector):
+    logger = logging.getLogger(LOGGER_NAME)
+    for _ in range(3):
+        logger.debug('polling', extra=SAMPLED)
+        logger.debug('committed')
+    stop_logging()
+    assert [message for _, _, message in collector.records] == ['polling', 'committed', 'committed', 'committed']
+
+
+def test_next_sampled_record_counts_the_suppressed_ones(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(voltron_logging, 'monotonic', lambda: now[0])
+    sampling = RateSamplingFilter(interval=1.0)
+    assert sampling.filter(_record())
+    now[0] = 0.5
+    assert not sampling.filter(_record()) and not sampling.filter(_record())
+    # Another call site has its own budget
+    assert sampling.filter(_record(lineno=20))
+    now[0] = 1.2
+    record = _record()
+    assert sampling.filter(record)
+    assert record.getMessage() == 'Waiting for "list" (+2 similar suppressed)'
@@ -0,0 +1,62 @@
+from unittest import mock
+
+from selenium_helper import globals as voltron_globals
+from selenium_helper.memory_governor import MemoryGovernor, MemoryLimits, PRUNE, RECYCLE
+
+_MB = 1024 * 1024
+
+
+def _metrics(heap_mb, nodes):
+    return {'metrics': [{'name': 'JSHeapUsedSize', 'value': heap_mb * _MB},
+                        {'name': 'JSHeapTotalSize', 'value': heap_mb * _MB}, {'name': 'Nodes', 'value': nodes}]}
+
+
+def _driver(*samples):
+    driver = mock.MagicMock()
+    driver.current_url = 'https://www.linkedin.com/jobs/search/?start=50'
+    driver.current_window_handle = 'old'
+    metrics = iter(samples)
+
+    def cdp(command, params):
+        return next(metrics) if command == 'Performance.getMetrics' else {}
+
+    driver.execute_cdp_cmd.side_effect = cdp
+    driver.execute_script.return_value = 12
+    return driver
+
+
+def test_prune_below_the_hard_limit():
+    driver = _driver(_metrics(400, 1000), _metrics(200, 1000))
+    governor = MemoryGovernor(driver, limits=MemoryLimits(), interval=0)
+    assert governor.check() == PRUNE
+    assert governor.pruned == 12
+    driver.switch_to.new_window.assert_not_called()
+
+
+def test_recycled_tab_gets_its_devtools_state_before_loading():
+    calls = []
+    driver = _driver(_metrics(900, 1000), _metrics(800, 1000))
+    driver.switch_to.window.side_effect = lambda handle: calls.append(('switch', handle))
+    driver.get.side_effect = lambda url: calls.append(('get', url))
+    governor = MemoryGovernor(driver, interval=0, on_new_target=lambda target: calls.append(('prepare', target)))
+    assert governor.check() == RECYCLE
+    assert [call[0] for call in calls] == ['switch', 'switch', 'prepare', 'get']
+    assert calls[-1] == ('get', 'https://www.linkedin.com/jobs/search/?start=50')
+    assert governor.tab_recycles == 1
+
+
+def test_sampling_interval_follows_the_globals_clock():
+    now = [1000.0]
+    voltron_globals.set_clock(lambda: now[0], lambda seconds: None)
+    try:
+        driver = _driver(_metrics(100, 1000), _metrics(100, 1000))
+        governor = MemoryGovernor(driver, interval=30)
+        assert governor.check() is None and governor.samples[-1].taken == 1000.0
+        now[0] += 29
+        governor.check()
+        assert len(governor.samples) == 1
+        now[0] += 1
+        governor.check()
+        assert [sample.taken for sample in governor.samples] == [1000.0, 1030.0]
+    finally:
+        voltron_globals.set_clock()
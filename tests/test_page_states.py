@@ -0,0 +1,63 @@
+import pytest
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.scenarios import build_search_fixture
+from selenium_helper import globals as voltron_globals
+from selenium_helper.globals import VoltronException, set_driver
+from selenium_helper.page_states import PageStates
+
+
+@pytest.fixture
+def driver():
+    fake = FakeWebDriver(build_search_fixture(3))
+    set_driver(fake)
+    yield fake
+    voltron_globals.set_browser_side_waits(False)
+    set_driver(None)
+
+
+def _hide(driver, selector):
+    driver.find_element('css selector', selector).node.set('style', 'display:none')
+    driver.dom_changed()
+
+
+def test_first_matching_state_wins_in_priority_order(driver):
+    states = PageStates({'loading': 'css=#spinner', 'results': 'css=li.result', 'empty': 'css=.no-results'})
+    assert states.current().name == 'loading'
+    _hide(driver, '#spinner')
+    state = states.current()
+    assert state.name == 'results' and state.element.get_attribute('data-job-id') == '0'
+    assert PageStates(states.states, visible=False).current().name == 'loading'
+
+
+def test_wait_picks_up_a_state_that_appears_later(driver):
+    _hide(driver, '#spinner')
+    results = driver.find_element('css selector', 'ul.results').node
+    driver.schedule(0.2, lambda fake: results.set('class', 'no-results'))
+    driver.commands.clear()
+    state = PageStates({'empty': 'css=.no-results', 'loading': 'css=#spinner'}).wait(timeout=5)
+    assert state.name == 'empty'
+    # Every poll checks all the states in one script call
+    assert driver.command_count == driver.commands['executeScript'] > 1
+
+
+def test_browser_side_wait_checks_the_states_without_polling(driver):
+    voltron_globals.set_browser_side_waits(True)
+    driver.commands.clear()
+    assert PageStates({'results': 'css=li.result'}).wait(timeout=5).name == 'results'
+    assert driver.commands['executeScript'] == 1 and driver.commands['setTimeouts'] == 1
+
+
+def test_expect_rejects_unexpected_and_missing_states(driver):
+    states = PageStates({'empty': 'css=.no-results', 'loading': 'css=#spinner'})
+    assert states.expect('loading', timeout=1).name == 'loading'
+    with pytest.raises(VoltronException, match=r'''Page is in state "loading", expected one of \['empty'\]'''):
+        states.expect('empty', timeout=1)
+    _hide(driver, '#spinner')
+    with pytest.raises(VoltronException, match=r"None of page states \['empty', 'loading'\] appeared in 0.2 sec"):
+        states.expect(timeout=0.2)
+
+
+def test_states_must_be_selectors_or_predicates(driver):
+    with pytest.raises(VoltronException, match='Page state "results" should be a selector'):
+        PageStates({'results': 42}).current()
@@ -0,0 +1,88 @@
+import pytest
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.scenarios import build_search_fixture
+from selenium_helper import scripts
+from selenium_helper.ComponentBase import ComponentBase
+from selenium_helper.InputBase import InputBase
+from selenium_helper.globals import compile_selector, set_driver
+from selenium_helper.pipeline import PipelineError
+
+
+@pytest.fixture
+def driver():
+    fake = FakeWebDriver(build_search_fixture(3))
+    set_driver(fake)
+    yield fake
+    set_driver(None)
+
+
+class ScriptClickedItem(ComponentBase):
+    _trusted_click = False
+
+
+def _first_item(component_type=ComponentBase):
+    return component_type(selector=compile_selector('css=ul.results li.result'))
+
+
+def test_steps_run_in_one_script(driver):
+    item = _first_item()
+    driver.commands.clear()
+    results = item.pipeline().scroll().read_text().read_attribute('data-job-id').is_displayed().run()
+    assert [result.value for result in results[1:]] == ['React Developer 0Company 0', '0', True]
+    assert dict(driver.commands) == {'executeScript': 1}
+
+
+def test_click_is_native_by_default(driver):
+    item = _first_item()
+    driver.commands.clear()
+    item.click()
+    assert driver.commands['clickElement'] == 1 and driver.commands['executeScript'] == 1
+    assert item._we.node.get('data-clicks') == '1'
+
+
+def test_script_click_is_opt_in(driver):
+    item = _first_item(ScriptClickedItem)
+    driver.commands.clear()
+    item.click()
+    assert dict(driver.commands) == {'executeScript': 1}
+    assert item._we.node.get('data-clicks') == '1'
+
+
+def test_perform_click_keeps_its_signature(driver):
+    results = ComponentBase(selector=compile_selector('css=ul.results'))
+    item = _first_item()
+    driver.commands.clear()
+    results.perform_click(we=item._we)
+    item.perform_click()
+    assert driver.commands['clickElement'] == 2 and item._we.node.get('data-clicks') == '2'
+
+
+def test_failed_step_stops_the_pipeline(driver):
+    pipeline = _first_item().pipeline().scroll()
+    pipeline._add('unknown').read_text()
+    with pytest.raises(PipelineError, match='"unknown" failed'):
+        pipeline.run()
+
+
+def test_steps_missing_from_the_script_result_raise(driver):
+    driver.register_script(scripts.RUN_PIPELINE, lambda element, steps: [[True, None]])
+    with pytest.raises(PipelineError, match='"text" did not run'):
+        _first_item().pipeline().scroll().read_text().run()
+
+
+def test_input_setter_detects_missed_typing(driver, caplog):
+    search = InputBase(selector=compile_selector('css=#global-nav-typeahead'))
+    search._we.send_keys = lambda *keys: None
+    with caplog.at_level('WARNING', logger='voltron_logger'):
+        search.value = 'React'
+    assert search._we.node.get('value') == 'React'
+    assert 'Typing into InputBase gave ""' in caplog.text
+
+
+def test_input_setter_typing_needs_no_script_write(driver, caplog):
+    search = InputBase(selector=compile_selector('css=#global-nav-typeahead'))
+    with caplog.at_level('WARNING', logger='voltron_logger'):
+        search.value = 'React'
+    assert search._we.node.get('value') == 'React'
+    assert caplog.text == ''
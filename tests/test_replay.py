@@ -0,0 +1,94 @@
+import time
+
+import pytest
+from selenium.webdriver.chrome.webdriver import WebDriver
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+from selenium.webdriver.remote.locator_converter import LocatorConverter
+from selenium.webdriver.remote.switch_to import SwitchTo
+
+from selenium_helper import globals as voltron_globals
+from selenium_helper.globals import wait_for_result
+from selenium_helper.rate_limit import TokenBucket
+from selenium_helper.replay import record, replay
+from tests.stub_webdriver import ELEMENT_KEY
+
+
+class _Executor(object):
+    # Command executor of a browser whose list shows up after a few polls
+    def __init__(self):
+        self.finds = 0
+
+    def execute(self, command, params):
+        if command == 'findElement':
+            self.finds += 1
+            if self.finds < 3:
+                return {'status': 'no such element', 'value': {'error': 'no such element', 'message': 'no li yet'}}
+            return {'value': {ELEMENT_KEY: 'li-1'}}
+        if command == 'w3cExecuteScript':
+            return {'value': [params['args'][0], 'React Developer']}
+        return {'value': None}
+
+
+def _driver() -> WebDriver:
+    # Skips the parent __init__, which would start a browser
+    driver = WebDriver.__new__(WebDriver)
+    driver.command_executor = _Executor()
+    driver.error_handler = ErrorHandler()
+    driver.session_id = 'recorded'
+    driver.caps = {'browserName': 'chrome'}
+    driver.pinned_scripts = {}
+    driver.locator_converter = LocatorConverter()
+    driver._is_remote = True
+    driver._switch_to = SwitchTo(driver)
+    return driver
+
+
+def _flow(driver, rate):
+    voltron_globals.set_driver(driver)
+    bucket = TokenBucket(rate)
+    names = []
+    for page in range(2):
+        bucket.acquire()
+        driver.get(f'https://www.linkedin.com/jobs/search/?start={page * 25}')
+        element = wait_for_result(lambda: voltron_globals.get_driver().find_element('css selector', 'li'),
+                                  name='result item', timeout=5)
+        found, name = driver.execute_script('return [arguments[0], arguments[0].textContent]', element)
+        names.append((found.id, name))
+    return names
+
+
+@pytest.fixture
+def real_clock():
+    yield
+    voltron_globals.set_clock()
+    voltron_globals.set_driver(None)
+
+
+def test_replay_runs_throttled_flow_on_virtual_time(tmp_path, real_clock):
+    path = str(tmp_path / 'trace.jsonl.gz')
+    recorded_driver = _driver()
+    recorder = record(recorded_driver, path)
+    recorded = _flow(recorded_driver, rate=20)
+    recorder.close()
+
+    driver = replay(path)
+    started = time.monotonic()
+    # One token a minute: the second page waits 60 virtual seconds, which a replay must not really sleep
+    assert _flow(driver, rate=1 / 60) == recorded == [('li-1', 'React Developer')] * 2
+    assert time.monotonic() - started < 5
+    assert driver.clock.monotonic() - time.monotonic() >= 59
+    assert driver.skipped == 0
+
+
+def test_token_bucket_uses_the_globals_clock(real_clock):
+    now, slept = [100.0], []
+
+    def sleep(seconds):
+        slept.append(seconds)
+        now[0] += seconds
+
+    voltron_globals.set_clock(lambda: now[0], sleep)
+    bucket = TokenBucket(0.5, capacity=2)
+    assert bucket.acquire() and bucket.acquire() and slept == []
+    assert not bucket.acquire(timeout=1)
+    assert bucket.acquire() and sum(slept) == pytest.approx(2.0)
@@ -0,0 +1,91 @@
+from contextlib import contextmanager
+
+import pytest
+
+from Linkedin import Scheduler as scheduler_module
+from Linkedin.JobSearch import JobRecord, JsonlSink
+from Linkedin.JobStore import JobStore
+from Linkedin.Scheduler import Checkpoint, RateLimits, Scheduler, SearchTask
+from selenium_helper.page_states import PageState
+
+
+class _Driver(object):
+    pass
+
+
+class _Pool(object):
+    size = 2
+
+    def __init__(self):
+        self.driver = _Driver()
+
+    @contextmanager
+    def session(self):
+        yield self.driver
+
+
+def _record(job_id):
+    return JobRecord(job_id, f'React Developer {job_id}', 'Company', 'Pune', None,
+                     f'https://www.linkedin.com/jobs/view/{job_id}/')
+
+
+class _Site(object):
+    # Results pages of every query in order, the last one repeating: job ids, 'empty' (loads, lists nothing) or
+    # 'no_results'
+    def __init__(self, pages):
+        self.pages = pages
+        self.opened = []
+        self.current = None
+
+    def job_search(self, query, location=None, start=0):
+        self.current = self.pages[query].pop(0) if len(self.pages[query]) > 1 else self.pages[query][0]
+        self.opened.append((query, start))
+        return self
+
+    def wait_for_search_outcome(self, timeout=20):
+        return PageState('no_results' if self.current == 'no_results' else 'results', None)
+
+    def stream_jobs(self, **kwargs):
+        return iter([] if self.current in ('empty', 'no_results') else [_record(job_id) for job_id in self.current])
+
+
+@pytest.fixture
+def site(monkeypatch):
+    site = _Site({})
+    monkeypatch.setattr(scheduler_module.LinkedIn, 'job_search', site.job_search)
+    monkeypatch.setattr(scheduler_module, 'stream_jobs', site.stream_jobs)
+    monkeypatch.setattr(scheduler_module, 'get_driver', _Driver)
+    return site
+
+
+def _run(tmp_path, tasks, **kwargs):
+    checkpoint = Checkpoint(str(tmp_path / 'checkpoint.json'))
+    with JobStore(str(tmp_path / 'jobs.sqlite3')) as store, JsonlSink(str(tmp_path / 'jobs.jsonl')) as sink:
+        limits = RateLimits(global_per_minute=60000, session_per_minute=60000, burst=10)
+        written = Scheduler(_Pool(), tasks, store, sink, checkpoint, limits=limits, **kwargs).run()
+    return written, checkpoint
+
+
+def test_empty_page_is_retried_instead_of_finishing_the_search(tmp_path, site):
+    site.pages = {'react': ['empty', ['1', '2'], 'no_results']}
+    written, checkpoint = _run(tmp_path, [SearchTask('react', max_pages=5)])
+    assert written == 2
+    assert [start for _, start in site.opened] == [0, 0, 25]
+    assert checkpoint.get(SearchTask('react')) == {'query': 'react', 'location': None, 'page': 2, 'count': 2,
+                                                   'done': True}
+
+
+def test_search_that_keeps_failing_stays_resumable(tmp_path, site):
+    site.pages = {'react': ['empty']}
+    written, checkpoint = _run(tmp_path, [SearchTask('react')], max_attempts=2)
+    assert written == 0 and len(site.opened) == 2
+    assert checkpoint.get(SearchTask('react')) == {}
+
+
+def test_written_counts_every_page_of_concurrent_searches(tmp_path, site):
+    site.pages = {query: [[f'{query}-{page}-{index}' for index in range(5)] for page in range(3)]
+                  for query in ('react', 'vue', 'angular')}
+    written, _ = _run(tmp_path, [SearchTask(query, max_pages=3) for query in site.pages])
+    assert written == 45
+    assert (tmp_path / 'jobs.jsonl').read_text().count('\n') == 45
+
@@ -0,0 +1,48 @@
+import pytest
+from selenium.webdriver.common.by import By
+
+from selenium_helper.globals import (GeneralException, Selector, SelectorPattern, VoltronException,
+                                     clear_selector_cache, compile_selector, parse_pattern, parse_selector,
+                                     selector_cache_info)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_selector_cache()
+    yield
+    clear_selector_cache()
+
+
+def test_plain_selectors_compile_to_tuples():
+    selector = compile_selector('css=li.result')
+    assert selector == Selector(By.CSS_SELECTOR, 'li.result')
+    assert str(selector) == 'css=li.result'
+    # Already parsed selectors skip the cache altogether
+    assert parse_selector(selector) is selector
+    assert selector_cache_info()['selectors'].currsize == 1
+
+
+def test_templated_selectors_compile_to_patterns():
+    pattern = compile_selector("xpath=//li[@data-job-id='{job}']/span[text()='{name}']")
+    assert isinstance(pattern, SelectorPattern) and pattern.names == ('job', 'name')
+    assert parse_pattern(pattern, {'job': 3, 'name': 'React'}) == "xpath=//li[@data-job-id='3']/span[text()='React']"
+    with pytest.raises(VoltronException, match='"name"'):
+        parse_pattern(pattern, {'job': 3})
+
+
+def test_repeated_parses_hit_the_cache():
+    for _ in range(3):
+        assert parse_selector('xpath=//ul/li') == (By.XPATH, '//ul/li')
+        assert compile_selector('id=phone') == (By.ID, 'phone')
+    info = selector_cache_info()
+    # Every compile of a plain selector parses it too
+    assert (info['selectors'].hits, info['selectors'].misses) == (4, 2)
+    assert (info['patterns'].hits, info['patterns'].misses) == (2, 1)
+    clear_selector_cache()
+    assert selector_cache_info()['selectors'].currsize == selector_cache_info()['patterns'].currsize == 0
+
+
+@pytest.mark.parametrize('selector', ['li.result', 'link=Jobs', 42])
+def test_malformed_selectors_are_rejected(selector):
+    with pytest.raises(GeneralException):
+        parse_selector(selector)
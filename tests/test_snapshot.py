@@ -0,0 +1,52 @@
+import pytest
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.scenarios import ResultsList
+from selenium_helper.ComponentBase import normalize_item_name
+from selenium_helper.globals import compile_selector, set_driver, VoltronException
+
+FIXTURE = (
+    '<html><body><ul class="results">'
+    '<li class="result" data-job-id="1"><span class="title">React Developer</span></li>'
+    '<li class="result" data-job-id="2" style="display: none"><span class="title">Hidden  Role</span></li>'
+    '<li class="result" data-job-id="3"><svg><path d="M0" /></svg><span class="title">Vue Developer</span></li>'
+    '</ul></body></html>'
+)
+
+
+@pytest.fixture
+def driver():
+    fake = FakeWebDriver(FIXTURE)
+    set_driver(fake)
+    yield fake
+    set_driver(None)
+
+
+def test_snapshot_and_live_harvest_agree_on_names(driver):
+    results = ResultsList(selector=compile_selector('css=ul.results'))
+    snapshot = results.snapshot()
+    assert snapshot.items_names == ['React Developer', 'Hidden Role', 'Vue Developer']
+    assert list(map(normalize_item_name, snapshot.items_names)) == list(map(normalize_item_name, results.items_names))
+
+
+def test_snapshot_element_text_is_empty_when_hidden(driver):
+    snapshot = ResultsList(selector=compile_selector('css=ul.results')).snapshot()
+    hidden = snapshot._we.find_elements('css selector', 'li.result')[1]
+    assert hidden.text == ''
+    assert hidden.get_attribute('textContent') == 'Hidden Role'
+
+
+def test_live_element_is_resolved_by_position(driver):
+    snapshot = ResultsList(selector=compile_selector('css=ul.results')).snapshot()
+    title = snapshot._we.find_elements('css selector', 'li.result span.title')[2]
+    live = title.live()
+    assert live.node.text == 'Vue Developer'
+
+
+def test_changed_page_is_reported_instead_of_resolving_another_element(driver):
+    snapshot = ResultsList(selector=compile_selector('css=ul.results')).snapshot()
+    title = snapshot._we.find_elements('css selector', 'li.result span.title')[2]
+    driver.remove(driver._root.find('.//svg'))
+    driver.dom_changed()
+    with pytest.raises(VoltronException, match='no longer in the page'):
+        title.live()
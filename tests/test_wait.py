@@ -0,0 +1,107 @@
+import pytest
+from selenium.common import NoSuchElementException
+
+from benchmarks.fake_webdriver import FakeWebDriver
+from benchmarks.scenarios import build_search_fixture
+from selenium_helper import globals as voltron_globals
+from selenium_helper.globals import compile_selector, find_element, find_elements, wait_for_result
+
+
+@pytest.fixture
+def clock():
+    # Virtual clock that records every sleep of a wait
+    now, slept = [0.0], []
+
+    def sleep(seconds):
+        slept.append(round(seconds, 6))
+        now[0] += seconds
+
+    voltron_globals.set_clock(lambda: now[0], sleep)
+    yield slept
+    voltron_globals.set_clock()
+
+
+@pytest.fixture
+def driver():
+    fake = FakeWebDriver(build_search_fixture(3))
+    voltron_globals.set_driver(fake)
+    voltron_globals.set_browser_side_waits(True)
+    yield fake
+    voltron_globals.set_browser_side_waits(False)
+    voltron_globals.set_driver(None)
+
+
+def test_polls_back_off_up_to_the_poll_interval(clock):
+    polls = []
+
+    def ready():
+        polls.append(1)
+        return len(polls) == 8
+
+    assert wait_for_result(ready, timeout=30)
+    assert clock == [0.05, 0.075, 0.1125, 0.16875, 0.253125, 0.379688, 0.5]
+
+
+def test_timeout_returns_the_last_result_at_the_deadline(clock):
+    assert wait_for_result(lambda: 0, timeout=1.2) == 0
+    assert sum(clock) == pytest.approx(1.2)
+    assert clock[-1] == pytest.approx(1.2 - sum(clock[:-1]))
+
+
+def test_bypassed_exceptions_keep_polling(clock):
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise NoSuchElementException('not yet')
+        return 'found'
+
+    assert wait_for_result(flaky, timeout=5) == 'found'
+    assert clock == [0.05, 0.075]
+    with pytest.raises(ValueError):
+        wait_for_result(lambda: int('x'), timeout=5)
+
+
+def test_observers_get_the_outcome_of_every_wait(clock):
+    seen = []
+
+    def observer(name, caller, started, elapsed, succeed):
+        seen.append((name, caller, started, round(elapsed, 6), succeed))
+
+    voltron_globals.wait_observers.append(observer)
+    try:
+        wait_for_result(lambda: True, name='ready')
+        wait_for_result(lambda: False, name='never', timeout=0.1)
+    finally:
+        voltron_globals.wait_observers.remove(observer)
+    assert seen == [('ready', 'test_observers_get_the_outcome_of_every_wait', 0.0, 0.0, True),
+                    ('never', 'test_observers_get_the_outcome_of_every_wait', 0.0, 0.1, False)]
+
+
+def test_browser_side_wait_replaces_polling(driver, monkeypatch):
+    set_script_timeout = driver.set_script_timeout
+    results = driver.find_element('css selector', 'ul.results').node
+
+    def render_late(time_to_wait):
+        # The list only renders once the first lookup has missed it
+        set_script_timeout(time_to_wait)
+        results.set('class', 'late')
+        driver.dom_changed()
+
+    monkeypatch.setattr(driver, 'set_script_timeout', render_late)
+    driver.commands.clear()
+    element = find_element(compile_selector('css=ul.late'), timeout=5)
+    # One missed lookup, then a single browser-side wait instead of polls
+    assert driver.commands['findElement'] == 1 and driver.commands['setTimeouts'] == 1
+    assert driver.commands['executeScript'] == 1
+    assert element.node is results
+
+
+def test_browser_side_wait_returns_nothing_for_missing_elements(driver):
+    driver.commands.clear()
+    assert find_element(compile_selector('css=#missing'), timeout=5) is None
+    assert find_elements(compile_selector('css=.missing'), timeout=5) == []
+    # The script timeout covering both waits was set once
+    assert driver.commands['findElement'] == 1 and driver.commands['findElements'] == 1
+    assert driver.commands['setTimeouts'] == 1